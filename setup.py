@@ -24,6 +24,10 @@ setup(
     extras_require={
         'interactive': ['jupyter', 'pytest-plots'],
     },
+    entry_points={
+        'console_scripts': ['ppy_repack_cdyna=perturbopy.io_utils.repack:main',
+                            'ppy_ingest=perturbopy.io_utils.ingest:main'],
+    },
     packages=find_packages(
         where='./src'
     ),
@@ -0,0 +1,445 @@
+"""
+Ingest a directory tree of Perturbo YAML outputs into a single indexed HDF5 store
+
+Each YAML file is dispatched to the calculation mode class matching its calc_mode, and the files are parsed
+in parallel in a process pool. The arrays of each calculation are written to the group calcs/calc_N of the
+store, with configuration-indexed quantities (temperatures, conductivities, etc.) stored as columns: a keys
+dataset with the configuration numbers and a values dataset with the quantities stacked along the first axis.
+
+Two index tables are written at the root of the store:
+
+* index: one row per calculation, with the material (prefix), calc_mode, path of the YAML file and group
+* config_index: one row per configuration, with the group, configuration number, temperature and chemical potential
+
+Files that did not change since they were ingested are skipped, so the YAML files are only parsed once.
+Files that cannot be parsed, or are not Perturbo outputs, are skipped with the reason in the returned status,
+and the index tables are written even if the ingestion is interrupted. The calculations of files that were
+deleted from the directory tree, or that can no longer be parsed, are removed from the store.
+
+Usage from the command line::
+
+    python -m perturbopy.io_utils.ingest calculations/ store.h5
+
+"""
+import os
+import fnmatch
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import h5py
+import yaml
+from perturbopy.io_utils.io import open_yaml
+
+INDEX_FIELDS = ['material', 'calc_mode', 'path', 'group']
+
+
+def to_payload(value):
+    """
+    Function to convert an attribute of a calculation mode object to a payload written to HDF5:
+    arrays, scalars, or dictionaries of payloads (HDF5 groups). Group attributes are stored under the '_attrs' key.
+
+    Parameters
+    ----------
+    value : object
+       np.ndarray, scalar, str, UnitsArray, UnitsDict, RecipPtDB, or dict
+
+    Returns
+    -------
+    payload : np.ndarray, scalar, str, dict or None
+       None for values that cannot be stored
+
+    """
+    from perturbopy.postproc.dbs.units_dict import UnitsDict, UnitsArray
+    from perturbopy.postproc.dbs.recip_pt_db import RecipPtDB
+
+    if isinstance(value, UnitsArray):
+        payload = {'_attrs': {'type': 'UnitsArray', 'units': value.units}, 'array': value.array}
+
+        for level, keys in enumerate(value.index_keys):
+            payload[f'keys_{level}'] = np.array(keys)
+
+        return payload
+
+    if isinstance(value, RecipPtDB):
+        return {'_attrs': {'type': 'RecipPtDB', 'units': value.units, 'path_units': value.path_units},
+                'points_cart': value.points_cart, 'points_cryst': value.points_cryst, 'path': np.asarray(value.path)}
+
+    if isinstance(value, dict):
+        if isinstance(value, UnitsDict):
+            attrs = {'type': 'UnitsDict', 'units': value.units}
+        else:
+            attrs = {'type': 'dict'}
+
+        leaves = [np.asarray(leaf) for leaf in value.values() if not isinstance(leaf, dict)]
+
+        # Values of the same shape for every key are stored as columns
+        if len(value) > 0 and len(leaves) == len(value) and all(leaf.dtype.kind in 'biuf' for leaf in leaves) \
+                and len(set(leaf.shape for leaf in leaves)) == 1:
+            return {'_attrs': attrs, 'keys': np.array(list(value.keys())), 'values': np.stack(leaves)}
+
+        payload = {'_attrs': attrs}
+
+        for key, leaf in value.items():
+            leaf_payload = to_payload(leaf)
+
+            if leaf_payload is not None:
+                payload[str(key)] = leaf_payload
+
+        return payload
+
+    if isinstance(value, (bool, int, float, str, np.number, np.bool_)):
+        return value
+
+    if isinstance(value, (list, tuple)) and len(value) > 0 and all(isinstance(item, dict) for item in value):
+        return {'_attrs': {'type': 'list'}, **{str(i): to_payload(item) for i, item in enumerate(value)}}
+
+    if isinstance(value, (list, tuple, np.ndarray)):
+        array = np.asarray(value)
+
+        if array.dtype.kind in 'biufU':
+            return array
+
+    return None
+
+
+def ingest_file(yaml_path):
+    """
+    Function to parse a Perturbo YAML file and convert the calculation to a payload. Used by the workers of ingest.
+
+    Parameters
+    ----------
+    yaml_path : str
+       Path to the YAML file
+
+    Returns
+    -------
+    record : dict
+       Dictionary with the path, status ('ingested' or 'skipped'), and for ingested files the
+       material, calc_mode, payload and configuration table
+
+    """
+    from perturbopy.postproc.calc_modes.calc_mode import calc_mode_class
+
+    record = {'path': yaml_path, 'status': 'skipped'}
+
+    try:
+        pert_dict = open_yaml(yaml_path)
+    except (yaml.YAMLError, OSError, UnicodeDecodeError) as error:
+        record['reason'] = f'could not be parsed: {error!r}'
+        return record
+
+    try:
+        parameters = pert_dict['input parameters']['after conversion']
+        calc_mode = parameters['calc_mode']
+    except (KeyError, TypeError):
+        record['reason'] = 'not a Perturbo YAML output'
+        return record
+
+    cls = calc_mode_class(calc_mode)
+
+    if cls is None:
+        record['reason'] = f'calculation mode {calc_mode} is not supported'
+        return record
+
+    material = str(parameters.get('prefix', ''))
+
+    try:
+        calc = cls(pert_dict)
+    except Exception as error:
+        record['reason'] = f'{cls.__name__} could not be created: {error!r}'
+        return record
+
+    payload = {}
+
+    for name, value in vars(calc).items():
+        if not name.startswith('_'):
+            value_payload = to_payload(value)
+
+            if value_payload is not None:
+                payload[name] = value_payload
+
+    configs = []
+    temper = getattr(calc, 'temper', None)
+    chem_pot = getattr(calc, 'chem_pot', None)
+
+    if temper is not None:
+        for config in temper.keys():
+            configs.append((int(config), float(temper[config]), float(chem_pot[config]) if chem_pot is not None else np.nan))
+
+    record.update({'status': 'ingested', 'material': material, 'calc_mode': calc_mode, 'payload': payload, 'configs': configs})
+
+    return record
+
+
+def _write_payload(group, payload):
+    """
+    Function to write a payload to an HDF5 group
+
+    """
+    for name, value in payload.items():
+        if name == '_attrs':
+            group.attrs.update(value)
+        elif isinstance(value, dict):
+            _write_payload(group.create_group(name), value)
+        elif isinstance(value, np.ndarray):
+            if value.dtype.kind == 'U':
+                value = value.astype(h5py.string_dtype())
+            group.create_dataset(name, data=value)
+        else:
+            group.attrs[name] = value
+
+
+def _read_group(group):
+    """
+    Function to read an HDF5 group into a dictionary of arrays
+
+    """
+    data = {key: value for key, value in group.attrs.items()}
+
+    for name, item in group.items():
+        if isinstance(item, h5py.Group):
+            data[name] = _read_group(item)
+        elif h5py.check_string_dtype(item.dtype) is not None:
+            data[name] = item.asstr()[()]
+        else:
+            data[name] = item[()]
+
+    return data
+
+
+def _write_index(store):
+    """
+    Function to rebuild the index tables of the store from the attributes of the calculation groups
+
+    """
+    string = h5py.string_dtype()
+    rows = []
+    config_rows = []
+
+    for name, group in store['calcs'].items():
+        rows.append(tuple(str(group.attrs[field]) for field in INDEX_FIELDS[:-1]) + (name,))
+
+        if 'configs' in group:
+            config_rows.extend((name,) + tuple(row) for row in group['configs'][()].tolist())
+
+    for table in ['index', 'config_index']:
+        if table in store:
+            del store[table]
+
+    index = np.array(rows, dtype=[(field, string) for field in INDEX_FIELDS])
+    config_index = np.array(config_rows, dtype=[('group', string), ('config', int), ('temperature', float), ('chemical_potential', float)])
+
+    store.create_dataset('index', data=index)
+    store.create_dataset('config_index', data=config_index)
+
+
+def _collect(futures):
+    """
+    Function to yield the records of the files parsed by the workers, in order. A file whose worker failed
+    (e.g. a crashed process) is recorded as skipped.
+
+    """
+    for yaml_path, future in futures:
+        try:
+            yield future.result()
+        except Exception as error:
+            yield {'path': yaml_path, 'status': 'skipped', 'reason': f'could not be parsed: {error!r}'}
+
+
+def ingest(directory, store_path, pattern='*.yml', executor='process', max_workers=None, overwrite=False):
+    """
+    Function to parse all of the Perturbo YAML files in a directory tree and store them in one HDF5 file
+
+    Parameters
+    ----------
+    directory : str
+       Root of the directory tree to search for YAML files
+    store_path : str
+       Path to the HDF5 store, created if it does not exist
+    pattern : str, optional
+       Shell-style pattern of the names of the YAML files
+    executor : None, 'process' or concurrent.futures.ProcessPoolExecutor, optional
+       How to parse the files in parallel. With None, the files are parsed sequentially. Threads are not
+       supported, since the YAML files are parsed while holding the GIL.
+    max_workers : int, optional
+       Number of workers of the process pool
+    overwrite : bool, optional
+       If True, files that are already in the store are parsed again even if they did not change
+
+    Returns
+    -------
+    status : dict
+       Dictionary with the paths of the YAML files as keys, and 'ingested', 'unchanged', 'skipped: reason', or
+       'removed' (for files of the store deleted from the directory tree) as values
+
+    """
+    yaml_paths = []
+
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        yaml_paths.extend(os.path.abspath(os.path.join(root, name)) for name in sorted(files) if fnmatch.fnmatch(name, pattern))
+
+    if executor is not None and executor != 'process' and not isinstance(executor, ProcessPoolExecutor):
+        raise ValueError("executor should be None, 'process' or a concurrent.futures.ProcessPoolExecutor")
+
+    directory = os.path.abspath(directory)
+    status = {}
+
+    with h5py.File(store_path, 'a') as store:
+        calcs = store.require_group('calcs')
+        groups = {group.attrs['path']: name for name, group in calcs.items()}
+
+        # Calculations of the files deleted from the directory tree are removed
+        for yaml_path, name in groups.items():
+            if os.path.commonpath([directory, yaml_path]) == directory and not os.path.isfile(yaml_path):
+                del calcs[name]
+                status[yaml_path] = 'removed'
+
+        # Files that did not change since they were ingested are not parsed again
+        to_parse = []
+
+        for yaml_path in yaml_paths:
+            stat = os.stat(yaml_path)
+
+            if not overwrite and yaml_path in groups:
+                group = calcs[groups[yaml_path]]
+
+                if group.attrs['mtime_ns'] == stat.st_mtime_ns and group.attrs['size'] == stat.st_size:
+                    status[yaml_path] = 'unchanged'
+                    continue
+
+            to_parse.append(yaml_path)
+
+        if executor is None:
+            records = map(ingest_file, to_parse)
+        else:
+            pool = ProcessPoolExecutor(max_workers=max_workers) if executor == 'process' else executor
+            futures = [(yaml_path, pool.submit(ingest_file, yaml_path)) for yaml_path in to_parse]
+            records = _collect(futures)
+
+        try:
+            # Write each calculation as soon as it is parsed, in the order of the files
+            next_id = max([int(name.split('_')[-1]) for name in calcs.keys()], default=0) + 1
+
+            for record in records:
+                yaml_path = record['path']
+
+                if record['status'] != 'ingested':
+                    status[yaml_path] = f"skipped: {record['reason']}"
+
+                    # The data of a previous version of the file are out of date
+                    if yaml_path in groups:
+                        del calcs[groups[yaml_path]]
+
+                    continue
+
+                if yaml_path in groups:
+                    del calcs[groups[yaml_path]]
+                    name = groups[yaml_path]
+                else:
+                    name = f'calc_{next_id}'
+                    next_id += 1
+
+                group = calcs.create_group(name)
+                _write_payload(group, record['payload'])
+
+                stat = os.stat(yaml_path)
+                group.attrs.update({'material': record['material'], 'calc_mode': record['calc_mode'], 'path': yaml_path,
+                                    'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size})
+
+                if len(record['configs']) > 0:
+                    group.create_dataset('configs', data=np.array(record['configs'], dtype=float))
+
+                status[yaml_path] = 'ingested'
+
+        finally:
+            if executor == 'process':
+                pool.shutdown()
+
+            # The index always describes the calculations written so far
+            _write_index(store)
+
+    return status
+
+
+def read_index(store_path, material=None, calc_mode=None):
+    """
+    Function to read the index of the calculations in a store, optionally selecting a material or calculation mode
+
+    Parameters
+    ----------
+    store_path : str
+       Path to the HDF5 store
+    material : str, optional
+       Prefix of the material to select
+    calc_mode : str, optional
+       Calculation mode to select, e.g. 'bands' or 'trans-ita'. A prefix such as 'trans' selects all of the
+       calculation modes that start with it.
+
+    Returns
+    -------
+    index : np.ndarray
+       Structured array with the fields material, calc_mode, path and group
+
+    """
+    with h5py.File(store_path, 'r') as store:
+        index = store['index'][()]
+
+    index = index.astype([(field, object) for field in INDEX_FIELDS])
+
+    for field in INDEX_FIELDS:
+        index[field] = [value.decode() if isinstance(value, bytes) else value for value in index[field]]
+
+    selected = np.ones(len(index), dtype=bool)
+
+    if material is not None:
+        selected &= index['material'] == material
+
+    if calc_mode is not None:
+        selected &= np.array([mode == calc_mode or mode.startswith(f'{calc_mode}-') for mode in index['calc_mode']], dtype=bool)
+
+    return index[selected]
+
+
+def read_calc(store_path, group):
+    """
+    Function to read the data of one calculation from a store
+
+    Parameters
+    ----------
+    store_path : str
+       Path to the HDF5 store
+    group : str
+       Name of the group of the calculation, from the index
+
+    Returns
+    -------
+    data : dict
+       Nested dictionary of the arrays and attributes of the calculation
+
+    """
+    with h5py.File(store_path, 'r') as store:
+        return _read_group(store['calcs'][group])
+
+
+def main(argv=None):
+    """
+    Command line interface of ingest
+    """
+    parser = argparse.ArgumentParser(description='Parse all of the Perturbo YAML outputs in a directory tree into one HDF5 store.')
+    parser.add_argument('directory', help='root of the directory tree to search for YAML files')
+    parser.add_argument('store_path', help='HDF5 store to create or update')
+    parser.add_argument('--pattern', default='*.yml', help='pattern of the names of the YAML files')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes parsing the files')
+    parser.add_argument('--overwrite', action='store_true', help='parse files that are already in the store again')
+
+    args = parser.parse_args(argv)
+
+    status = ingest(args.directory, args.store_path, pattern=args.pattern, max_workers=args.workers, overwrite=args.overwrite)
+
+    for yaml_path, file_status in status.items():
+        print(f'{yaml_path}: {file_status}')
+
+
+if __name__ == '__main__':
+    main()
@@ -2,16 +2,25 @@
 Open/close binary and ASCII files (HDF5, YAML, text inputs/outputs)
 
 """
-from yaml import load
+import re
+from yaml import load, ScalarNode, YAMLError
+from yaml.events import MappingStartEvent, MappingEndEvent, SequenceStartEvent, SequenceEndEvent, ScalarEvent
+from yaml.composer import Composer
+from yaml.constructor import Constructor
+from yaml.resolver import Resolver
 
 try:
     from yaml import CLoader as Loader
 except ImportError:
     from yaml import Loader
 import h5py
+from perturbopy.io_utils import yaml_cache
 
+# Plain key of a top-level block mapping, at the start of a line
+_TOP_LEVEL_KEY = re.compile(r'^([^\s#%\-\[\]{}\'"?:!&*|>@`,][^\n]*?):(?:[ \t]|$)', re.MULTILINE)
 
-def open_yaml(file_name):
+
+def open_yaml(file_name, use_cache=None, sections=None):
     """
     Load YAML file as dictionary
 
@@ -20,18 +29,267 @@ def open_yaml(file_name):
     file_name : str
        name of YAML file to be loaded
 
+    use_cache : bool, optional
+       If True, the parsed file is read from or stored in the cache of parsed YAML files
+       (see perturbopy.io_utils.yaml_cache). Defaults to the global setting of the cache, off unless switched on.
+
+    sections : list of str, optional
+       Top-level keys of the YAML file to load. The other top-level sections are skipped without being
+       constructed, see open_yaml_sections. By default, the whole file is loaded.
+
     Returns
     -------
     yaml_dict : dict
        YAML file loaded as dict
 
     """
+    if use_cache is None:
+        use_cache = yaml_cache.cache_enabled()
+
+    if use_cache:
+        yaml_dict = yaml_cache.load_cached(file_name)
+
+        if yaml_dict is not None:
+            if sections is not None:
+                yaml_dict = {key: value for key, value in yaml_dict.items() if key in sections}
+
+            return yaml_dict
+
+    # Partially loaded files are not stored in the cache
+    if sections is not None:
+        return open_yaml_sections(file_name, sections)
+
     with open(file_name, 'r') as file:
         yaml_dict = load(file, Loader=Loader)
 
+    if use_cache:
+        yaml_cache.store_cached(file_name, yaml_dict)
+
+    return yaml_dict
+
+
+def _skip_node(loader, events=None):
+    """
+    Skip the events of the next node of a YAML event stream, without constructing it.
+    If events is a list, the skipped events are appended to it.
+
+    """
+    depth = 0
+
+    while True:
+        event = loader.get_event()
+
+        if events is not None:
+            events.append(event)
+
+        if isinstance(event, (MappingStartEvent, SequenceStartEvent)):
+            depth += 1
+        elif isinstance(event, (MappingEndEvent, SequenceEndEvent)):
+            depth -= 1
+
+        if depth == 0:
+            return
+
+
+class _EventLoader(Composer, Constructor, Resolver):
+    """
+    YAML loader composing and constructing one node from a list of events recorded from another loader
+
+    """
+
+    def __init__(self, events):
+        self._events = events
+        self._position = 0
+        Composer.__init__(self)
+        Constructor.__init__(self)
+        Resolver.__init__(self)
+
+    def check_event(self, *choices):
+        if self._position >= len(self._events):
+            return False
+
+        return not choices or isinstance(self._events[self._position], choices)
+
+    def peek_event(self):
+        return self._events[self._position]
+
+    def get_event(self):
+        event = self._events[self._position]
+        self._position += 1
+
+        return event
+
+    def load_node(self):
+        return self.construct_document(self.compose_node(None, None))
+
+
+def open_yaml_sections(file_name, sections):
+    """
+    Load some of the top-level sections of a YAML file as dictionary. The top-level keys are found by scanning
+    the lines of the file, and the text of each requested section is loaded on its own, so that the other
+    sections are neither parsed nor constructed. If the file is not a block mapping with plain top-level keys
+    at the start of the lines, as written by Perturbo, it is streamed as YAML events instead.
+
+    Parameters
+    ----------
+    file_name : str
+       name of YAML file to be loaded
+
+    sections : list of str
+       top-level keys of the sections to load, e.g. ['basic data', 'input parameters', 'bands']
+
+    Returns
+    -------
+    yaml_dict : dict
+       The requested sections of the YAML file. Sections missing from the file are not in the dict.
+
+    """
+    with open(file_name, 'r') as file:
+        text = file.read()
+
+    yaml_dict = _split_yaml_sections(text, set(sections))
+
+    if yaml_dict is None:
+        yaml_dict = _stream_yaml_sections(text, set(sections), file_name)
+
+    return yaml_dict
+
+
+def _split_yaml_sections(text, sections):
+    """
+    Load the requested top-level sections of a YAML document from the text between the lines of their keys
+    and the next top-level keys. Returns None if the sections cannot be split this way.
+
+    """
+    starts = [(match.start(), match.group(1).rstrip()) for match in _TOP_LEVEL_KEY.finditer(text)]
+
+    if not sections <= {key for _, key in starts}:
+        return None
+
+    yaml_dict = {}
+
+    for i, (start, key) in enumerate(starts):
+        if key not in sections:
+            continue
+
+        stop = starts[i + 1][0] if i + 1 < len(starts) else len(text)
+
+        try:
+            section = load(text[start:stop], Loader=Loader)
+        except YAMLError:
+            return None
+
+        # A line starting with a key inside a section, e.g. in a multi-line quoted scalar, splits it wrongly
+        if not isinstance(section, dict) or list(section.keys()) != [key]:
+            return None
+
+        yaml_dict.update(section)
+
+    return yaml_dict
+
+
+def _stream_yaml_sections(text, sections, file_name):
+    """
+    Load the requested top-level sections of a YAML document by streaming its events. The events of the
+    requested sections are composed and constructed, and the other sections are skipped without building
+    Python objects for them.
+
+    """
+    yaml_dict = {}
+    loader = Loader(text)
+
+    try:
+        # Stream start, document start, and start of the top-level mapping
+        for _ in range(3):
+            event = loader.get_event()
+
+        if not isinstance(event, MappingStartEvent):
+            raise ValueError(f'The YAML file {file_name} is not a mapping')
+
+        while len(yaml_dict) < len(sections):
+            event = loader.get_event()
+
+            if isinstance(event, MappingEndEvent):
+                break
+
+            if isinstance(event, ScalarEvent) and event.value in sections:
+                events = []
+                _skip_node(loader, events)
+                yaml_dict[event.value] = _EventLoader(events).load_node()
+            else:
+                _skip_node(loader)
+
+    finally:
+        loader.dispose()
+
     return yaml_dict
 
 
+def read_yaml_value(file_name, key_path):
+    """
+    Read one scalar value of a YAML file, streaming the YAML events up to the value and stopping there.
+    The rest of the file is neither parsed nor constructed.
+
+    Parameters
+    ----------
+    file_name : str
+       name of YAML file to be read
+
+    key_path : list of str
+       keys of the nested mappings leading to the value, e.g. ['input parameters', 'after conversion', 'calc_mode']
+
+    Returns
+    -------
+    value : str, int, float, bool or None
+       The value, with the same type as when loading the whole file
+
+    Raises
+    ------
+    KeyError
+       If the value is not in the file
+    ValueError
+       If the value is not a scalar
+
+    """
+    with open(file_name, 'r') as file:
+        loader = Loader(file)
+
+        try:
+            # Stream start, document start, and start of the top-level mapping
+            for _ in range(3):
+                event = loader.get_event()
+
+            if not isinstance(event, MappingStartEvent):
+                raise KeyError(key_path[0])
+
+            for level, key in enumerate(key_path):
+                while True:
+                    event = loader.get_event()
+
+                    if isinstance(event, MappingEndEvent):
+                        raise KeyError(key)
+
+                    if isinstance(event, ScalarEvent) and event.value == key:
+                        break
+
+                    _skip_node(loader)
+
+                event = loader.get_event()
+
+                if level < len(key_path) - 1 and not isinstance(event, MappingStartEvent):
+                    raise KeyError(key_path[level + 1])
+
+            if not isinstance(event, ScalarEvent):
+                raise ValueError(f'The value of {key_path} in {file_name} is not a scalar')
+
+            node = ScalarNode(loader.resolve(ScalarNode, event.value, event.implicit), event.value, style=event.style)
+
+            return loader.construct_object(node)
+
+        finally:
+            loader.dispose()
+
+
 def open_hdf5(filename, mode='r'):
     hdf5_file = h5py.File(filename, mode)
     return hdf5_file
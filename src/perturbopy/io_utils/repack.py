@@ -0,0 +1,159 @@
+"""
+Repack the cdyna HDF5 file of a dynamics-run calculation into one dataset per run
+
+The cdyna file written by Perturbo stores each snapshot of the distribution function as a separate
+snap_t_N dataset. The repacked file stores the snapshots of each run as a single chunked and compressed
+dataset, dynamics_run_N/snap_t, of shape (num_steps, num_kpoints, num_bands), with the number of steps,
+the time step, the times and the electric field stored as attributes of the dataset.
+
+Usage from the command line::
+
+    python -m perturbopy.io_utils.repack prefix_cdyna.h5 prefix_cdyna_repacked.h5
+
+"""
+import argparse
+import os
+import tempfile
+import numpy as np
+import h5py
+from perturbopy.io_utils.step_reader import StepDatasetReader
+
+
+def is_repacked(cdyna_file):
+    """
+    Function to check whether an open cdyna HDF5 file has the repacked layout, i.e. whether the snapshots of
+    each of its runs are stored in one snap_t dataset
+
+    Parameters
+    ----------
+    cdyna_file : h5py.File
+       The open cdyna HDF5 file
+
+    Returns
+    -------
+    repacked : bool
+
+    """
+    num_runs = cdyna_file['num_runs'][()]
+
+    return num_runs > 0 and all('snap_t' in cdyna_file[f'dynamics_run_{irun}'] for irun in range(1, num_runs + 1))
+
+
+def repack_cdyna(cdyna_path, repacked_path, compression='gzip', compression_opts=4, chunk_steps=None, batch_steps=256):
+    """
+    Function to rewrite a cdyna HDF5 file with one snap_t dataset per run
+
+    Parameters
+    ----------
+    cdyna_path : str
+       Path to the cdyna HDF5 file generated by a dynamics-run calculation
+    repacked_path : str
+       Path to the repacked HDF5 file to create. An existing file is replaced once the repacked file is complete.
+    compression : str, optional
+       HDF5 compression filter of the snap_t datasets, or None for no compression
+    compression_opts : int, optional
+       The gzip compression level. Ignored for other filters.
+    chunk_steps : int, optional
+       Number of time steps per HDF5 chunk. By default, chunks hold about 1 MB.
+    batch_steps : int, optional
+       Number of snapshots read from cdyna_path and written at once, which bounds the memory used
+
+    Returns
+    -------
+    repacked_path : str
+       Path to the repacked HDF5 file
+
+    """
+    if compression != 'gzip':
+        compression_opts = None
+
+    with h5py.File(cdyna_path, 'r') as cdyna_file:
+
+        if is_repacked(cdyna_file):
+            raise ValueError(f'{cdyna_path} is already repacked')
+
+        # The file is written next to repacked_path and moved into place once complete
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(repacked_path)), suffix='.tmp')
+        os.close(tmp_fd)
+
+        try:
+            _write_repacked(cdyna_file, tmp_path, compression, compression_opts, chunk_steps, batch_steps)
+            os.replace(tmp_path, repacked_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    return repacked_path
+
+
+def _write_repacked(cdyna_file, repacked_path, compression, compression_opts, chunk_steps, batch_steps):
+    """
+    Helper function to write the repacked layout of an open cdyna HDF5 file, see repack_cdyna
+
+    """
+    with h5py.File(repacked_path, 'w') as repacked_file:
+
+        num_runs = cdyna_file['num_runs'][()]
+
+        # Copy everything except the dynamics runs, e.g. num_runs and band_structure_ryd
+        for name in cdyna_file.keys():
+            if not name.startswith('dynamics_run_'):
+                cdyna_file.copy(cdyna_file[name], repacked_file, name=name)
+
+        for irun in range(1, num_runs + 1):
+            dyn_str = f'dynamics_run_{irun}'
+            group = cdyna_file[dyn_str]
+
+            num_steps = group['num_steps'][()]
+            time_step = group['time_step_fs'][()]
+
+            if 'efield' in group.keys():
+                efield = group['efield'][()]
+            else:
+                efield = np.array([0.0, 0.0, 0.0])
+
+            reader = StepDatasetReader(group, 'snap_t_')
+            numk, numb = reader.shape
+
+            if chunk_steps is None:
+                run_chunk_steps = max(1, min(num_steps, 2**20 // max(1, numk * numb * reader.dtype.itemsize)))
+            else:
+                run_chunk_steps = max(1, min(num_steps, chunk_steps))
+
+            run_group = repacked_file.create_group(dyn_str)
+            snap_t = run_group.create_dataset('snap_t', shape=(num_steps, numk, numb), dtype=reader.dtype,
+                                              chunks=(run_chunk_steps, numk, numb),
+                                              compression=compression, compression_opts=compression_opts)
+
+            snap_t.attrs['num_steps'] = num_steps
+            snap_t.attrs['time_step_fs'] = time_step
+            snap_t.attrs['times_fs'] = np.arange(1, num_steps + 1) * time_step
+            snap_t.attrs['efield'] = efield
+
+            for first in range(0, num_steps, batch_steps):
+                last = min(first + batch_steps, num_steps)
+                snap_t[first:last] = reader.read(np.arange(first + 1, last + 1))
+
+
+def main(argv=None):
+    """
+    Command line interface of repack_cdyna
+    """
+    parser = argparse.ArgumentParser(description='Repack the cdyna HDF5 file of a Perturbo dynamics-run calculation '
+                                                 'into one chunked snap_t dataset per run.')
+    parser.add_argument('cdyna_path', help='cdyna HDF5 file generated by the dynamics-run calculation')
+    parser.add_argument('repacked_path', help='repacked HDF5 file to create')
+    parser.add_argument('--compression', default='gzip', help='HDF5 compression filter, or "none"')
+    parser.add_argument('--compression-opts', type=int, default=4, help='options of the compression filter')
+    parser.add_argument('--chunk-steps', type=int, default=None, help='number of time steps per chunk')
+
+    args = parser.parse_args(argv)
+
+    compression = None if args.compression.lower() == 'none' else args.compression
+
+    repack_cdyna(args.cdyna_path, args.repacked_path, compression=compression,
+                 compression_opts=args.compression_opts, chunk_steps=args.chunk_steps)
+
+
+if __name__ == '__main__':
+    main()
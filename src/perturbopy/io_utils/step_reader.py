@@ -0,0 +1,280 @@
+"""
+Readers for numbered per-step HDF5 datasets (snap_t_1, snap_t_2, ... or popu_t0, popu_t1, ...)
+
+"""
+import re
+import numpy as np
+
+
+class StepDatasetReader():
+    """
+    Reader for a set of numbered datasets of the same shape stored in one HDF5 group,
+    such as the snap_t_N datasets of a dynamics run or the popu_tN datasets of a dynamics-pp calculation.
+
+    The datasets are discovered once, when the reader is created, and are then read one after the other
+    directly into a preallocated buffer. The reads are not threaded: h5py holds a global lock during every call,
+    so reads of the same file cannot overlap.
+
+    Attributes
+    ----------
+    steps : np.ndarray
+        Sorted array of the step numbers found in the group
+
+    shape : tuple
+        Shape of each per-step dataset
+
+    dtype : numpy.dtype
+        Data type of the per-step datasets
+
+    timings : TimingGroup
+        Timing group in which the reading time and the number of bytes read are recorded. May be None.
+
+    """
+
+    def __init__(self, group, prefix, timings=None, timing_tag='read_steps'):
+        """
+        Constructor method
+
+        Parameters
+        ----------
+        group : h5py.Group
+            The HDF5 group containing the numbered datasets
+        prefix : str
+            Name of the datasets without the step number, e.g. 'snap_t_' or 'popu_t'
+        timings : TimingGroup, optional
+            Timing group in which to record the reading time and throughput
+        timing_tag : str, optional
+            Tag of the timing recorded in timings
+
+        """
+        self._group = group
+        self.prefix = prefix
+        self.timings = timings
+        self.timing_tag = timing_tag
+
+        pattern = re.compile(rf'^{re.escape(prefix)}(\d+)$')
+
+        datasets = {}
+        for name in group.keys():
+            match = pattern.match(name)
+            if match is not None:
+                datasets[int(match.group(1))] = name
+
+        if len(datasets) == 0:
+            raise KeyError(f'No datasets named {prefix}N found in {group.name}')
+
+        self.steps = np.array(sorted(datasets.keys()))
+        self._names = datasets
+        self._datasets = {}
+
+        first = self._dataset(int(self.steps[0]))
+        self.shape = first.shape
+        self.dtype = first.dtype
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __contains__(self, step):
+        return int(step) in self._names
+
+    def _dataset(self, step):
+        """
+        Return the h5py dataset of a step, opening it on first use
+        """
+        dataset = self._datasets.get(step)
+
+        if dataset is None:
+            if step not in self._names:
+                raise KeyError(f'Dataset {self.prefix}{step} not found in {self._group.name}')
+            dataset = self._group[self._names[step]]
+            self._datasets[step] = dataset
+
+        return dataset
+
+    def read(self, steps=None, out=None):
+        """
+        Method to read the datasets of a set of steps
+
+        Parameters
+        ----------
+        steps : array_like, optional
+            Step numbers to read (the N in the dataset names). Defaults to all of the steps.
+        out : np.ndarray, optional
+            Preallocated array of shape (len(steps),) + shape to read into
+
+        Returns
+        -------
+        data : np.ndarray
+            Array of shape (len(steps),) + shape, where data[i] holds the dataset of steps[i]
+
+        """
+        if steps is None:
+            steps = self.steps
+
+        steps = np.atleast_1d(np.asarray(steps, dtype=int))
+
+        if out is None:
+            out = np.empty((len(steps),) + self.shape, dtype=self.dtype)
+        elif out.shape != (len(steps),) + self.shape:
+            raise ValueError(f'out should have shape {(len(steps),) + self.shape}, not {out.shape}')
+
+        if self.timings is not None:
+            timing = self.timings.add(self.timing_tag, level=1)
+            timing.start()
+
+        direct = out.dtype == self.dtype and out.flags.c_contiguous
+
+        for i, step in enumerate(steps):
+            dataset = self._dataset(int(step))
+
+            if direct and dataset.dtype == out.dtype:
+                dataset.read_direct(out, dest_sel=np.s_[i])
+            else:
+                out[i] = dataset[()]
+
+        if self.timings is not None:
+            timing.stop()
+            timing.add_bytes(out.nbytes)
+
+        return out
+
+
+class StackedStepReader():
+    """
+    Reader for per-step data stored as a single dataset stacked along its first axis,
+    as in a repacked cdyna file. It has the same interface as StepDatasetReader.
+
+    Attributes
+    ----------
+    steps : np.ndarray
+        Array of the step numbers stored in the dataset
+
+    shape : tuple
+        Shape of the data of each step
+
+    dtype : numpy.dtype
+        Data type of the dataset
+
+    timings : TimingGroup
+        Timing group in which the reading time and the number of bytes read are recorded. May be None.
+
+    """
+
+    def __init__(self, dataset, first_step=1, timings=None, timing_tag='read_steps'):
+        """
+        Constructor method
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+            The dataset storing the steps along its first axis
+        first_step : int, optional
+            Step number of the first row of the dataset
+        timings : TimingGroup, optional
+            Timing group in which to record the reading time and throughput
+        timing_tag : str, optional
+            Tag of the timing recorded in timings
+
+        """
+        self._dataset = dataset
+        self.first_step = first_step
+        self.timings = timings
+        self.timing_tag = timing_tag
+
+        self.steps = np.arange(first_step, first_step + dataset.shape[0])
+        self.shape = dataset.shape[1:]
+        self.dtype = dataset.dtype
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __contains__(self, step):
+        return self.first_step <= int(step) < self.first_step + len(self.steps)
+
+    def read(self, steps=None, out=None):
+        """
+        Method to read the data of a set of steps. Consecutive steps are read with a single contiguous slice.
+
+        Parameters
+        ----------
+        steps : array_like, optional
+            Step numbers to read. Defaults to all of the steps.
+        out : np.ndarray, optional
+            Preallocated array of shape (len(steps),) + shape to read into
+
+        Returns
+        -------
+        data : np.ndarray
+            Array of shape (len(steps),) + shape, where data[i] holds the data of steps[i]
+
+        """
+        if steps is None:
+            steps = self.steps
+
+        steps = np.atleast_1d(np.asarray(steps, dtype=int))
+
+        if out is None:
+            out = np.empty((len(steps),) + self.shape, dtype=self.dtype)
+        elif out.shape != (len(steps),) + self.shape:
+            raise ValueError(f'out should have shape {(len(steps),) + self.shape}, not {out.shape}')
+
+        if len(steps) == 0:
+            return out
+
+        rows = steps - self.first_step
+
+        if np.any(rows < 0) or np.any(rows >= len(self.steps)):
+            raise KeyError(f'Steps should be between {self.steps[0]} and {self.steps[-1]}')
+
+        if self.timings is not None:
+            timing = self.timings.add(self.timing_tag, level=1)
+            timing.start()
+
+        # Split the sorted rows into blocks of consecutive rows and read each block with one slice
+        order = np.argsort(rows, kind='stable')
+        sorted_rows = rows[order]
+        breaks = np.nonzero(np.diff(sorted_rows) != 1)[0] + 1
+        direct = np.array_equal(order, np.arange(len(rows))) and out.dtype == self.dtype and out.flags.c_contiguous
+
+        for block in np.split(np.arange(len(rows)), breaks):
+            first, last = sorted_rows[block[0]], sorted_rows[block[-1]]
+
+            if direct:
+                self._dataset.read_direct(out, source_sel=np.s_[first:last + 1], dest_sel=np.s_[block[0]:block[-1] + 1])
+            else:
+                out[order[block]] = self._dataset[first:last + 1]
+
+        if self.timings is not None:
+            timing.stop()
+            timing.add_bytes(out.nbytes)
+
+        return out
+
+
+def open_step_reader(group, prefix, stacked_name=None, first_step=1, **kwargs):
+    """
+    Function to create a reader for the per-step data of a group, detecting its layout. If the group contains
+    a dataset named stacked_name, a StackedStepReader is returned, otherwise a StepDatasetReader.
+
+    Parameters
+    ----------
+    group : h5py.Group
+        The HDF5 group containing the per-step data
+    prefix : str
+        Name of the numbered datasets without the step number, e.g. 'snap_t_'
+    stacked_name : str, optional
+        Name of the stacked dataset, e.g. 'snap_t'
+    first_step : int, optional
+        Step number of the first row of the stacked dataset
+    **kwargs
+        Additional keyword arguments of the reader (timings, timing_tag)
+
+    Returns
+    -------
+    reader : StepDatasetReader or StackedStepReader
+
+    """
+    if stacked_name is not None and stacked_name in group:
+        return StackedStepReader(group[stacked_name], first_step=first_step, **kwargs)
+
+    return StepDatasetReader(group, prefix, **kwargs)
@@ -0,0 +1,256 @@
+"""
+Cache of parsed YAML files, stored as binary (pickle) sidecar files
+
+The cache is used transparently by io.open_yaml. Each cached file is keyed by the absolute path of the
+YAML file, and is only reused if the modification time, size and content hash of the YAML file are unchanged.
+When the total size of the cache exceeds a limit, the least recently used entries are evicted.
+
+The cache is off by default. It can be switched on globally with enable_cache(), or by setting the environment
+variable PERTURBOPY_YAML_CACHE=1, and for a single file with open_yaml(..., use_cache=True). The cache directory
+defaults to ~/.cache/perturbopy/yaml and can be set with the PERTURBOPY_CACHE_DIR environment variable or
+enable_cache(cache_dir=...).
+
+"""
+import os
+import pickle
+import hashlib
+import tempfile
+
+CACHE_VERSION = 1
+
+_settings = {
+    'enabled': os.environ.get('PERTURBOPY_YAML_CACHE', '0').lower() in ('1', 'true', 'yes', 'on'),
+    'cache_dir': os.environ.get('PERTURBOPY_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'perturbopy', 'yaml')),
+    'max_size': 2 * 1024**3,
+}
+
+_stats = {'hits': 0, 'misses': 0}
+
+# Running estimate of the size of the cache directory, so that the entries are only listed when it may be too large
+_size_estimate = {'cache_dir': None, 'size': 0}
+
+
+def enable_cache(cache_dir=None, max_size=None):
+    """
+    Function to switch on the cache of parsed YAML files
+
+    Parameters
+    ----------
+    cache_dir : str, optional
+       Directory in which to store the cached files
+    max_size : int, optional
+       Maximum total size of the cached files in bytes
+
+    """
+    _settings['enabled'] = True
+
+    if cache_dir is not None:
+        _settings['cache_dir'] = cache_dir
+
+    if max_size is not None:
+        _settings['max_size'] = max_size
+
+
+def disable_cache():
+    """
+    Function to switch off the cache of parsed YAML files
+    """
+    _settings['enabled'] = False
+
+
+def cache_enabled():
+    """
+    Function to check whether the cache of parsed YAML files is switched on
+
+    Returns
+    -------
+    enabled : bool
+
+    """
+    return _settings['enabled']
+
+
+def cache_info():
+    """
+    Function to get information on the cache
+
+    Returns
+    -------
+    info : dict
+       Dictionary with the cache directory, the maximum size, the current size in bytes,
+       and the number of hits and misses since the module was loaded
+
+    """
+    return {'cache_dir': _settings['cache_dir'], 'max_size': _settings['max_size'], 'size': _cache_size(),
+            'hits': _stats['hits'], 'misses': _stats['misses']}
+
+
+def clear_cache():
+    """
+    Function to remove all of the cached files
+    """
+    for entry in _cache_entries():
+        _remove(entry.path)
+
+    _size_estimate['cache_dir'] = None
+
+
+def _cache_entries():
+    if not os.path.isdir(_settings['cache_dir']):
+        return []
+
+    return [entry for entry in os.scandir(_settings['cache_dir']) if entry.is_file() and entry.name.endswith('.pkl')]
+
+
+def _cache_size():
+    return sum(entry.stat().st_size for entry in _cache_entries())
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _cache_path(file_name):
+    path_hash = hashlib.blake2b(os.path.abspath(file_name).encode(), digest_size=16).hexdigest()
+
+    return os.path.join(_settings['cache_dir'], f'{path_hash}.pkl')
+
+
+def _file_key(file_name):
+    """
+    Return the key (path, modification time, size, content hash) identifying the state of a file
+    """
+    stat = os.stat(file_name)
+    content_hash = hashlib.blake2b(digest_size=16)
+
+    with open(file_name, 'rb') as file:
+        for block in iter(lambda: file.read(2**20), b''):
+            content_hash.update(block)
+
+    return {'version': CACHE_VERSION, 'path': os.path.abspath(file_name), 'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size, 'content_hash': content_hash.hexdigest()}
+
+
+def load_cached(file_name):
+    """
+    Function to load the cached data of a YAML file
+
+    Parameters
+    ----------
+    file_name : str
+       Name of the YAML file
+
+    Returns
+    -------
+    data : dict or None
+       The cached data, or None if the file is not cached or has changed since it was cached
+
+    """
+    cache_path = _cache_path(file_name)
+
+    if not os.path.isfile(cache_path):
+        _stats['misses'] += 1
+        return None
+
+    try:
+        with open(cache_path, 'rb') as cache_file:
+            key = pickle.load(cache_file)
+
+            if key != _file_key(file_name):
+                _stats['misses'] += 1
+                return None
+
+            data = pickle.load(cache_file)
+
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, TypeError, ValueError):
+        _remove(cache_path)
+        _stats['misses'] += 1
+        return None
+
+    # Mark the entry as recently used for the eviction
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+
+    _stats['hits'] += 1
+
+    return data
+
+
+def store_cached(file_name, data):
+    """
+    Function to store the parsed data of a YAML file in the cache, then evict the least recently used
+    entries if the cache is too large. Errors when writing the cache are ignored.
+
+    Parameters
+    ----------
+    file_name : str
+       Name of the YAML file
+    data : dict
+       The parsed data of the YAML file
+
+    """
+    cache_dir = _settings['cache_dir']
+    cache_path = _cache_path(file_name)
+    tmp_path = None
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        key = _file_key(file_name)
+
+        # Write to a temporary file first, so that concurrent readers never see a partial entry
+        tmp_fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+
+        with os.fdopen(tmp_fd, 'wb') as cache_file:
+            pickle.dump(key, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        entry_size = os.path.getsize(tmp_path)
+        replaced_size = os.path.getsize(cache_path) if os.path.isfile(cache_path) else 0
+
+        os.replace(tmp_path, cache_path)
+
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        if tmp_path is not None:
+            _remove(tmp_path)
+        return
+
+    if _size_estimate['cache_dir'] != cache_dir:
+        _size_estimate.update({'cache_dir': cache_dir, 'size': _cache_size()})
+    else:
+        _size_estimate['size'] += entry_size - replaced_size
+
+    if _size_estimate['size'] > _settings['max_size']:
+        _size_estimate['size'] = evict(_settings['max_size'])
+
+
+def evict(max_size):
+    """
+    Function to remove the least recently used cached files until the cache is smaller than max_size
+
+    Parameters
+    ----------
+    max_size : int
+       Maximum total size of the cached files in bytes
+
+    Returns
+    -------
+    size : int
+       Total size of the remaining cached files in bytes
+
+    """
+    entries = sorted(_cache_entries(), key=lambda entry: entry.stat().st_mtime)
+    size = sum(entry.stat().st_size for entry in entries)
+
+    for entry in entries:
+        if size <= max_size:
+            break
+
+        size -= entry.stat().st_size
+        _remove(entry.path)
+
+    return size
@@ -10,7 +10,7 @@ from .calc_modes.imsigma import Imsigma
 from .calc_modes.dyna_run import DynaRun
 from .calc_modes.dyna_pp import DynaPP
 
-from .dbs.units_dict import UnitsDict
+from .dbs.units_dict import UnitsDict, UnitsArray
 from .dbs.recip_pt_db import RecipPtDB
 
 from .utils import constants, plot_tools, lattice
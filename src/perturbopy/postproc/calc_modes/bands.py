@@ -1,11 +1,13 @@
 import numpy as np
+import warnings
 from scipy.optimize import curve_fit
 from perturbopy.postproc.calc_modes.calc_mode import CalcMode
 from perturbopy.postproc.utils.constants import energy_conversion_factor, length_conversion_factor
-from perturbopy.postproc.dbs.units_dict import UnitsDict
+from perturbopy.postproc.dbs.units_dict import UnitsArray
 from perturbopy.postproc.dbs.recip_pt_db import RecipPtDB
 from perturbopy.postproc.utils.plot_tools import plot_dispersion, plot_recip_pt_labels
 from perturbopy.postproc.utils.lattice import reshape_points, cryst2cart
+from perturbopy.postproc.utils.interpolation import PathSpline
 
 
 class Bands(CalcMode):
@@ -21,11 +23,14 @@ class Bands(CalcMode):
     ----------
     kpt : RecipPtDB
        Database for the k-points used in the bands calculation.
-    bands : UnitsDict
-       Database for the band energies computed by the bands calculation.
+    bands : UnitsArray
+       Database for the band energies computed by the bands calculation. The keys are the band index,
+       and bands.array holds all of the energies with shape num_bands x num_kpoints.
 
     """
 
+    yaml_sections = ('bands',)
+
     def __init__(self, pert_dict):
         """
         Constructor method
@@ -46,7 +51,10 @@ class Bands(CalcMode):
         energy_units = self._pert_dict['bands'].pop('band units')
 
         self.kpt = RecipPtDB.from_lattice(kpoint, kpoint_units, self.lat, self.recip_lat, kpath, kpath_units)
-        self.bands = UnitsDict.from_dict(energies_dict, energy_units)
+        self.bands = UnitsArray.from_dict(energies_dict, energy_units)
+
+        self._spline = None
+        self._spline_key = None
 
     def indirect_bandgap(self, n_lower, n_upper):
         """
@@ -122,6 +130,88 @@ class Bands(CalcMode):
 
         return gap, kpoint
 
+    def band_edges(self, degeneracy_tol=1e-4):
+        """
+        Method to compute the minimum and maximum of every band, with their k-points, in one pass over all bands.
+
+        Parameters
+        ----------
+        degeneracy_tol : float, optional
+           Bands whose energies at the k-point of an extremum are within degeneracy_tol (in units of bands.units)
+           of the extremum are counted as degenerate with it
+
+        Returns
+        -------
+        edges : np.ndarray
+           Structured array with one row per band and the fields: band, min, min_kpt_index, min_kpoint,
+           min_degeneracy, max, max_kpt_index, max_kpoint, max_degeneracy. The degeneracies count the bands
+           degenerate at the extremum, including the band itself.
+
+        """
+        energies = self.bands.array
+        band_range = np.arange(energies.shape[0])
+
+        min_indices = np.argmin(energies, axis=1)
+        max_indices = np.argmax(energies, axis=1)
+        minima = energies[band_range, min_indices]
+        maxima = energies[band_range, max_indices]
+
+        edges = np.zeros(energies.shape[0], dtype=[('band', int), ('min', float), ('min_kpt_index', int),
+                                                   ('min_kpoint', float, (3,)), ('min_degeneracy', int),
+                                                   ('max', float), ('max_kpt_index', int),
+                                                   ('max_kpoint', float, (3,)), ('max_degeneracy', int)])
+
+        edges['band'] = self.bands.index_keys[0]
+        edges['min'] = minima
+        edges['min_kpt_index'] = min_indices
+        edges['min_kpoint'] = np.transpose(self.kpt.points[:, min_indices])
+        edges['min_degeneracy'] = np.sum(np.abs(energies[:, min_indices] - minima) <= degeneracy_tol, axis=0)
+        edges['max'] = maxima
+        edges['max_kpt_index'] = max_indices
+        edges['max_kpoint'] = np.transpose(self.kpt.points[:, max_indices])
+        edges['max_degeneracy'] = np.sum(np.abs(energies[:, max_indices] - maxima) <= degeneracy_tol, axis=0)
+
+        return edges
+
+    def gap_table(self):
+        """
+        Method to compute the direct and indirect gaps between every pair of adjacent bands at once,
+        with the same definitions as direct_bandgap and indirect_bandgap.
+
+        Returns
+        -------
+        gaps : np.ndarray
+           Structured array with one row per pair of adjacent bands and the fields: n_lower, n_upper,
+           direct_gap, direct_kpt_index, direct_kpoint, indirect_gap, lower_kpt_index, lower_kpoint,
+           upper_kpt_index, upper_kpoint. The lower (upper) k-point is the maximum (minimum) of the lower (upper) band.
+
+        """
+        energies = self.bands.array
+        pair_range = np.arange(energies.shape[0] - 1)
+
+        transitions = energies[1:] - energies[:-1]
+        direct_indices = np.argmin(transitions, axis=1)
+        lower_indices = np.argmax(energies[:-1], axis=1)
+        upper_indices = np.argmin(energies[1:], axis=1)
+
+        gaps = np.zeros(len(pair_range), dtype=[('n_lower', int), ('n_upper', int),
+                                                ('direct_gap', float), ('direct_kpt_index', int), ('direct_kpoint', float, (3,)),
+                                                ('indirect_gap', float), ('lower_kpt_index', int), ('lower_kpoint', float, (3,)),
+                                                ('upper_kpt_index', int), ('upper_kpoint', float, (3,))])
+
+        gaps['n_lower'] = self.bands.index_keys[0][:-1]
+        gaps['n_upper'] = self.bands.index_keys[0][1:]
+        gaps['direct_gap'] = transitions[pair_range, direct_indices]
+        gaps['direct_kpt_index'] = direct_indices
+        gaps['direct_kpoint'] = np.transpose(self.kpt.points[:, direct_indices])
+        gaps['indirect_gap'] = energies[pair_range + 1, upper_indices] - energies[pair_range, lower_indices]
+        gaps['lower_kpt_index'] = lower_indices
+        gaps['lower_kpoint'] = np.transpose(self.kpt.points[:, lower_indices])
+        gaps['upper_kpt_index'] = upper_indices
+        gaps['upper_kpoint'] = np.transpose(self.kpt.points[:, upper_indices])
+
+        return gaps
+
     def effective_mass(self, n, kpoint, max_distance, direction=None, ax=None, c='r'):
         """
         Method to compute the effective mass at a k-point, approximated with a parabolic fit.
@@ -220,6 +310,189 @@ class Bands(CalcMode):
 
         return effective_mass
 
+    def effective_mass_tensor(self, n, kpoints, max_distance, fit_gradient=False, rcond=1e-3):
+        """
+        Method to compute the inverse effective mass tensors of several bands at several k-points, e.g. band extrema,
+        by a least-squares fit of E(k) = E(k0) + 1/2 (k - k0)^T M^-1 (k - k0) over all of the k-points within max_distance.
+        The neighbours of all of the k-points are found with one query of the k-point KD-tree, and each fit is solved
+        for all of the bands at once.
+
+        The fit is restricted to the combinations of the components that are sampled by the neighbouring k-points.
+        If the neighbours do not determine all six components, e.g. for k-points along a path through the extremum
+        in fewer than six independent directions, the undetermined components are set to NaN and a warning is issued.
+
+        Parameters
+        ----------
+        n : int or list of int
+           Band index or indices
+
+        kpoints : array_like
+           The k-point(s) at which to compute the tensors, in the units of kpt.units
+
+        max_distance : float
+           Maximum distance, in the units of kpt.units, between a k-point and the neighbours included in its fit
+
+        fit_gradient : bool, optional
+           If True, a linear term is also fitted, e.g. for k-points that are not exactly at an extremum
+
+        rcond : float, optional
+           Threshold, relative to the largest singular value of the fit, below which the combinations of the
+           components are considered not sampled, e.g. due to the rounding of the k-point coordinates
+
+        Returns
+        -------
+        inverse_mass : array
+           Array of shape (number of k-points, number of bands, 3, 3) of the inverse effective mass tensors
+           in cartesian coordinates, in units of 1 / electron mass
+
+        """
+        kpoints = reshape_points(kpoints)
+        bands_list = [n] if np.ndim(n) == 0 else list(n)
+
+        centers = self.kpt.find_indices(kpoints)
+
+        if np.any(centers < 0):
+            raise ValueError('The k-points should be k-points of the bands calculation')
+
+        neighbours = self.kpt.tree.query_ball_point(np.transpose(self.kpt.points[:, centers]), max_distance)
+
+        # Energies in Hartree and k-points in 1/bohr (atomic units)
+        rows = [self.bands.index(band)[0] for band in bands_list]
+        energies = self.bands.array[rows] * energy_conversion_factor(self.bands.units, 'hartree')
+        alat = self.alat * length_conversion_factor(self.alat_units, 'bohr')
+        points = self.kpt.points_cart * (2 * np.pi / alat)
+
+        # Pairs (i, j) of the independent components of the symmetric tensor
+        pairs = [(0, 0), (1, 1), (2, 2), (0, 1), (0, 2), (1, 2)]
+        inverse_mass = np.zeros((len(centers), len(bands_list), 3, 3))
+
+        for ic, center in enumerate(centers):
+            dk = points[:, neighbours[ic]] - points[:, [center]]
+            fit_points = np.linalg.norm(dk, axis=0) > 0
+            dk = dk[:, fit_points]
+
+            # Distances scaled to at most 1, so that rcond does not depend on max_distance
+            scale = np.max(np.linalg.norm(dk, axis=0), initial=0.0)
+            dk = dk / scale if scale > 0 else dk
+
+            design = [(0.5 if i == j else 1.0) * dk[i] * dk[j] for i, j in pairs]
+            scales = [scale**2] * len(pairs)
+
+            if fit_gradient:
+                design.extend(dk)
+                scales.extend([scale] * 3)
+
+            delta_energies = energies[:, np.array(neighbours[ic])[fit_points]] - energies[:, [center]]
+
+            # Least-squares solution in the subspace of the parameters sampled by the neighbours
+            u, s, vt = np.linalg.svd(np.transpose(design), full_matrices=True)
+            rank = np.sum(s > rcond * s[0]) if len(s) > 0 and s[0] > 0 else 0
+            coefficients = vt[:rank].T @ ((u[:, :rank].T @ np.transpose(delta_energies)) / s[:rank, np.newaxis])
+            coefficients = coefficients / np.array(scales)[:, np.newaxis]
+
+            # A component is determined if it is orthogonal to all of the unsampled directions of the parameters
+            undetermined = np.linalg.norm(vt[rank:, :len(pairs)], axis=0) > rcond
+            coefficients[:len(pairs)][undetermined] = np.nan
+
+            if rank < len(design):
+                warnings.warn(f'The neighbours of k-point {ic} determine only {rank} of the {len(design)} fit parameters; '
+                              'the undetermined components of the inverse mass tensor are set to NaN', UserWarning)
+
+            for (i, j), coefficient in zip(pairs, coefficients[:len(pairs)]):
+                inverse_mass[ic, :, i, j] = coefficient
+                inverse_mass[ic, :, j, i] = coefficient
+
+        return inverse_mass
+
+    @property
+    def spline(self):
+        """
+        Piecewise cubic spline of all of the band energies along the k-path, fitted on first use and refitted
+        when the units of the energies or k-points change.
+        """
+        key = (self.bands.units, self.kpt.units, tuple(self.kpt.labels.keys()))
+
+        if self._spline is None or self._spline_key != key:
+            # Split the path at the labelled points, as well as at changes of direction
+            split_indices = [i for point in self.kpt.labels.values() for i in self.kpt.find(point)]
+
+            self._spline = PathSpline(self.kpt.path, self.kpt.points, self.bands.array, split_indices)
+            self._spline_key = key
+
+        return self._spline
+
+    def interpolate(self, path_coords, n=None, derivative=0):
+        """
+        Method to interpolate the band energies, or their derivatives, at arbitrary path coordinates
+        with a piecewise cubic spline along each straight segment of the k-path.
+
+        Parameters
+        ----------
+        path_coords : array_like
+           The M path coordinates at which to evaluate the energies
+
+        n : int or list of int, optional
+           Band index or indices. Defaults to all of the bands.
+
+        derivative : int, optional
+           Order of the derivative with respect to the path coordinate, from 0 to 3
+
+        Returns
+        -------
+        energies : array
+           Array of shape len(n) x M (or M for a single band) in units of bands.units per path units**derivative
+
+        """
+        energies = self.spline(path_coords, derivative)
+
+        return self._select_bands(energies, n)
+
+    def interpolate_kpoints(self, kpoints, n=None, derivative=0, max_dist=0.025):
+        """
+        Method to interpolate the band energies, or their derivatives, at k-points on the k-path.
+        Each k-point is projected onto the nearest straight line between consecutive k-points of the path.
+
+        Parameters
+        ----------
+        kpoints : array_like
+           Array of the M k-points in the units of kpt.units
+
+        n : int or list of int, optional
+           Band index or indices. Defaults to all of the bands.
+
+        derivative : int, optional
+           Order of the derivative with respect to the path coordinate, from 0 to 3
+
+        max_dist : float, optional
+           The maximum distance between a k-point and the path
+
+        Returns
+        -------
+        energies : array
+           Array of shape len(n) x M (or M for a single band), with nan for k-points further than max_dist from the path
+
+        """
+        path_coords = self.spline.project(kpoints, max_dist)
+        on_path = ~np.isnan(path_coords)
+
+        energies = np.full(self.bands.array.shape[:1] + path_coords.shape, np.nan)
+        energies[:, on_path] = self.spline(path_coords[on_path], derivative)
+
+        return self._select_bands(energies, n)
+
+    def _select_bands(self, energies, n):
+        """
+        Helper method to select the rows of an array of energies of all bands corresponding to band indices
+
+        """
+        if n is None:
+            return energies
+
+        if np.ndim(n) == 0:
+            return energies[self.bands.index(n)[0]]
+
+        return energies[[self.bands.index(band)[0] for band in n]]
+
     def plot_bands(self, ax, show_kpoint_labels=True, **kwargs):
         """
         Method to plot the band structure.
@@ -1,6 +1,7 @@
 import os
 import numpy as np
-from perturbopy.io_utils.io import open_yaml
+from perturbopy.io_utils.io import open_yaml, read_yaml_value
+from perturbopy.postproc.utils.timing import TimingGroup
 
 
 class CalcMode():
@@ -39,6 +40,9 @@ class CalcMode():
 
     """
 
+    # Top-level sections of the YAML file read by the constructor, in addition to basic data and input parameters
+    yaml_sections = ()
+
     def __init__(self, pert_dict):
         """
         Constructor method
@@ -78,7 +82,7 @@ class CalcMode():
         self._pert_dict = pert_dict
 
     @classmethod
-    def from_yaml(cls, yaml_path='pert_output.yml'):
+    def from_yaml(cls, yaml_path='pert_output.yml', sections=None):
         """
         Class method to create a CalcMode object from the YAML file
         generated by a Perturbo calculation.
@@ -88,6 +92,11 @@ class CalcMode():
         yaml_path : str, optional
            Path to the YAML file generated by a Perturbo calculation
 
+        sections : list of str, optional
+           Additional top-level sections of the YAML file to load, e.g. ['timings']. If given, only these sections
+           and the sections needed by the calculation mode (see yaml_sections) are loaded, and the other sections are
+           skipped without being constructed. By default, the whole file is loaded.
+
         Returns
         -------
         calc_mode : CalcMode
@@ -98,6 +107,116 @@ class CalcMode():
         if not os.path.isfile(yaml_path):
             raise FileNotFoundError(f'File {yaml_path} not found')
 
-        yaml_dict = open_yaml(yaml_path)
+        yaml_dict = open_yaml(yaml_path, sections=cls.required_sections(sections))
 
         return cls(yaml_dict)
+
+    @classmethod
+    def required_sections(cls, sections=()):
+        """
+        Class method to list the top-level sections of the YAML file to load
+
+        Parameters
+        ----------
+        sections : list of str, optional
+           Additional top-level sections to load. If None, the whole file is loaded.
+
+        Returns
+        -------
+        sections : list of str or None
+           The sections needed by the calculation mode followed by the additional sections,
+           or None if the whole file is loaded
+
+        """
+        if sections is None:
+            return None
+
+        if isinstance(sections, str):
+            sections = [sections]
+
+        required = ['basic data', 'input parameters'] + list(cls.yaml_sections)
+
+        return required + [section for section in sections if section not in required]
+
+    @classmethod
+    def load(cls, yaml_path='pert_output.yml', sections=None):
+        """
+        Class method to create an object of the calculation mode class matching the calc_mode of a YAML file
+        generated by a Perturbo calculation, e.g. a Bands object for a bands calculation. The calc_mode is read by
+        streaming the YAML file up to the input parameters, then the file is parsed once.
+        The time spent in each phase is stored in the timings attribute of the object.
+
+        Parameters
+        ----------
+        yaml_path : str, optional
+           Path to the YAML file generated by a Perturbo calculation
+
+        sections : list of str, optional
+           Additional top-level sections of the YAML file to load, see from_yaml. By default, the whole file is loaded.
+
+        Returns
+        -------
+        calc_mode : CalcMode
+           Object of the CalcMode subclass of the calculation
+
+        Raises
+        ------
+        ValueError
+           If the calculation mode cannot be loaded from the YAML file alone, e.g. dynamics-run
+
+        """
+        if not os.path.isfile(yaml_path):
+            raise FileNotFoundError(f'File {yaml_path} not found')
+
+        timings = TimingGroup('load')
+
+        with timings.add('read_calc_mode'):
+            calc_mode = read_yaml_value(yaml_path, ['input parameters', 'after conversion', 'calc_mode'])
+
+        calc_mode_cls = calc_mode_class(calc_mode)
+
+        if calc_mode_cls is None:
+            raise ValueError(f'Calculation mode {calc_mode} cannot be loaded from the YAML file alone')
+
+        if not issubclass(calc_mode_cls, cls):
+            raise ValueError(f'Calculation mode {calc_mode} corresponds to {calc_mode_cls.__name__}, not {cls.__name__}')
+
+        with timings.add('parse_yaml'):
+            yaml_dict = open_yaml(yaml_path, sections=calc_mode_cls.required_sections(sections))
+
+        with timings.add('create'):
+            calc = calc_mode_cls(yaml_dict)
+
+        if hasattr(calc, 'timings'):
+            calc.timings.merge(timings)
+        else:
+            calc.timings = timings
+
+        return calc
+
+
+def calc_mode_class(calc_mode):
+    """
+    Function to find the calculation mode class corresponding to the calc_mode of a Perturbo calculation
+
+    Parameters
+    ----------
+    calc_mode : str
+       The calc_mode input parameter, e.g. 'bands' or 'trans-ita'
+
+    Returns
+    -------
+    calc_mode_class : type or None
+       The CalcMode subclass, or None if the calculation mode cannot be loaded from the YAML file alone
+
+    """
+    # Imported here since the subclasses import this module
+    from perturbopy.postproc.calc_modes.bands import Bands
+    from perturbopy.postproc.calc_modes.phdisp import Phdisp
+    from perturbopy.postproc.calc_modes.ephmat import Ephmat
+    from perturbopy.postproc.calc_modes.imsigma import Imsigma
+    from perturbopy.postproc.calc_modes.trans import Trans
+
+    classes = {'bands': Bands, 'phdisp': Phdisp, 'ephmat': Ephmat, 'imsigma': Imsigma, 'trans': Trans}
+
+    return classes.get(calc_mode.split('-')[0])
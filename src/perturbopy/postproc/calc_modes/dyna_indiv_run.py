@@ -1,4 +1,204 @@
 import numpy as np
+from numpy.lib.mixins import NDArrayOperatorsMixin
+from perturbopy.io_utils.step_reader import open_step_reader
+
+
+def _materialize(value):
+    """
+    Function to replace the SnapTView objects in a (nested) argument of a NumPy function by the arrays they view
+    """
+    if isinstance(value, SnapTView):
+        return value.load()
+
+    if isinstance(value, (list, tuple)):
+        return type(value)(_materialize(item) for item in value)
+
+    return value
+
+
+class SnapTView(NDArrayOperatorsMixin):
+    """
+    Lazy, read-only view of the distribution functions of a dynamics run, backed by
+    the group of a cdyna HDF5 file. Snapshots are only read from the file when indexed.
+    Both the original cdyna layout (one snap_t_N dataset per step) and the repacked layout
+    (one snap_t dataset per run) are supported.
+
+    The view is indexed like the array it replaces, with shape num_bands x num_kpoints x num_steps.
+    For example, snap_t[0, :, -10:] reads only the last 10 snapshots. Arithmetic operators, NumPy functions
+    and ndarray methods (e.g. snap_t * 2, np.sum(snap_t, axis=2) or snap_t.max()) read all of the snapshots
+    and operate on the full array, except for the metadata (shape, ndim, size, dtype, itemsize, nbytes, and
+    np.shape, np.ndim and np.size), which never read the file.
+
+    Attributes
+    ----------
+    shape : tuple
+        Shape of the distribution function array, (num_bands, num_kpoints, num_steps)
+
+    steps : np.ndarray
+        Indices of the time steps of the run exposed along the last axis, starting at 0
+
+    dtype : numpy.dtype
+        Data type of the distribution functions
+
+    """
+
+    def __init__(self, dyna_group, num_steps, steps=None, timings=None):
+        """
+        Constructor method
+
+        Parameters
+        ----------
+        dyna_group : h5py.Group
+            The dynamics_run_N group of an open cdyna HDF5 file
+        num_steps : int
+            Number of time steps in the run
+        steps : array_like, optional
+            Indices of the time steps exposed by the view, starting at 0. Defaults to all of the steps.
+        timings : TimingGroup, optional
+            Timing group in which to record the time spent reading snapshots
+
+        """
+
+        # Repacked cdyna files store all of the snapshots of a run in one snap_t dataset
+        self._reader = open_step_reader(dyna_group, 'snap_t_', stacked_name='snap_t', first_step=1,
+                                        timings=timings, timing_tag='read_snap_t')
+
+        numk, numb = self._reader.shape
+
+        if steps is None:
+            steps = np.arange(num_steps)
+
+        self.steps = np.asarray(steps, dtype=int)
+        self.shape = (numb, numk, len(self.steps))
+        self.dtype = self._reader.dtype
+
+    @property
+    def ndim(self):
+        return 3
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def itemsize(self):
+        return self.dtype.itemsize
+
+    @property
+    def nbytes(self):
+        return self.size * self.itemsize
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __repr__(self):
+        return f'SnapTView(shape={self.shape}, dtype={self.dtype})'
+
+    def read_steps(self, steps):
+        """
+        Method to read a set of snapshots from the HDF5 file
+
+        Parameters
+        ----------
+        steps : array_like
+            Positions along the last axis of the view of the time steps to read
+
+        Returns
+        -------
+        snaps : np.ndarray
+            Array of shape num_bands x num_kpoints x len(steps)
+
+        """
+        steps = self.steps[np.atleast_1d(steps)]
+
+        # The snapshots are numbered from 1 and stored as num_kpoints x num_bands
+        snaps = self._reader.read(steps + 1)
+
+        return np.transpose(snaps, (2, 1, 0))
+
+    def __getitem__(self, key):
+        """
+        Method to index the distribution functions. Only the time steps selected
+        by the last index are read from the HDF5 file.
+
+        """
+        if not isinstance(key, tuple):
+            key = (key,)
+
+        if any(k is None for k in key):
+            raise IndexError('SnapTView does not support np.newaxis')
+
+        if Ellipsis in key:
+            iell = key.index(Ellipsis)
+            fill = (slice(None),) * (self.ndim - len(key) + 1)
+            key = key[:iell] + fill + key[iell + 1:]
+
+        if len(key) > self.ndim:
+            raise IndexError(f'too many indices for SnapTView: SnapTView is {self.ndim}-dimensional, but {len(key)} were indexed')
+
+        key = key + (slice(None),) * (self.ndim - len(key))
+        time_key = key[2]
+
+        steps = np.arange(self.shape[2])[time_key]
+
+        if isinstance(time_key, slice) or np.ndim(steps) == 0:
+            # Slices never repeat a step, and integers select a single one
+            snaps = self.read_steps(steps)
+            local_key = slice(None) if isinstance(time_key, slice) else 0
+        else:
+            unique_steps, local_key = np.unique(steps, return_inverse=True)
+            snaps = self.read_steps(unique_steps)
+            local_key = np.reshape(local_key, np.shape(steps))
+
+        return snaps[key[0], key[1], local_key]
+
+    def __array__(self, dtype=None, copy=None):
+        snaps = self[...]
+
+        if dtype is not None:
+            snaps = snaps.astype(dtype, copy=False)
+
+        return snaps
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if any(isinstance(out, SnapTView) for out in kwargs.get('out', ())):
+            raise TypeError('SnapTView is read-only')
+
+        return getattr(ufunc, method)(*_materialize(inputs), **kwargs)
+
+    def __array_function__(self, func, types, args, kwargs):
+        # Metadata queries are answered without reading the snapshots
+        if func is np.shape:
+            return self.shape
+
+        if func is np.ndim:
+            return self.ndim
+
+        if func is np.size:
+            axis = args[1] if len(args) > 1 else kwargs.get('axis')
+            return self.size if axis is None else self.shape[axis]
+
+        return func(*_materialize(args), **{key: _materialize(value) for key, value in kwargs.items()})
+
+    def __getattr__(self, name):
+        # Only called for attributes that are not defined by the view: ndarray methods and attributes
+        # such as sum, reshape or T are taken from the full array
+        if not name.startswith('_') and hasattr(np.ndarray, name):
+            return getattr(self.load(), name)
+
+        raise AttributeError(f"'SnapTView' object has no attribute '{name}'")
+
+    def load(self):
+        """
+        Method to read all of the snapshots into memory
+
+        Returns
+        -------
+        snap_t : np.ndarray
+            Array of shape num_bands x num_kpoints x num_steps
+
+        """
+        return self[...]
 
 
 class DynaIndivRun():
@@ -13,23 +213,40 @@ class DynaIndivRun():
     time_step : float
         Time step in fs
 
-    snap_t : np.ndarray
-        Distribution function computed at each time step
+    snap_t : np.ndarray or SnapTView
+        Distribution function computed at each loaded time step, with shape num_bands x num_kpoints x len(steps).
+        When the run is loaded lazily, this is a SnapTView which reads snapshots from the HDF5 file on indexing.
 
     efield : np.ndarray
         Electric field assumed during the calculation. Default value is [0, 0, 0].
+
+    steps : np.ndarray
+        Indices of the loaded time steps within the run, starting at 0. All steps are loaded by default.
+
+    step_offset : int
+        Number of time steps in the previous runs of the simulation
+
+    time_offset : float
+        Total time of the previous runs of the simulation, in fs
+
+    times : np.ndarray
+        Times of the loaded snapshots in fs, measured from the beginning of the first run
     """
 
-    def __init__(self, num_steps, time_step, snap_t, time_units='fs', efield=None):
+    def __init__(self, num_steps, time_step, snap_t, time_units='fs', efield=None, steps=None, step_offset=0, time_offset=0.0):
         """
         Constructor method
-        
+
         Parameters
         ----------
         num_steps : int
         time_step : float
             Time step in fs
-        snap_t : array_like
+        snap_t : array_like or SnapTView
+        steps : array_like, optional
+            Indices of the time steps stored in snap_t, starting at 0
+        step_offset : int, optional
+        time_offset : float, optional
 
         """
 
@@ -37,3 +254,146 @@ class DynaIndivRun():
         self.time_step = time_step
         self.snap_t = snap_t
         self.efield = efield
+
+        if steps is None:
+            steps = np.arange(num_steps)
+
+        self.steps = np.asarray(steps, dtype=int)
+        self.step_offset = step_offset
+        self.time_offset = time_offset
+        self.times = time_offset + (self.steps + 1) * time_step
+
+    @property
+    def is_lazy(self):
+        """
+        True if the distribution functions are read from the HDF5 file on demand
+        """
+        return isinstance(self.snap_t, SnapTView)
+
+    def load_snap_t(self):
+        """
+        Method to read all of the distribution functions of a lazily loaded run into memory
+
+        Returns
+        -------
+        snap_t : np.ndarray
+            Array of shape num_bands x num_kpoints x num_steps
+
+        """
+        if self.is_lazy:
+            self.snap_t = self.snap_t.load()
+
+        return self.snap_t
+
+    def iter_snap_t(self, chunk_size=64):
+        """
+        Method to iterate over the distribution functions in chunks of time steps. For lazily loaded runs,
+        only one chunk of snapshots is held in memory at a time.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of time steps per chunk
+
+        Yields
+        ------
+        time_slice : slice
+            Positions of the chunk along the last axis of snap_t
+        snaps : np.ndarray
+            Distribution functions of the chunk, with shape num_bands x num_kpoints x chunk length
+
+        """
+        num_loaded = self.snap_t.shape[2]
+        chunk_size = max(1, int(chunk_size))
+
+        for first in range(0, num_loaded, chunk_size):
+            time_slice = slice(first, min(first + chunk_size, num_loaded))
+            yield time_slice, self.snap_t[:, :, time_slice]
+
+    def reduce(self, reducer, chunk_size=64):
+        """
+        Method to apply a reduction to each snapshot, streaming the snapshots in chunks of time steps.
+
+        Parameters
+        ----------
+        reducer : callable
+            Function taking an array of snapshots of shape num_bands x num_kpoints x n and returning
+            an array whose last axis has length n, i.e. one result per snapshot.
+        chunk_size : int, optional
+            Number of time steps per chunk. The peak memory is bounded by one chunk of snapshots.
+
+        Returns
+        -------
+        reduced : np.ndarray
+            The results of the reduction, concatenated along the last (time) axis
+
+        """
+        reduced = [np.asarray(reducer(snaps)) for _, snaps in self.iter_snap_t(chunk_size)]
+
+        # No selected steps: reduce an empty chunk to get the shape of the results
+        if len(reduced) == 0:
+            return np.asarray(reducer(np.zeros(self.snap_t.shape[:2] + (0,), dtype=self.snap_t.dtype)))
+
+        return np.concatenate(reduced, axis=-1)
+
+    def carrier_number(self, chunk_size=64):
+        """
+        Method to compute the number of carriers at each time step, i.e. the sum of the
+        distribution function over bands and k-points.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of time steps per chunk
+
+        Returns
+        -------
+        carrier_number : np.ndarray
+            Array of length len(steps)
+
+        """
+        return self.reduce(lambda snaps: np.sum(snaps, axis=(0, 1)), chunk_size)
+
+    def band_population(self, chunk_size=64):
+        """
+        Method to compute the band-resolved carrier population at each time step, i.e. the sum of the
+        distribution function over k-points.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of time steps per chunk
+
+        Returns
+        -------
+        band_population : np.ndarray
+            Array of shape num_bands x len(steps)
+
+        """
+        return self.reduce(lambda snaps: np.sum(snaps, axis=1), chunk_size)
+
+    def mean_energy(self, energies, chunk_size=64):
+        """
+        Method to compute the average carrier energy at each time step, weighted by the distribution function.
+
+        Parameters
+        ----------
+        energies : array_like
+            Band energies of shape num_bands x num_kpoints
+        chunk_size : int, optional
+            Number of time steps per chunk
+
+        Returns
+        -------
+        mean_energy : np.ndarray
+            Array of length len(steps), in the units of energies
+
+        """
+        energies = np.asarray(energies)
+
+        def energy_and_number(snaps):
+            return np.stack([np.einsum('bk,bkt->t', energies, snaps), np.sum(snaps, axis=(0, 1))])
+
+        total_energy, number = self.reduce(energy_and_number, chunk_size)
+
+        return total_energy / number
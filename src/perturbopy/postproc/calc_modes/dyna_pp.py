@@ -2,6 +2,8 @@ import numpy as np
 import os
 from perturbopy.postproc.calc_modes.calc_mode import CalcMode
 from perturbopy.io_utils.io import open_yaml, open_hdf5, close_hdf5
+from perturbopy.io_utils.step_reader import StepDatasetReader
+from perturbopy.postproc.utils.timing import TimingGroup
 
 
 class DynaPP(CalcMode):
@@ -28,29 +30,40 @@ class DynaPP(CalcMode):
 
     """
 
+    yaml_sections = ('dynamics-pp',)
+
     def __init__(self, popu_file, pert_dict):
         """
         Constructor method
         
         Parameters
         ----------
+        popu_file : h5py.File
+            The open HDF5 file generated by the dynamics-pp calculation. If None, the times, energy grid
+            and populations are not set; see from_popu.
         pert_dict : dict
             Dictionary containing the inputs and outputs from the dynamics-pp calculation.
         """
+        self.timings = TimingGroup("dynamics-pp")
+
         super().__init__(pert_dict)
 
         if self.calc_mode != 'dynamics-pp':
             raise ValueError('Calculation mode for a DynamicsPPCalcMode object should be "dynamics-pp"')
 
         self.time_units = 'fs'
-        self.times = popu_file['times_fs'][()]
         self.energy_units = 'ev'
-        self.energy_grid = popu_file['energy_grid_ev'][()]
 
-        self.popu = np.zeros((len(self.energy_grid), len(self.times)))
+        if popu_file is not None:
+            self.times = popu_file['times_fs'][()]
+            self.energy_grid = popu_file['energy_grid_ev'][()]
 
-        for itime, time in enumerate(self.times):
-            self.popu[:, itime] = popu_file['energy_distribution'][f'popu_t{itime}'][()]
+            popu_reader = StepDatasetReader(popu_file['energy_distribution'], 'popu_t', timings=self.timings, timing_tag='read_popu')
+            self.popu = popu_reader.read(np.arange(len(self.times))).T
+        else:
+            self.times = None
+            self.energy_grid = None
+            self.popu = None
 
         if 'concentration' in pert_dict['dynamics-pp'].keys():
             self.conc = pert_dict['dynamics-pp'].pop('concentration')
@@ -67,7 +80,41 @@ class DynaPP(CalcMode):
             self.drift_vel_units = None
 
     @classmethod
-    def from_hdf5_yaml(cls, popu_path, yaml_path='pert_output.yml'):
+    def from_popu(cls, times, energy_grid, popu, pert_dict):
+        """
+        Class method to create a DynaPP object from populations computed in Python, e.g. with DynaRun.compute_popu
+
+        Parameters
+        ----------
+        times : array_like
+           Times of the populations, in fs
+        energy_grid : array_like
+           Energy grid of the populations, in eV
+        popu : array_like
+           Array of shape num_energies x num_times containing carrier populations over the energy_grid and times
+        pert_dict : dict
+           Dictionary containing the inputs and basic data of the calculation, with calc_mode 'dynamics-pp'
+           and a 'dynamics-pp' section
+
+        Returns
+        -------
+        dyanamics_pp : DynaPP
+           The DynaPP object holding the populations
+
+        """
+        dyna_pp = cls(None, pert_dict)
+
+        dyna_pp.times = np.asarray(times)
+        dyna_pp.energy_grid = np.asarray(energy_grid)
+        dyna_pp.popu = np.asarray(popu)
+
+        if dyna_pp.popu.shape != (len(dyna_pp.energy_grid), len(dyna_pp.times)):
+            raise ValueError('popu should have shape num_energies x num_times')
+
+        return dyna_pp
+
+    @classmethod
+    def from_hdf5_yaml(cls, popu_path, yaml_path='pert_output.yml', sections=None):
         """
         Class method to create a DynamicsRunCalcMode object from the HDF5 file and YAML file
         generated by a Perturbo calculation
@@ -78,6 +125,9 @@ class DynaPP(CalcMode):
            Path to the HDF5 file generated by a dynamics-pp calculation
         yaml_path : str, optional
            Path to the YAML file generated by a dynamics-pp calculation
+        sections : list of str, optional
+           Additional top-level sections of the YAML file to load, see CalcMode.from_yaml.
+           By default, the whole file is loaded.
 
         Returns
         -------
@@ -92,6 +142,6 @@ class DynaPP(CalcMode):
             raise FileNotFoundError(f'File {yaml_path} not found')
 
         popu_file = open_hdf5(popu_path)
-        yaml_dict = open_yaml(yaml_path)
+        yaml_dict = open_yaml(yaml_path, sections=cls.required_sections(sections))
 
         return cls(popu_file, yaml_dict)
@@ -1,11 +1,19 @@
 import numpy as np
 import os
+import copy
+from concurrent.futures import ProcessPoolExecutor
 from perturbopy.postproc.calc_modes.calc_mode import CalcMode
 from perturbopy.postproc.dbs.recip_pt_db import RecipPtDB
-from perturbopy.postproc.calc_modes.dyna_indiv_run import DynaIndivRun
+from perturbopy.postproc.calc_modes.dyna_indiv_run import DynaIndivRun, SnapTView
+from perturbopy.postproc.calc_modes.dyna_pp import DynaPP
 from perturbopy.io_utils.io import open_yaml, open_hdf5, close_hdf5
+from perturbopy.io_utils.repack import is_repacked
 from perturbopy.postproc.utils.timing import Timing, TimingGroup
-from perturbopy.postproc.dbs.units_dict import UnitsDict
+from perturbopy.postproc.dbs.units_dict import UnitsArray
+from perturbopy.postproc.utils.constants import energy_conversion_factor, length_conversion_factor
+from perturbopy.postproc.utils.binning import energy_bin_weights
+from perturbopy.postproc.utils.tetrahedron import read_tetra, tetra_dos
+from perturbopy.postproc.utils.fermi import carrier_number, solve_chem_pot
 
 
 class DynaRun(CalcMode):
@@ -16,22 +24,51 @@ class DynaRun(CalcMode):
     ----------
     kpt : RecipPtDB
        Database for the k-points used in the bands calculation.
-    bands : UnitsDict
+    bands : UnitsArray
        Database for the band energies computed by the bands calculation.
     num_runs : int
         Number of separate simulations performed
-    _dat : dict
+    runs : list of int
+        Numbers of the loaded runs, starting at 1. len() and iteration cover the loaded runs only.
+    _data : dict
         Python dictionary of DynaIndivRun objects containing results from each simulation
     """
 
-    def __init__(self, cdyna_file, tet_file, pert_dict):
+    def __init__(self, cdyna_file, tet_file, pert_dict, lazy=True, runs=None, t_start=None, t_stop=None, stride=None, time_units='fs',
+                 executor=None, max_workers=None):
         """
         Constructor method
 
         Parameters
         ----------
+        cdyna_file : h5py.File
+            The open HDF5 file generated by the dynamics-run calculation. It must stay open while
+            lazily loaded snapshots are accessed.
+        tet_file : h5py.File
+            The open HDF5 file generated by the setup calculation. It must stay open until the tetrahedra are read
+            by compute_dos.
         pert_dict : dict
             Dictionary containing the inputs and outputs from the dynamics-run calculation.
+        lazy : bool, optional
+            If True, the distribution functions of each run are read from cdyna_file only when indexed.
+            If False, all of the distribution functions are read into memory.
+        runs : list of int, optional
+            The runs to load, indexing starting at 1. By default, all runs are loaded.
+        t_start, t_stop : float, optional
+            First and last time (inclusive) of the snapshots to load, measured from the beginning of the first run.
+            By default, all snapshots are loaded.
+        stride : int or float, optional
+            Spacing of the loaded snapshots of each run within the time window: a positive multiple of the time step
+            in fs, or a positive integer in steps. By default, all of the snapshots are loaded.
+        time_units : str, optional
+            Units of t_start, t_stop and stride, either 'fs' or 'step'. In step units, the snapshots
+            are numbered from 1 continuously across runs.
+        executor : str or concurrent.futures.ProcessPoolExecutor, optional
+            How to load the runs: None (sequentially), or in parallel with 'process' or an existing process pool.
+            Each worker process reopens the cdyna file, so lazy must be False. Threads are not supported, since
+            h5py serializes all reads of a file.
+        max_workers : int, optional
+            Number of workers of the process pool
 
         """
         
@@ -45,42 +82,112 @@ class DynaRun(CalcMode):
         kpoint = np.array(tet_file['kpts_all_crys_coord'][()])
 
         self.kpt = RecipPtDB.from_lattice(kpoint, "crystal", self.lat, self.recip_lat)
-        self.bands = UnitsDict.from_dict
 
         energies = np.array(cdyna_file['band_structure_ryd'][()])
-        energies_dict = {i + 1: np.array(energies[:, i]) for i in range(0, energies.shape[1])}
-        self.bands = UnitsDict.from_dict(energies_dict, 'Ry')
+        self.bands = UnitsArray('Ry', energies.T, np.arange(1, energies.shape[1] + 1))
 
-        self._data = {}
+        self._tet_file = tet_file
+        self._tetra = None
 
         self.num_runs = cdyna_file['num_runs'][()]
 
+        if runs is None:
+            runs = range(1, self.num_runs + 1)
+        elif any(irun <= 0 or irun > self.num_runs for irun in runs):
+            raise IndexError(f"Runs should be between 1 and {self.num_runs}")
+
+        step_offset = 0
+        time_offset = 0.0
+        run_info = {}
+        repacked = is_repacked(cdyna_file)
+
         with self.timings.add('iterate_dyna') as t:
 
             for irun in range(1, self.num_runs + 1):
                 dyn_str = f'dynamics_run_{irun}'
 
-                num_steps = cdyna_file[dyn_str]['num_steps'][()]
-                time_step = cdyna_file[dyn_str]['time_step_fs'][()]
+                if repacked:
+                    # Repacked layout, with the run information stored as attributes
+                    snap_attrs = cdyna_file[dyn_str]['snap_t'].attrs
+                    num_steps = snap_attrs['num_steps']
+                    time_step = snap_attrs['time_step_fs']
+                    efield = np.array(snap_attrs['efield'])
+                else:
+                    num_steps = cdyna_file[dyn_str]['num_steps'][()]
+                    time_step = cdyna_file[dyn_str]['time_step_fs'][()]
+
+                    # Get E-field, which is only present if nonzero
+                    if "efield" in cdyna_file[dyn_str].keys():
+                        efield = cdyna_file[dyn_str]["efield"][()]
+                    else:
+                        efield = np.array([0.0, 0.0, 0.0])
 
-                # a dynamics run must have at least one snap
-                numk, numb = cdyna_file[dyn_str]['snap_t_1'][()].shape
+                run_step_offset = step_offset
+                run_time_offset = time_offset
+                step_offset += num_steps
+                time_offset += num_steps * time_step
 
-                snap_t = np.zeros((numb, numk, num_steps), dtype=np.float64)
+                if irun not in runs:
+                    continue
 
-                for itime in range(num_steps):
-                    snap_t[:, :, itime] = cdyna_file[dyn_str][f'snap_t_{itime+1}'][()].T
+                steps = select_steps(num_steps, time_step, run_step_offset, run_time_offset, t_start, t_stop, stride, time_units)
 
-                # Get E-field, which is only present if nonzero
-                if "efield" in cdyna_file[dyn_str].keys():
-                    efield = cdyna_file[dyn_str]["efield"][()]
-                else:
-                    efield = np.array([0.0, 0.0, 0.0])
+                run_info[irun] = {'num_steps': num_steps, 'time_step': time_step, 'efield': efield, 'steps': steps,
+                                  'step_offset': run_step_offset, 'time_offset': run_time_offset}
+
+            self._data = self._load_runs(cdyna_file, run_info, lazy, executor, max_workers)
+
+        self.runs = list(self._data.keys())
+
+    def _load_runs(self, cdyna_file, run_info, lazy, executor, max_workers):
+        """
+        Method to create the DynaIndivRun objects of the selected runs, possibly in parallel worker processes.
+        The time spent on each run is recorded in self.timings as load_run_N.
+
+        """
+        snap_t = {}
 
-                self._data[irun] = DynaIndivRun(num_steps, time_step, snap_t, time_units='fs', efield=efield)
+        if executor is None:
+            for irun, info in run_info.items():
+                with self.timings.add(f'load_run_{irun}', level=1):
+                    snap_t[irun] = SnapTView(cdyna_file[f'dynamics_run_{irun}'], info['num_steps'], steps=info['steps'],
+                                             timings=self.timings)
+                    if not lazy:
+                        snap_t[irun] = snap_t[irun].load()
+
+        elif executor == 'process' or isinstance(executor, ProcessPoolExecutor):
+            if lazy:
+                raise ValueError("Loading runs in a process pool requires lazy=False")
+
+            # Each worker process reopens the cdyna file, so that the runs are read in parallel
+            pool = ProcessPoolExecutor(max_workers=max_workers) if executor == 'process' else executor
+
+            try:
+                futures = {irun: pool.submit(read_run_snap_t, cdyna_file.filename, irun, info['num_steps'], info['steps'])
+                           for irun, info in run_info.items()}
+
+                for irun, future in futures.items():
+                    snap_t[irun], worker_timings = future.result()
+                    self.timings.merge(worker_timings)
+            finally:
+                if executor == 'process':
+                    pool.shutdown()
+
+        else:
+            raise ValueError("executor should be None, 'process' or a concurrent.futures.ProcessPoolExecutor")
+
+        # Assemble the runs in order
+        data = {}
+
+        for irun, info in run_info.items():
+            data[irun] = DynaIndivRun(info['num_steps'], info['time_step'], snap_t[irun], time_units='fs', efield=info['efield'],
+                                      steps=info['steps'], step_offset=info['step_offset'], time_offset=info['time_offset'])
+
+        return data
 
     @classmethod
-    def from_hdf5_yaml(cls, cdyna_path, tet_path, yaml_path='pert_output.yml'):
+    def from_hdf5_yaml(cls, cdyna_path, tet_path, yaml_path='pert_output.yml', lazy=True,
+                       runs=None, t_start=None, t_stop=None, stride=None, time_units='fs', executor=None, max_workers=None, sections=None):
         """
         Class method to create a DynamicsRunCalcMode object from the HDF5 file and YAML file
         generated by a Perturbo calculation
@@ -88,11 +195,32 @@ class DynaRun(CalcMode):
         Parameters
         ----------
         cdyna_path : str
-           Path to the HDF5 file generated by a dynamics-run calculation
+           Path to the HDF5 file generated by a dynamics-run calculation, in the original layout or
+           repacked with perturbopy.io_utils.repack.repack_cdyna
         tet_path : str
            Path to the HDF5 file generated by the setup calculation required before the dynamics-run calculation
         yaml_path : str, optional
            Path to the YAML file generated by a dynamics-run calculation
+        lazy : bool, optional
+           If True (default), snapshots are read from the cdyna HDF5 file only when indexed.
+           Set to False to read all of the snapshots into memory at once.
+        runs : list of int, optional
+           The runs to load, indexing starting at 1. By default, all runs are loaded.
+        t_start, t_stop : float, optional
+           First and last time (inclusive) of the snapshots to load, measured from the beginning of the first run
+        stride : int or float, optional
+           Spacing of the loaded snapshots of each run within the time window: a positive multiple of the time step
+           in fs, or a positive integer in steps. By default, all of the snapshots are loaded.
+        time_units : str, optional
+           Units of t_start, t_stop and stride, either 'fs' or 'step'
+        executor : str or concurrent.futures.ProcessPoolExecutor, optional
+           How to load the runs: None (sequentially), or in parallel with 'process' or an existing process pool
+           (requires lazy=False)
+        max_workers : int, optional
+           Number of workers of the process pool
+        sections : list of str, optional
+           Additional top-level sections of the YAML file to load, see CalcMode.from_yaml.
+           By default, the whole file is loaded.
 
         Returns
         -------
@@ -108,11 +236,12 @@ class DynaRun(CalcMode):
         if not os.path.isfile(tet_path):
             raise FileNotFoundError(f'File {tet_path} not found')
 
-        yaml_dict = open_yaml(yaml_path)
+        yaml_dict = open_yaml(yaml_path, sections=cls.required_sections(sections))
         cdyna_file = open_hdf5(cdyna_path)
         tet_file = open_hdf5(tet_path)
 
-        return cls(cdyna_file, tet_file, yaml_dict)
+        return cls(cdyna_file, tet_file, yaml_dict, lazy=lazy, runs=runs, t_start=t_start, t_stop=t_stop,
+                   stride=stride, time_units=time_units, executor=executor, max_workers=max_workers)
 
     def __getitem__(self, index):
         """
@@ -129,22 +258,33 @@ class DynaRun(CalcMode):
            Object containing information for the dynamics run
 
         """
-        if index <= 0 or index > len(self._data):
+        if index not in self._data:
             raise IndexError("Index out of range")
 
         return self._data[index]
 
     def __len__(self):
         """
-        Method to get the number of runs in DynamicsRunCalcMode object
+        Method to get the number of loaded runs in DynamicsRunCalcMode object
 
         Returns
         -------
         num_runs : int
-            Number of runs
+            Number of loaded runs
         """
 
-        return self.num_runs
+        return len(self._data)
+
+    def __iter__(self):
+        """
+        Method to iterate over the loaded runs, in increasing order of the run numbers
+
+        Returns
+        -------
+        runs : iterator of DynaIndivRun
+
+        """
+        return iter(self._data.values())
 
     def get_info(self):
         """
@@ -153,14 +293,297 @@ class DynaRun(CalcMode):
 
         print(f"\nThis simulation has {self.num_runs} runs")
 
+        if len(self._data) != self.num_runs:
+            print(f"Loaded runs: {self.runs}")
+
         for irun, dynamics_run in self._data.items():
 
             print(f"{'Dynamics run':>30}: {irun}")
             print(f"{'Number of steps':>30}: {dynamics_run.num_steps}")
+            if len(dynamics_run.steps) != dynamics_run.num_steps:
+                print(f"{'Number of loaded steps':>30}: {len(dynamics_run.steps)}")
             print(f"{'Time step (fs)':>30}: {dynamics_run.time_step}")
             print(f"{'Electric field (V/cm)':>30}: {dynamics_run.efield}")
             print("")
 
+    def reduce(self, reducer, chunk_size=64):
+        """
+        Method to apply a reduction to each snapshot of every loaded run, streaming the snapshots
+        from the HDF5 file in chunks of time steps. See DynaIndivRun.reduce.
+
+        Parameters
+        ----------
+        reducer : callable
+            Function taking an array of snapshots of shape num_bands x num_kpoints x n and returning
+            an array whose last axis has length n
+        chunk_size : int, optional
+            Number of time steps per chunk
+
+        Returns
+        -------
+        reduced : dict
+            Dictionary with the run numbers as keys and the results of the reduction as values
+
+        """
+        return {irun: dynamics_run.reduce(reducer, chunk_size) for irun, dynamics_run in self._data.items()}
+
+    def carrier_number(self, chunk_size=64):
+        """
+        Method to compute the number of carriers (sum of the distribution function over bands and k-points)
+        at each loaded time step of every loaded run
+
+        Returns
+        -------
+        carrier_number : dict
+            Dictionary with the run numbers as keys and arrays of length len(steps) as values
+
+        """
+        return {irun: dynamics_run.carrier_number(chunk_size) for irun, dynamics_run in self._data.items()}
+
+    def band_population(self, chunk_size=64):
+        """
+        Method to compute the carrier population of each band at each loaded time step of every loaded run
+
+        Returns
+        -------
+        band_population : dict
+            Dictionary with the run numbers as keys and arrays of shape num_bands x len(steps) as values
+
+        """
+        return {irun: dynamics_run.band_population(chunk_size) for irun, dynamics_run in self._data.items()}
+
+    def mean_energy(self, energy_units='eV', chunk_size=64):
+        """
+        Method to compute the average carrier energy at each loaded time step of every loaded run,
+        using the band energies stored in the bands attribute
+
+        Parameters
+        ----------
+        energy_units : str, optional
+            Units of the returned energies
+        chunk_size : int, optional
+            Number of time steps per chunk
+
+        Returns
+        -------
+        mean_energy : dict
+            Dictionary with the run numbers as keys and arrays of length len(steps) as values
+
+        """
+        energies = self.bands.array * energy_conversion_factor(self.bands.units, energy_units)
+
+        return {irun: dynamics_run.mean_energy(energies, chunk_size) for irun, dynamics_run in self._data.items()}
+
+    def compute_popu(self, energy_grid, smearing=None, chunk_size=64):
+        """
+        Method to compute the carrier population as a function of energy and time, as in a dynamics-pp
+        calculation, by binning the distribution functions of all loaded runs onto an energy grid.
+        The population at energy E and time t is sum_{nk} f_{nk}(t) w(E - e_{nk}) / N_k, where N_k is the
+        number of k-points of the full boltz_kdim grid and w is a histogram bin or a Gaussian, in units of 1/eV.
+
+        Parameters
+        ----------
+        energy_grid : array_like
+            Sorted energy grid in eV
+        smearing : float, optional
+            Standard deviation of the Gaussian broadening in eV. If None, a histogram is computed.
+        chunk_size : int, optional
+            Number of time steps binned at once
+
+        Returns
+        -------
+        dyna_pp : DynaPP
+            Object holding the times (in fs, of the loaded steps of all loaded runs), energy grid and populations
+
+        """
+        energies = self.bands.array * energy_conversion_factor(self.bands.units, 'eV')
+
+        with self.timings.add('compute_popu') as t:
+            weights = energy_bin_weights(energies, energy_grid, smearing) / self._grid_size()
+
+            def bin_snaps(snaps):
+                return weights @ np.reshape(snaps, (snaps.shape[0] * snaps.shape[1], snaps.shape[2]))
+
+            popu = [dynamics_run.reduce(bin_snaps, chunk_size) for dynamics_run in self._data.values()]
+            times = [dynamics_run.times for dynamics_run in self._data.values()]
+
+        pert_dict = copy.deepcopy(self._pert_dict)
+        pert_dict['input parameters']['after conversion']['calc_mode'] = 'dynamics-pp'
+        pert_dict.pop('dynamics-run', None)
+        pert_dict['dynamics-pp'] = {}
+
+        return DynaPP.from_popu(np.concatenate(times), energy_grid, np.concatenate(popu, axis=1), pert_dict)
+
+    @property
+    def tetra(self):
+        """
+        Indices of the k-points at the vertices of the tetrahedra of the k-point grid, with shape num_tetra x 4,
+        or None if the tet file does not contain the tetrahedra. Read from the tet file on first use.
+        """
+        if self._tetra is None and 'tetra' in self._tet_file:
+            self._tetra = read_tetra(self._tet_file, num_kpoints=self.bands.array.shape[1])
+
+        return self._tetra
+
+    def compute_dos(self, energy_grid, weights=None, tetra_volume=None, chunk_size=2**16):
+        """
+        Method to compute the density of states of each band with the linear tetrahedron method,
+        using the tetrahedra of the tet file and the band energies on the k-point grid.
+
+        Parameters
+        ----------
+        energy_grid : array_like
+            Sorted energy grid in eV
+        weights : array_like, optional
+            Quantity of shape num_bands x num_kpoints to project the density of states on, e.g. a snapshot of the
+            distribution function snap_t[:, :, i], giving the carrier population
+        tetra_volume : float, optional
+            Volume of each tetrahedron as a fraction of the Brillouin zone. Defaults to 1 / (6 x number of k-points
+            of the boltz_kdim grid), or 1 / num_tetra if larger.
+        chunk_size : int, optional
+            Number of tetrahedra processed at once
+
+        Returns
+        -------
+        dos : np.ndarray
+            Array of shape num_bands x len(energy_grid), in units of 1/eV per unit cell (without spin degeneracy)
+
+        """
+        tetra = self.tetra
+
+        if tetra is None:
+            raise ValueError('The tet file does not contain the tetrahedra of the k-point grid')
+
+        if tetra_volume is None:
+            # Only the tetrahedra within the energy window of the calculation may be stored
+            tetra_volume = 1.0 / max(6 * self._grid_size(), len(tetra))
+
+        energies = self.bands.array * energy_conversion_factor(self.bands.units, 'eV')
+
+        with self.timings.add('compute_dos'):
+            dos = tetra_dos(energies, tetra, energy_grid, weights=weights, tetra_volume=tetra_volume, chunk_size=chunk_size)
+
+        return dos
+
+    def _grid_size(self):
+        """
+        Number of k-points of the full grid (boltz_kdim), of which only the k-points within the energy window are stored
+        """
+        kdim = self._pert_dict['input parameters']['after conversion'].get('boltz_kdim')
+        num_kpoints = self.bands.array.shape[1]
+
+        return max(int(np.prod(kdim)), num_kpoints) if kdim is not None else num_kpoints
+
+    def _cell_size(self):
+        """
+        Volume of the unit cell in cm^3, or area in cm^2 for 2D systems
+        """
+        bohr_to_cm = length_conversion_factor(self.volume_units.split('^')[0], 'cm')
+        cell_size = self.volume * bohr_to_cm**3
+
+        if self.system_2d:
+            cell_size /= np.linalg.norm(self.lat[:, 2]) * self.alat * length_conversion_factor(self.alat_units, 'cm')
+
+        return cell_size
+
+    def _states(self, spin_degen, use_tetra, energy_grid):
+        """
+        Energies in eV and weights (number of states per unit cell) of the states used to count the carriers
+        """
+        energies = self.bands.array * energy_conversion_factor(self.bands.units, 'eV')
+
+        if not use_tetra:
+            return energies, spin_degen / self._grid_size()
+
+        if energy_grid is None:
+            energy_grid = np.linspace(np.min(energies), np.max(energies), 2001)
+
+        energy_grid = np.asarray(energy_grid, dtype=float)
+        dos = np.sum(self.compute_dos(energy_grid), axis=0)
+
+        # Trapezoidal integration of the density of states
+        widths = np.gradient(energy_grid)
+        widths[[0, -1]] *= 0.5
+
+        return energy_grid, spin_degen * dos * widths
+
+    def compute_conc(self, temper, chem_pot, hole=None, spin_degen=2, use_tetra=False, energy_grid=None):
+        """
+        Method to compute the carrier concentrations in equilibrium, from the Fermi-Dirac occupations of the band
+        energies on the k-point grid, for many temperatures and chemical potentials at once.
+
+        Parameters
+        ----------
+        temper : array_like
+            Temperatures in K
+        chem_pot : array_like
+            Chemical potentials in eV, broadcast against temper
+        hole : bool, optional
+            Whether to count the holes instead of the electrons. Defaults to the hole input parameter.
+        spin_degen : int, optional
+            Spin degeneracy of the bands, 2 without spin-orbit coupling and 1 with
+        use_tetra : bool, optional
+            Whether to integrate the occupations with the tetrahedron density of states (see compute_dos)
+            instead of summing them over the k-points. Faster for many temperatures and a large number of k-points.
+        energy_grid : array_like, optional
+            Energy grid in eV of the tetrahedron density of states. Defaults to 2001 points spanning the band energies.
+
+        Returns
+        -------
+        conc : np.ndarray
+            Array of shape broadcast(temper, chem_pot).shape of the concentrations in cm^-3 (cm^-2 for 2D systems)
+
+        """
+        if hole is None:
+            hole = self._pert_dict['input parameters']['after conversion'].get('hole', False)
+
+        energies, weights = self._states(spin_degen, use_tetra, energy_grid)
+
+        with self.timings.add('compute_conc'):
+            num_carriers = carrier_number(energies, weights, temper, chem_pot, hole)
+
+        return num_carriers / self._cell_size()
+
+    def find_chem_pot(self, temper, conc, hole=None, spin_degen=2, use_tetra=False, energy_grid=None, tol=1e-8):
+        """
+        Method to compute the chemical potentials giving a set of carrier concentrations at a set of temperatures,
+        e.g. to compare with the chemical potentials of a transport calculation. The chemical potentials of all
+        (temperature, concentration) pairs are bisected simultaneously, see compute_conc.
+
+        Parameters
+        ----------
+        temper : array_like
+            Temperatures in K
+        conc : array_like
+            Carrier concentrations in cm^-3 (cm^-2 for 2D systems), broadcast against temper
+        hole : bool, optional
+            Whether the carriers are holes instead of electrons. Defaults to the hole input parameter.
+        spin_degen : int, optional
+            Spin degeneracy of the bands, 2 without spin-orbit coupling and 1 with
+        use_tetra : bool, optional
+            Whether to use the tetrahedron density of states instead of the band energies on the k-point grid
+        energy_grid : array_like, optional
+            Energy grid in eV of the tetrahedron density of states. Defaults to 2001 points spanning the band energies.
+        tol : float, optional
+            Tolerance on the chemical potentials in eV
+
+        Returns
+        -------
+        chem_pot : np.ndarray
+            Array of shape broadcast(temper, conc).shape of the chemical potentials in eV
+
+        """
+        if hole is None:
+            hole = self._pert_dict['input parameters']['after conversion'].get('hole', False)
+
+        energies, weights = self._states(spin_degen, use_tetra, energy_grid)
+        num_carriers = np.asarray(conc, dtype=float) * self._cell_size()
+
+        with self.timings.add('find_chem_pot'):
+            chem_pot = solve_chem_pot(energies, weights, temper, num_carriers, hole, tol)
+
+        return chem_pot
+
     def extract_steady_drift_vel(self, dyna_pp_yaml_path):
         """
         Method to extract the drift velocities and equilibrium carrier concentrations
@@ -179,14 +602,12 @@ class DynaRun(CalcMode):
         vels = dyna_pp_dict['dynamics-pp']['velocity']
         concs = dyna_pp_dict['dynamics-pp']['concentration']
 
-        step_number = 0
-
         steady_drift_vel = []
         steady_conc = []
 
         for irun, dynamics_run in self._data.items():
             
-            step_number += dynamics_run.num_steps
+            step_number = dynamics_run.step_offset + dynamics_run.num_steps
             
             if np.allclose(dynamics_run.efield, np.array([0.0, 0.0, 0.0])):
                 steady_drift_vel.append(None)
@@ -196,3 +617,89 @@ class DynaRun(CalcMode):
                 steady_conc.append(concs[step_number])
 
         return steady_drift_vel, steady_conc
+
+
+def read_run_snap_t(cdyna_path, irun, num_steps, steps):
+    """
+    Function to read the selected snapshots of one run from a cdyna file, used by worker processes
+
+    Parameters
+    ----------
+    cdyna_path : str
+        Path to the cdyna HDF5 file
+    irun : int
+        The run to read, indexing starting at 1
+    num_steps : int
+        Number of time steps in the run
+    steps : array_like
+        Indices of the time steps to read, starting at 0
+
+    Returns
+    -------
+    snap_t : np.ndarray
+        Array of shape num_bands x num_kpoints x len(steps)
+    timings : TimingGroup
+        Timings recorded by the worker
+
+    """
+    timings = TimingGroup()
+
+    with timings.add(f'load_run_{irun}', level=1):
+        cdyna_file = open_hdf5(cdyna_path)
+        snap_t = SnapTView(cdyna_file[f'dynamics_run_{irun}'], num_steps, steps=steps, timings=timings).load()
+        close_hdf5(cdyna_file)
+
+    return snap_t, timings
+
+
+def select_steps(num_steps, time_step, step_offset, time_offset, t_start=None, t_stop=None, stride=None, time_units='fs'):
+    """
+    Function to select the snapshots of a dynamics run within a time window
+
+    Parameters
+    ----------
+    num_steps : int
+        Number of time steps in the run
+    time_step : float
+        Time step of the run in fs
+    step_offset : int
+        Number of time steps in all of the previous runs
+    time_offset : float
+        Total time of all of the previous runs in fs
+    t_start, t_stop : float, optional
+        First and last time (inclusive) of the snapshots to select, measured from the beginning of the first run
+    stride : int or float, optional
+        Spacing of the selected snapshots within the time window, a positive multiple of the time step
+        (in fs) or a positive integer (in steps). By default, all of the snapshots are selected.
+    time_units : str, optional
+        Units of t_start, t_stop and stride, either 'fs' or 'step'
+
+    Returns
+    -------
+    steps : np.ndarray
+        Indices of the selected time steps within the run, starting at 0
+
+    """
+    if time_units == 'fs':
+        coords = time_offset + np.arange(1, num_steps + 1) * time_step
+        step_stride = 1 if stride is None else stride / time_step
+    elif time_units == 'step':
+        coords = step_offset + np.arange(1, num_steps + 1)
+        step_stride = 1 if stride is None else stride
+    else:
+        raise ValueError("time_units should be 'fs' or 'step'")
+
+    # The stride should be a whole number of time steps in either units
+    if step_stride < 1 - 1e-6 or not np.isclose(step_stride, np.rint(step_stride), rtol=0, atol=1e-6):
+        raise ValueError(f"stride should be a positive multiple of the time step, got {stride} {time_units}")
+
+    step_stride = int(np.rint(step_stride))
+
+    mask = np.ones(num_steps, dtype=bool)
+
+    if t_start is not None:
+        mask &= coords >= t_start
+    if t_stop is not None:
+        mask &= coords <= t_stop
+
+    return np.nonzero(mask)[0][::step_stride]
@@ -1,6 +1,6 @@
 import numpy as np
 from perturbopy.postproc.calc_modes.calc_mode import CalcMode
-from perturbopy.postproc.dbs.units_dict import UnitsDict
+from perturbopy.postproc.dbs.units_dict import UnitsArray
 from perturbopy.postproc.dbs.recip_pt_db import RecipPtDB
 from perturbopy.postproc.utils.plot_tools import plot_dispersion, plot_recip_pt_labels, plot_vals_on_bands
 
@@ -17,23 +17,27 @@ class Ephmat(CalcMode):
     qpt : RecipPtDB
        Database for the q-points used in the ephmat calculation, containing M points.
     
-    phdisp : UnitsDict
+    phdisp : UnitsArray
        Database for the phonon energies computed by the ephmat calculation. The keys are
        the phonon mode, and the values are an array (of length M) containing the energies at each q-point
-       with units phdisp.units
+       with units phdisp.units. phdisp.array has shape num_modes x M.
     
-    ephmat : UnitsDict
+    ephmat : UnitsArray
        Database for the e-ph matrix elements computed by the ephmat calculation. The keys are
        the phonon mode, and the values are an array (of length NxM) where element (n, m)
-       is the e-ph matrix element (units ephmat.units) between an electron at k-point n and phonon at q-point m
+       is the e-ph matrix element (units ephmat.units) between an electron at k-point n and phonon at q-point m.
+       ephmat.array has shape num_modes x N x M.
     
-    defpot : UnitsDict
+    defpot : UnitsArray
        Database for the deformation potentials computed by the phdisp calculation. The keys are
        the phonon mode, and the values are an array (of length NxM) where element (n, m)
        is the deformation potential (units defpot.units) of an electron at k-point n and phonon at q-point m.
+       defpot.array has shape num_modes x N x M.
 
     """
 
+    yaml_sections = ('ephmat',)
+
     def __init__(self, pert_dict):
         """
         Constructor method
@@ -69,21 +73,118 @@ class Ephmat(CalcMode):
         self.kpt = RecipPtDB.from_lattice(kpoint, kpoint_units, self.lat, self.recip_lat, kpath, kpath_units)
         self.qpt = RecipPtDB.from_lattice(qpoint, qpoint_units, self.lat, self.recip_lat, qpath, qpath_units)
 
-        phdisp = {}
-        defpot = {}
-        ephmat = {}
-
         N = len(self.kpt.path)
         M = len(self.qpt.path)
 
-        for phidx in ephmat_dat.keys():
-            phdisp[phidx] = ephmat_dat[phidx].pop('phonon energy')
-            defpot[phidx] = np.array(ephmat_dat[phidx].pop('deformation potential')).reshape(N, M)
-            ephmat[phidx] = np.array(ephmat_dat[phidx].pop('e-ph matrix elements')).reshape(N, M)
+        # All of the modes are converted to one num_modes x N x M array per quantity
+        modes = list(ephmat_dat.keys())
+        phdisp = np.array([ephmat_dat[phidx].pop('phonon energy') for phidx in modes])
+        defpot = np.array([ephmat_dat[phidx].pop('deformation potential') for phidx in modes]).reshape(len(modes), N, M)
+        ephmat = np.array([ephmat_dat[phidx].pop('e-ph matrix elements') for phidx in modes]).reshape(len(modes), N, M)
+
+        self.phdisp = UnitsArray(phdisp_units, phdisp, modes)
+        self.defpot = UnitsArray(defpot_units, defpot, modes)
+        self.ephmat = UnitsArray(ephmat_units, ephmat, modes)
+
+    def _coupling_array(self, quantity):
+        if quantity not in ['ephmat', 'defpot']:
+            raise ValueError(f"quantity should be 'ephmat' or 'defpot', not {quantity}")
+
+        return getattr(self, quantity).array
+
+    def _coupling_table(self, quantity, indices, values):
+        """
+        Structured array of couplings from their flat indices in the num_modes x N x M array
+
+        """
+        mode_idx, kpoint_idx, qpoint_idx = np.unravel_index(indices, self._coupling_array(quantity).shape)
+
+        couplings = np.zeros(np.shape(indices), dtype=[('mode', int), ('kpoint_idx', int), ('qpoint_idx', int), ('value', float)])
+        couplings['mode'] = np.asarray(getattr(self, quantity).index_keys[0])[mode_idx]
+        couplings['kpoint_idx'] = kpoint_idx
+        couplings['qpoint_idx'] = qpoint_idx
+        couplings['value'] = values
+
+        return couplings
+
+    def ephmat_mode_sum(self):
+        """
+        Method to compute the e-ph matrix elements summed over phonon modes, sqrt(sum_nu |g_nu(k, q)|^2)
+
+        Returns
+        -------
+        ephmat_sum : np.ndarray
+           Array of shape N x M, with units ephmat.units
+
+        """
+        return np.sqrt(np.sum(self.ephmat.array**2, axis=0))
+
+    def top_couplings(self, n=10, per_kpoint=False, quantity='ephmat'):
+        """
+        Method to find the strongest couplings, over all phonon modes, k-points and q-points or for each k-point
+
+        Parameters
+        ----------
+        n : int, optional
+           Number of couplings to return (per k-point if per_kpoint is True)
+
+        per_kpoint : bool, optional
+           If True, the n strongest couplings over phonon modes and q-points are found for each k-point
 
-        self.phdisp = UnitsDict.from_dict(phdisp, phdisp_units)
-        self.defpot = UnitsDict.from_dict(defpot, defpot_units)
-        self.ephmat = UnitsDict.from_dict(ephmat, ephmat_units)
+        quantity : str, optional
+           'ephmat' for the e-ph matrix elements, or 'defpot' for the deformation potentials
+
+        Returns
+        -------
+        couplings : np.ndarray
+           Structured array with the fields mode, kpoint_idx, qpoint_idx (indices of the points in kpt and qpt)
+           and value, sorted by decreasing value. The shape is (n,), or (N, n) if per_kpoint is True.
+
+        """
+        values = self._coupling_array(quantity)
+        num_modes, num_kpoints, num_qpoints = values.shape
+
+        if per_kpoint:
+            # Flat indices over modes and q-points for each k-point, shape N x (num_modes * M)
+            values = np.reshape(np.transpose(values, (1, 0, 2)), (num_kpoints, -1))
+        else:
+            values = np.reshape(values, (1, -1))
+
+        n = min(n, values.shape[1])
+        top = np.argpartition(-values, n - 1, axis=1)[:, :n]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(values, top, axis=1), axis=1, kind='stable'), axis=1)
+        top_values = np.take_along_axis(values, top, axis=1)
+
+        if per_kpoint:
+            mode_idx, qpoint_idx = np.divmod(top, num_qpoints)
+            indices = np.ravel_multi_index((mode_idx, np.arange(num_kpoints)[:, np.newaxis], qpoint_idx), (num_modes, num_kpoints, num_qpoints))
+
+            return self._coupling_table(quantity, indices, top_values)
+
+        return self._coupling_table(quantity, top[0], top_values[0])
+
+    def strong_couplings(self, threshold, quantity='ephmat'):
+        """
+        Method to find all of the couplings above a threshold, as a sparse (coordinate) list
+
+        Parameters
+        ----------
+        threshold : float
+           The couplings strictly larger than threshold are returned, in the units of the quantity
+
+        quantity : str, optional
+           'ephmat' for the e-ph matrix elements, or 'defpot' for the deformation potentials
+
+        Returns
+        -------
+        couplings : np.ndarray
+           Structured array with the fields mode, kpoint_idx, qpoint_idx and value, ordered by mode, k-point and q-point
+
+        """
+        values = np.ravel(self._coupling_array(quantity))
+        indices = np.flatnonzero(values > threshold)
+
+        return self._coupling_table(quantity, indices, values[indices])
 
     def plot_phdisp(self, ax, show_qpoint_labels=True, **kwargs):
         """
@@ -139,10 +240,7 @@ class Ephmat(CalcMode):
 
         """
 
-        values = {}
-
-        for key, val in self.defpot.items():
-            values[key] = self.defpot[key][kpoint_idx, :]
+        values = dict(zip(self.defpot.index_keys[0], self.defpot.array[:, kpoint_idx, :]))
 
         ax = plot_vals_on_bands(ax, self.qpt.path, self.phdisp, self.phdisp.units, values=values, label=r'$\Phi$', **kwargs)
 
@@ -176,10 +274,7 @@ class Ephmat(CalcMode):
 
         """
 
-        values = {}
-
-        for key, val in self.ephmat.items():
-            values[key] = self.ephmat[key][kpoint_idx, :]
+        values = dict(zip(self.ephmat.index_keys[0], self.ephmat.array[:, kpoint_idx, :]))
 
         ax = plot_vals_on_bands(ax, self.qpt.path, self.phdisp, self.phdisp.units, values=values, label=r'$|g|$', **kwargs)
 
@@ -1,8 +1,9 @@
 import numpy as np
 from perturbopy.postproc.calc_modes.calc_mode import CalcMode
-from perturbopy.postproc.dbs.units_dict import UnitsDict
+from perturbopy.postproc.dbs.units_dict import UnitsDict, UnitsArray
 from perturbopy.postproc.dbs.recip_pt_db import RecipPtDB
-from perturbopy.postproc.utils.constants import hbar
+from perturbopy.postproc.utils.constants import hbar, energy_conversion_factor
+from perturbopy.postproc.utils.binning import energy_bin_weights
 
 
 class Imsigma(CalcMode):
@@ -14,10 +15,10 @@ class Imsigma(CalcMode):
     kpt : RecipPtDB
        Database for the k-points used in the imsigma calculation, containing N points.
     
-    bands : UnitsDict
+    bands : UnitsArray
        Database for the band energies computed by the imsigma calculation. The keys are
        the band index, and the values are an array (of length N) containing the energies at each k-point
-       with units bands.units
+       with units bands.units. bands.array has shape num_bands x N.
 
     temper : UnitsDict
         Dictionary of temperatures used in each configuration. The keys give the configuration number,
@@ -28,19 +29,28 @@ class Imsigma(CalcMode):
         give the configuration number, and the values are floats giving the
         chemical potential (with units chem_pot.units)
     
-    imsigma : UnitsDict
+    imsigma : UnitsArray
         Dictionary of imaginary self-energies computed for each configuration. The top level keys are the
         configuration number, and the second level keys are the band index. The values are arrays of length N giving the
         imaginary self-energies along all the k-points at that band index for the configuration. Units are in imsigma.units.
+        imsigma.array has shape num_configs x num_bands x N.
 
-    imsigma_mode : UnitsDict
+    imsigma_mode : UnitsArray
         Dictionary of imaginary self-energies resolved by phonon mode computed. The top level keys are the
         configuration number, and the second level keys are the band index. The third level keys are
         the phonon mode. Finally,the values are arrays of length N giving the imaginary self-energies along all the k-points
         due to the given phonon mode at that band index for the configuration. Units are in imsigma_mode.units.
-    
+        imsigma_mode.array has shape num_configs x num_modes x num_bands x N.
+
+    imsigma_array : np.ndarray
+        Array of shape num_configs x num_bands x (num_modes + 1) x N of the imaginary self-energies.
+        Index 0 of the third axis is the total self-energy, and index m is the self-energy due to phonon mode m.
+        imsigma.array and imsigma_mode.array are views of this array.
+
     """
 
+    yaml_sections = ('imsigma',)
+
     def __init__(self, pert_dict):
         """
         Constructor method
@@ -64,7 +74,7 @@ class Imsigma(CalcMode):
         energy_units = self._pert_dict['imsigma'].pop('energy units')
         num_bands = self._pert_dict['imsigma'].pop('number of bands')
         energies_dict = self._pert_dict['imsigma']['energy'].pop('band index')
-        self.bands = UnitsDict.from_dict(energies_dict, energy_units)
+        self.bands = UnitsArray.from_dict(energies_dict, energy_units)
 
         num_config = self._pert_dict['imsigma'].pop('number of configurations')
         config_dat = self._pert_dict['imsigma'].pop('configuration index')
@@ -72,24 +82,177 @@ class Imsigma(CalcMode):
 
         self.temper = UnitsDict(units=self._pert_dict['imsigma'].pop('temperature units'))
         self.chem_pot = UnitsDict(units=self._pert_dict['imsigma'].pop('chemical potential units'))
-        self.imsigma = UnitsDict(units=self._pert_dict['imsigma'].pop('Im(Sigma) units'))
-        self.imsigma_mode = UnitsDict(units=self.imsigma.units)
+        imsigma_units = self._pert_dict['imsigma'].pop('Im(Sigma) units')
+
+        configs = list(config_dat.keys())
+        band_indices = list(config_dat[configs[0]]['band index'].keys())
+        modes = list(range(1, num_modes + 1))
+
+        self.imsigma_array = np.empty((len(configs), len(band_indices), num_modes + 1, num_kpoints))
+
+        for iconfig, config_idx in enumerate(configs):
 
-        for config_idx in config_dat.keys():
-            
-            self.imsigma[config_idx] = {}
-            self.imsigma_mode[config_idx] = {}
             self.temper[config_idx] = config_dat[config_idx].pop('temperature')
             self.chem_pot[config_idx] = config_dat[config_idx].pop('chemical potential')
-            
+
             imsigma_dat = config_dat[config_idx].pop('band index')
 
-            for mode in np.arange(1, num_modes + 1):
-                self.imsigma_mode[config_idx][mode] = {}
+            if list(imsigma_dat.keys()) != band_indices:
+                raise ValueError(f'The band indices of configuration {config_idx} differ from those of configuration {configs[0]}')
+
+            for iband, band_index in enumerate(band_indices):
+                self.imsigma_array[iconfig, iband, 0] = imsigma_dat[band_index]['Im(Sigma)']['total']
+                self.imsigma_array[iconfig, iband, 1:] = [imsigma_dat[band_index]['Im(Sigma)']['phonon mode'][mode] for mode in modes]
+
+        # The total and mode-resolved self-energies are views of the same array
+        self.imsigma = UnitsArray(imsigma_units, self.imsigma_array[:, :, 0], [configs, band_indices])
+        self.imsigma_mode = UnitsArray(imsigma_units, np.transpose(self.imsigma_array[:, :, 1:], (0, 2, 1, 3)), [configs, modes, band_indices])
+
+        # Scattering rates of each configuration, computed on first use
+        self._rates = {}
+
+    def _config_rates(self, config):
+        """
+        Scattering rates in 1/ps of one configuration, of shape num_bands x (num_modes + 1) x N as imsigma_array
+
+        """
+        key = (config, self.imsigma.units, self.imsigma_mode.units)
+
+        if key not in self._rates:
+            iconfig = self.imsigma.index(config)[0]
+
+            # 1/tau = 2 Im(Sigma) / hbar, with hbar in eV*fs and rates in 1/ps
+            factor = 2.0e3 / hbar('ev*fs')
+
+            rates = np.empty(self.imsigma_array.shape[1:])
+            rates[:, 0] = factor * energy_conversion_factor(self.imsigma.units, 'eV') * self.imsigma.array[iconfig]
+            rates[:, 1:] = factor * energy_conversion_factor(self.imsigma_mode.units, 'eV') * np.transpose(self.imsigma_mode.array[iconfig], (1, 0, 2))
+
+            self._rates[key] = rates
+
+        return self._rates[key]
+
+    def scattering_rate(self, config=None, mode_resolved=False):
+        """
+        Method to compute the scattering rates 1/tau = 2 Im(Sigma) / hbar, in 1/ps. The rates of each configuration
+        are computed once and cached.
+
+        Parameters
+        ----------
+        config : int, optional
+            The configuration number. By default, the rates of all of the configurations are stacked along a first axis.
+
+        mode_resolved : bool, optional
+            If True, the rates due to each phonon mode are returned instead of the total rates
+
+        Returns
+        -------
+        rates : np.ndarray
+            Array of shape num_bands x N, or num_modes x num_bands x N if mode_resolved is True
+
+        """
+        if config is None:
+            return np.stack([self.scattering_rate(config_idx, mode_resolved) for config_idx in self.imsigma.index_keys[0]])
+
+        rates = self._config_rates(config)
+
+        if mode_resolved:
+            return np.transpose(rates[:, 1:], (1, 0, 2))
+
+        return rates[:, 0]
+
+    def relaxation_time(self, config=None, mode_resolved=False):
+        """
+        Method to compute the relaxation times tau = hbar / (2 Im(Sigma)), in fs. States with a vanishing
+        self-energy have an infinite relaxation time.
+
+        Parameters
+        ----------
+        config : int, optional
+            The configuration number. By default, the relaxation times of all of the configurations are stacked along a first axis.
+
+        mode_resolved : bool, optional
+            If True, the relaxation times due to each phonon mode are returned instead of the total relaxation times
+
+        Returns
+        -------
+        tau : np.ndarray
+            Array of shape num_bands x N, or num_modes x num_bands x N if mode_resolved is True
+
+        """
+        rates = self.scattering_rate(config, mode_resolved)
+
+        with np.errstate(divide='ignore'):
+            return 1.0e3 / rates
+
+    def mean_free_path(self, velocities, config=None):
+        """
+        Method to compute the mean free paths |v| tau of the electronic states, in nm
+
+        Parameters
+        ----------
+        velocities : array_like
+            Band velocities of the states in m/s, either as vectors of shape num_bands x N x 3 or as speeds of shape num_bands x N
+
+        config : int, optional
+            The configuration number. By default, the mean free paths of all of the configurations are stacked along a first axis.
+
+        Returns
+        -------
+        mfp : np.ndarray
+            Array of shape num_bands x N
+
+        """
+        velocities = np.asarray(velocities, dtype=float)
+        num_states = self.imsigma_array.shape[1:2] + self.imsigma_array.shape[3:]
+
+        if velocities.shape == num_states + (3,):
+            velocities = np.linalg.norm(velocities, axis=-1)
+        elif velocities.shape != num_states:
+            raise ValueError(f'velocities should have shape {num_states + (3,)} or {num_states}')
+
+        # m/s x fs = 1e-6 nm
+        return 1.0e-6 * np.abs(velocities) * self.relaxation_time(config)
+
+    def scattering_spectrum(self, energy_grid, smearing=None, average=False):
+        """
+        Method to compute the energy-resolved scattering rates due to each phonon mode, for all configurations at once,
+        by binning the rates of all bands and k-points onto an energy grid. The spectrum at energy E is
+        sum_{nk} 1/tau_{nk} w(E - e_{nk}) / N_k, where N_k is the number of k-points and w is a histogram bin
+        or a Gaussian, in units of 1/eV.
+
+        Parameters
+        ----------
+        energy_grid : array_like
+            Sorted energy grid in eV
+        smearing : float, optional
+            Standard deviation of the Gaussian broadening in eV. If None, a histogram is computed.
+        average : bool, optional
+            If True, the spectrum is divided by the density of states on the grid, giving the average scattering rate
+            of the states at each energy (in 1/ps, nan where there are no states)
+
+        Returns
+        -------
+        spectrum : np.ndarray
+            Array of shape num_configs x num_modes x len(energy_grid), in 1/(ps eV), or in 1/ps if average is True
+
+        """
+        energies = self.bands.array * energy_conversion_factor(self.bands.units, 'eV')
+        num_kpoints = energies.shape[1]
+
+        weights = energy_bin_weights(energies, energy_grid, smearing) / num_kpoints
+
+        # Rates of all configurations and modes as columns, shape (num_bands x N) x (num_configs x num_modes)
+        rates = self.scattering_rate(mode_resolved=True)
+        num_configs, num_modes = rates.shape[:2]
+
+        spectrum = np.transpose(weights @ np.reshape(rates, (num_configs * num_modes, -1)).T)
+        spectrum = np.reshape(spectrum, (num_configs, num_modes, -1))
+
+        if average:
+            dos = np.asarray(weights.sum(axis=1)).ravel()
 
-            for band_index in imsigma_dat.keys():
-                
-                self.imsigma[config_idx][band_index] = np.array(imsigma_dat[band_index]['Im(Sigma)']['total'])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                spectrum = np.where(dos > 0, spectrum / dos, np.nan)
 
-                for mode in np.arange(1, num_modes + 1):
-                    self.imsigma_mode[config_idx][mode][band_index] = np.array(imsigma_dat[band_index]['Im(Sigma)']['phonon mode'][mode])
+        return spectrum
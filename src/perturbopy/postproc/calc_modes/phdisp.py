@@ -1,6 +1,6 @@
 import numpy as np
 from perturbopy.postproc.calc_modes.calc_mode import CalcMode
-from perturbopy.postproc.dbs.units_dict import UnitsDict
+from perturbopy.postproc.dbs.units_dict import UnitsArray
 from perturbopy.postproc.dbs.recip_pt_db import RecipPtDB
 from perturbopy.postproc.utils.plot_tools import plot_dispersion, plot_recip_pt_labels
 
@@ -15,13 +15,15 @@ class Phdisp(CalcMode):
     qpt : RecipPtDB
        Database for the q-points used in the phdisp calculation, containing M points.
     
-    phdisp : UnitsDict
+    phdisp : UnitsArray
        Database for the phonon energies computed by the phdisp calculation. The keys are
        the phonon mode, and the values are an array (of length M) containing the energies at each q-point
-       with units phdisp.units
+       with units phdisp.units. phdisp.array holds all of the energies with shape num_modes x M.
 
     """
 
+    yaml_sections = ('phdisp',)
+
     def __init__(self, pert_dict):
         """
         Constructor method
@@ -47,7 +49,7 @@ class Phdisp(CalcMode):
         energy_units = self._pert_dict['phdisp'].pop('phdisp units')
 
         self.qpt = RecipPtDB.from_lattice(qpoint, qpoint_units, self.lat, self.recip_lat, qpath, qpath_units)
-        self.phdisp = UnitsDict.from_dict(energies_dict, energy_units)
+        self.phdisp = UnitsArray.from_dict(energies_dict, energy_units)
 
     def plot_phdisp(self, ax, show_qpoint_labels=True, **kwargs):
         """
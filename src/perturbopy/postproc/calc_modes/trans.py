@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.interpolate import interp1d, RegularGridInterpolator, LinearNDInterpolator
 from perturbopy.postproc.dbs.units_dict import UnitsDict
 from perturbopy.postproc.calc_modes.calc_mode import CalcMode
 
@@ -54,8 +55,19 @@ class Trans(CalcMode):
         additional dictionaries with keys giving the iteration number and values giving the conductivity tensor
         at that iteration.
 
+    cond_iter_array : np.ma.MaskedArray
+        Conductivity tensors at each iteration of the iterative BTE stacked into an array of shape
+        num_config x niter_max x 3 x 3 (with units cond.units), if running an ITA calculation (if not,
+        this field will be None). Row i corresponds to configuration i + 1. The iterations beyond
+        the number of iterations of a configuration are masked.
+
+    num_iter : np.ndarray
+        Number of iterations of each configuration, if running an ITA calculation (if not, this field will be None)
+
     """
 
+    yaml_sections = ('trans',)
+
     def __init__(self, pert_dict):
         """
         Constructor method
@@ -100,10 +112,13 @@ class Trans(CalcMode):
 
         if 'number of iterations' in trans_dat[1].keys():
             self.cond_iter = UnitsDict(units=self.cond.units)
+            self.num_iter = np.array([len(trans_dat[config_idx]['iteration']) for config_idx in trans_dat.keys()])
+            cond_iter_data = np.zeros((num_config, np.max(self.num_iter), 3, 3))
         else:
             self.cond_iter = None
+            self.num_iter = None
 
-        for config_idx in trans_dat.keys():
+        for iconfig, config_idx in enumerate(trans_dat.keys()):
             self.temper[config_idx] = trans_dat[config_idx].pop('temperature')
             self.chem_pot[config_idx] = trans_dat[config_idx].pop('chemical potential')
             self.conc[config_idx] = trans_dat[config_idx].pop('concentration')
@@ -114,7 +129,7 @@ class Trans(CalcMode):
                 self.seebeck[config_idx] = np.array(trans_dat[config_idx].pop('Seebeck coefficient')['tensor'])
             
             if self.thermal_cond is not None:
-                self.seebeck[config_idx] = np.array(trans_dat[config_idx].pop('thermal conductivity')['tensor'])
+                self.thermal_cond[config_idx] = np.array(trans_dat[config_idx].pop('thermal conductivity')['tensor'])
 
             if self.bfield is not None:
                 self.bfield[config_idx] = np.array(trans_dat[config_idx].pop('magnetic field'))
@@ -128,3 +143,259 @@ class Trans(CalcMode):
                     conductivity_iter[iteration] = iteration_dat[iteration]['conductivity']['tensor']
 
                 self.cond_iter[config_idx] = conductivity_iter
+                cond_iter_data[iconfig, :len(conductivity_iter)] = list(conductivity_iter.values())
+
+        if self.cond_iter is not None:
+            mask = np.arange(cond_iter_data.shape[1]) >= self.num_iter[:, np.newaxis]
+            mask = np.broadcast_to(mask[:, :, np.newaxis, np.newaxis], cond_iter_data.shape).copy()
+            self.cond_iter_array = np.ma.MaskedArray(cond_iter_data, mask=mask)
+        else:
+            self.cond_iter_array = None
+
+        # Columnar view of the configurations and its sorted indexes, built on first use
+        self._table = None
+        self._sorted_indexes = {}
+
+    @property
+    def table(self):
+        """
+        Structured array with one row per configuration and the fields: config, temper, chem_pot, conc, cond, mob,
+        and seebeck, thermal_cond and bfield if computed. The values have the units of the corresponding attributes.
+        The table is built from the attributes on first use.
+
+        """
+        if self._table is None:
+            self._table = self._build_table()
+
+        return self._table
+
+    def _build_table(self):
+        configs = list(self.temper.keys())
+
+        fields = [('config', int), ('temper', float), ('chem_pot', float), ('conc', float),
+                  ('cond', float, (3, 3)), ('mob', float, (3, 3))]
+
+        for name in ['seebeck', 'thermal_cond']:
+            if getattr(self, name) is not None:
+                fields.append((name, float, (3, 3)))
+
+        if self.bfield is not None:
+            fields.append(('bfield', float, (3,)))
+
+        table = np.zeros(len(configs), dtype=fields)
+        table['config'] = configs
+
+        for name in table.dtype.names[1:]:
+            table[name] = [getattr(self, name)[config_idx] for config_idx in configs]
+
+        return table
+
+    def _sorted_index(self, field):
+        """
+        Sorted values of a scalar field of the table, and the rows of the table in this order
+
+        """
+        if field not in self._sorted_indexes:
+            order = np.argsort(self.table[field], kind='stable')
+            self._sorted_indexes[field] = (self.table[field][order], order)
+
+        return self._sorted_indexes[field]
+
+    def select(self, temper=None, chem_pot=None, conc=None, rtol=1e-4, sort_by='conc'):
+        """
+        Method to select the configurations with given temperature, chemical potential and/or concentration,
+        using sorted indexes of the table. For example, select(temper=300) gives all of the configurations at 300 K
+        sorted by concentration.
+
+        Parameters
+        ----------
+        temper, chem_pot, conc : float or tuple, optional
+           Value of the quantity, matched within rtol, or (min, max) range of values (inclusive),
+           in the units of the corresponding attributes. Quantities which are None are not used for the selection.
+        rtol : float, optional
+           Relative tolerance used to match values
+        sort_by : str, optional
+           Field of the table by which to sort the selected configurations, or None to keep the order of the configurations
+
+        Returns
+        -------
+        configs : np.ndarray
+           Rows of the table of the selected configurations, see table
+
+        """
+        selected = np.ones(len(self.table), dtype=bool)
+
+        for field, value in [('temper', temper), ('chem_pot', chem_pot), ('conc', conc)]:
+            if value is None:
+                continue
+
+            if isinstance(value, tuple):
+                low, high = value
+            else:
+                low, high = value - rtol * abs(value), value + rtol * abs(value)
+
+            values, order = self._sorted_index(field)
+            in_range = np.zeros(len(self.table), dtype=bool)
+            in_range[order[np.searchsorted(values, low, side='left'):np.searchsorted(values, high, side='right')]] = True
+            selected &= in_range
+
+        configs = self.table[selected]
+
+        if sort_by is not None:
+            configs = configs[np.argsort(configs[sort_by], kind='stable')]
+
+        return configs
+
+    def interpolate(self, quantity, temper, conc, log_conc=True):
+        """
+        Method to interpolate a computed quantity, e.g. the mobility, at arbitrary temperatures and concentrations
+        over the sweep of configurations. The interpolation is linear in the temperature and in the logarithm
+        of the concentration. Sweeps over a grid of temperatures and concentrations are interpolated on the grid,
+        other sweeps are interpolated on a triangulation of the configurations.
+
+        Parameters
+        ----------
+        quantity : str
+           Field of the table to interpolate, e.g. 'mob', 'cond', 'seebeck', 'thermal_cond' or 'chem_pot'
+        temper : array_like
+           Temperatures at which to interpolate, in the units of temper
+        conc : array_like
+           Concentrations at which to interpolate, in the units of conc, broadcast against temper
+        log_conc : bool, optional
+           If True, the interpolation is linear in log10 of the absolute value of the concentration
+
+        Returns
+        -------
+        values : np.ndarray
+           Array of shape broadcast(temper, conc).shape + shape of the quantity, e.g. (..., 3, 3) for the mobility,
+           with nan outside of the sweep
+
+        """
+        table = self.table
+
+        if quantity not in table.dtype.names or quantity in ['config', 'temper', 'conc']:
+            raise ValueError(f'Cannot interpolate {quantity}, choose from {table.dtype.names[2:]} except conc')
+
+        temper, conc = np.broadcast_arrays(np.asarray(temper, dtype=float), np.asarray(conc, dtype=float))
+        value_shape = table.dtype[quantity].shape
+        values = np.reshape(table[quantity], (len(table), -1))
+
+        def coord(c):
+            return np.log10(np.abs(c)) if log_conc else c
+
+        points = np.stack([table['temper'], coord(table['conc'])], axis=1)
+        queries = np.stack([np.ravel(temper), coord(np.ravel(conc))], axis=1)
+
+        unique_temper = np.unique(points[:, 0])
+        unique_conc = np.unique(points[:, 1])
+
+        if len(unique_temper) == 1 or len(unique_conc) == 1:
+            # One-dimensional sweep: the other coordinate of the queries must match the sweep
+            axis = 1 if len(unique_temper) == 1 else 0
+            fixed = points[0, 1 - axis]
+
+            if len(np.unique(points[:, axis])) != len(table):
+                raise ValueError('The configurations of the sweep should have distinct temperatures or concentrations')
+
+            interpolator = interp1d(points[:, axis], values, axis=0, bounds_error=False, fill_value=np.nan)
+            result = interpolator(queries[:, axis])
+            result[~np.isclose(queries[:, 1 - axis], fixed)] = np.nan
+
+        elif len(unique_temper) * len(unique_conc) == len(table) and len(np.unique(points, axis=0)) == len(table):
+            grid = np.empty((len(unique_temper), len(unique_conc), values.shape[1]))
+            grid[np.searchsorted(unique_temper, points[:, 0]), np.searchsorted(unique_conc, points[:, 1])] = values
+
+            interpolator = RegularGridInterpolator((unique_temper, unique_conc), grid, bounds_error=False, fill_value=np.nan)
+            result = interpolator(queries)
+
+        else:
+            interpolator = LinearNDInterpolator(points, values, fill_value=np.nan, rescale=True)
+            result = interpolator(queries)
+
+        return np.reshape(result, temper.shape + value_shape)
+
+    def _check_iterations(self):
+        if self.cond_iter_array is None:
+            raise ValueError('The conductivity at each iteration is only available for ITA calculations')
+
+    def cond_iter_change(self):
+        """
+        Method to compute the relative change of the conductivity tensor at each iteration of the iterative BTE,
+        i.e. the Frobenius norm of cond_n - cond_(n-1) divided by the Frobenius norm of cond_n.
+
+        Returns
+        -------
+        rel_change : np.ma.MaskedArray
+            Array of shape num_config x niter_max. The first iteration, and the iterations beyond
+            the number of iterations of each configuration, are masked.
+
+        """
+        self._check_iterations()
+
+        cond = self.cond_iter_array.data
+        rel_change = np.zeros(cond.shape[:2])
+
+        norms = np.linalg.norm(cond, axis=(2, 3))
+        changes = np.linalg.norm(np.diff(cond, axis=1), axis=(2, 3))
+        rel_change[:, 1:] = changes / np.where(norms[:, 1:] > 0, norms[:, 1:], 1.0)
+
+        mask = np.arange(cond.shape[1]) >= self.num_iter[:, np.newaxis]
+        mask[:, 0] = True
+
+        return np.ma.MaskedArray(rel_change, mask=mask)
+
+    def iterations_to_tolerance(self, tol=1e-3):
+        """
+        Method to find, for each configuration, the first iteration at which the relative change
+        of the conductivity tensor (see cond_iter_change) is below a tolerance
+
+        Parameters
+        ----------
+        tol : float, optional
+            Tolerance on the relative change of the conductivity tensor
+
+        Returns
+        -------
+        iterations : np.ndarray
+            Array of length num_config of iteration numbers, starting at 1, or -1 for
+            the configurations which did not reach the tolerance
+
+        """
+        converged = self.cond_iter_change().filled(np.inf) < tol
+
+        return np.where(np.any(converged, axis=1), np.argmax(converged, axis=1) + 1, -1)
+
+    def cond_extrapolated(self, rtol=1e-8):
+        """
+        Method to extrapolate the converged conductivity tensor of each configuration from its last three
+        iterations, using Aitken's delta-squared process on each component of the tensor. Components for which
+        the extrapolation is ill-defined (fewer than three iterations, or vanishing second difference)
+        keep the value of the last iteration.
+
+        Parameters
+        ----------
+        rtol : float, optional
+            Second differences smaller than rtol times the magnitude of the component are considered vanishing
+
+        Returns
+        -------
+        cond : np.ndarray
+            Array of shape num_config x 3 x 3 of the extrapolated conductivity tensors (with units cond.units)
+
+        """
+        self._check_iterations()
+
+        cond = self.cond_iter_array.data
+        configs = np.arange(cond.shape[0])
+
+        last = cond[configs, self.num_iter - 1]
+        previous = cond[configs, np.maximum(self.num_iter - 2, 0)]
+        before_previous = cond[configs, np.maximum(self.num_iter - 3, 0)]
+
+        first_diff = last - previous
+        second_diff = first_diff - (previous - before_previous)
+
+        valid = (self.num_iter[:, np.newaxis, np.newaxis] >= 3) & (np.abs(second_diff) > rtol * np.abs(last))
+        correction = np.divide(first_diff**2, second_diff, out=np.zeros_like(last), where=valid)
+
+        return last - correction
@@ -1,4 +1,5 @@
 import numpy as np
+from scipy.spatial import cKDTree
 from perturbopy.postproc.utils.constants import standardize_units_name, recip_points_units_names
 from perturbopy.postproc.utils.plot_tools import points_fcc
 from perturbopy.postproc.utils import lattice
@@ -35,6 +36,10 @@ class RecipPtDB():
        Dictionary of reciprocal space point labels
        example: {"Gamma": [0, 0, 0], 'L': [.5,.5,.5]}
 
+    tree : scipy.spatial.cKDTree
+       KD-tree of the points, built when the points are first searched and rebuilt when
+       the units or the points change.
+
     """
 
     def __init__(self, points_cart, points_cryst, units='crystal', path=None, path_units='arbitrary', labels={}):
@@ -84,6 +89,20 @@ class RecipPtDB():
 
         self.labels = labels.copy()
 
+        self._tree = None
+        self._tree_points = None
+
+    @property
+    def tree(self):
+        """
+        KD-tree of the points in the current units, built on first use
+        """
+        if self._tree is None or self._tree_points is not self.points:
+            self._tree = cKDTree(np.transpose(self.points))
+            self._tree_points = self.points
+
+        return self._tree
+
     @classmethod
     def from_lattice(self, points, units, lat, recip_lat, path=None, path_units='arbitrary', labels={}):
         """
@@ -161,8 +180,48 @@ class RecipPtDB():
         elif self.units == 'crystal':
             self.points = self.points_cryst
 
+        # Distances depend on the units, so the KD-tree is rebuilt on the next search
+        self._tree = None
+
         return self.points
 
+    def unfold(self, symop, lat, recip_lat, kc_dim=None, time_reversal=True):
+        """
+        Method to unfold the points, assumed to be irreducible points, to the full Brillouin zone
+        using the symmetry operations of the crystal.
+
+        Parameters
+        ----------
+        symop : dict, list, or array_like
+           The symmetry operations in crystal coordinates of the real-space lattice, e.g. CalcMode.symop
+
+        lat : array
+           3x3 array of lattice vectors [v1, v2, v3] in units of alat
+
+        recip_lat : array
+           3x3 array of reciprocal lattice vectors [v1, v2, v3] in units of 2pi/a
+
+        kc_dim : array_like, optional
+           The dimensions of the uniform grid on which the points lie, e.g. CalcMode.kc_dim
+
+        time_reversal : bool, optional
+           If True, time-reversal symmetry (k -> -k) is also applied
+
+        Returns
+        -------
+        full_db : RecipPtDB
+           Database of the points of the full Brillouin zone, in crystal coordinates folded into [0, 1)
+
+        full2irr : array
+           Index of the irreducible point equivalent to each point of full_db. A quantity stored
+           with the irreducible points along its last axis is unfolded with values[..., full2irr].
+
+        """
+        full_points, full2irr = lattice.unfold_points(self.points_cryst, symop, kc_dim, time_reversal)
+        full_db = RecipPtDB.from_lattice(full_points, 'crystal', lat, recip_lat, labels=self.labels)
+
+        return full_db, full2irr
+
     def scale_path(self, range_min, range_max):
         """
         Method to scale the arbitrary k path plotting coordinates to a certain range.
@@ -228,10 +287,57 @@ class RecipPtDB():
            The indices of the matching reciprocal space point in the points array
 
         """
-        points_indices = lattice.find_point(point, self.points, max_dist, nearest)
+        point = np.reshape(lattice.reshape_points(point), (3,))
+
+        if nearest:
+            min_distance, _ = self.tree.query(point)
+
+            if min_distance > max_dist:
+                return []
+
+            # Duplicate points at the minimum distance, within the tolerance of np.isclose
+            candidates = np.array(self.tree.query_ball_point(point, min_distance * (1 + 1e-5) + 1e-8), dtype=int)
+            distances = lattice.compute_distances(self.points[:, candidates], point)
+            points_indices = np.sort(candidates[np.isclose(distances, min_distance)])
+
+        else:
+            points_indices = np.sort(np.array(self.tree.query_ball_point(point, max_dist), dtype=int))
 
         return points_indices
 
+    def find_indices(self, points, max_dist=0.025, nearest=True):
+        """
+        Method to find the indices of many points at once
+
+        Parameters
+        ----------
+        points : array_like
+           Array of column-oriented reciprocal space points to be searched, of shape (3, M)
+
+        max_dist : float, optional
+           The maximum distance between the points to locate and the points identified as matches
+
+        nearest : bool, optional
+           If True, the index of the nearest match of each point is returned. Otherwise,
+           all of the matches within max_dist are returned.
+
+        Returns
+        -------
+        points_indices : array or list of arrays
+           If nearest is True, an array of length M with the index of the nearest match of each point,
+           or -1 if no point is within max_dist. Otherwise, a list of M arrays of indices.
+
+        """
+        points = np.transpose(lattice.reshape_points(points))
+
+        if nearest:
+            distances, points_indices = self.tree.query(points, distance_upper_bound=max_dist)
+            points_indices[np.isinf(distances)] = -1
+
+            return points_indices
+
+        return [np.sort(np.array(indices, dtype=int)) for indices in self.tree.query_ball_point(points, max_dist)]
+
     def point2path(self, point, max_dist=0.025, nearest=True):
         """
         Method to find the path coordinate corresponding to a reciprocal space point coordinate
@@ -255,7 +361,12 @@ class RecipPtDB():
 
         """
 
-        path_coord = lattice.convert_point2path(point, self.points, self.path, max_dist, nearest)
+        point_indices = self.find(point, max_dist, nearest)
+
+        if len(point_indices) == 0:
+            return np.array([])
+
+        path_coord = np.array(self.path)[point_indices]
 
         return path_coord
 
@@ -1,5 +1,5 @@
 import numpy as np
-from perturbopy.postproc.utils.constants import conversion_factor, standardize_units_name
+from perturbopy.postproc.utils.constants import conversion_factor, standardize_units_name, energy_conversion_factor
 
 
 class UnitsDict(dict):
@@ -47,3 +47,214 @@ class UnitsDict(dict):
         units_dict.update(input_dict)
         
         return units_dict
+
+
+class UnitsArray(UnitsDict):
+    """
+    This is a class representation of a set of physical quantities with units, stored as one array (possibly
+    a view of a larger array) and organized in a dictionary for backward compatibility with UnitsDict. The leading axes of the array
+    correspond to the levels of keys of the dictionary, e.g. the band index, and the values of the dictionary
+    are views of the array. Bulk operations (minimum over bands, unit conversion, etc.) are single NumPy
+    calls on the array attribute.
+
+    Assigning the values of a key, e.g. bands[1] = energies, copies them into the array, so that the array and
+    the views stay in sync. The values must broadcast to the shape of the view, and new keys cannot be added.
+
+    Attributes
+    ----------
+    array : np.ndarray
+       Array of the physical quantities. For example, band energies have shape num_bands x num_kpoints.
+    index_keys : list of lists
+       The keys of the dictionary at each level, in the order of the leading axes of the array
+    units : str
+       The units of the physical quantities
+
+    """
+    def __init__(self, units, array, index_keys):
+        """
+        Constructor method
+
+        Parameters
+        ----------
+        units : str
+        array : array_like
+        index_keys : list of lists
+           The keys labelling the leading axes of array. A single list of keys labels the first axis.
+
+        """
+        super().__init__(units)
+
+        if len(index_keys) > 0 and not isinstance(index_keys[0], (list, tuple, np.ndarray)):
+            index_keys = [index_keys]
+
+        self.array = np.asarray(array)
+        self.index_keys = [list(keys) for keys in index_keys]
+
+        if self.array.shape[:len(self.index_keys)] != tuple(len(keys) for keys in self.index_keys):
+            raise ValueError(f'The leading axes of the array, {self.array.shape}, do not match the number of keys '
+                             f'{[len(keys) for keys in self.index_keys]}')
+
+        self._key_position = [{key: i for i, key in enumerate(keys)} for keys in self.index_keys]
+
+        dict.update(self, self._views(self.array, 0))
+
+    def _views(self, array, level):
+        """
+        Helper function to build the (nested) dictionary of views of the array
+
+        """
+        if level == len(self.index_keys) - 1:
+            return {key: array[i] for i, key in enumerate(self.index_keys[level])}
+
+        return {key: _ViewDict(array[i], self._key_position[level + 1:]) for i, key in enumerate(self.index_keys[level])}
+
+    def __setitem__(self, key, value):
+        _assign_view(self.array, self._key_position[0], key, value)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def __reduce__(self):
+        return (self.__class__, (self.units, self.array, self.index_keys))
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is not None:
+            return self.array.astype(dtype, copy=False)
+
+        return self.array
+
+    @property
+    def depth(self):
+        """
+        Number of levels of keys of the dictionary
+        """
+        return len(self.index_keys)
+
+    def index(self, *keys):
+        """
+        Method to get the position in the array of a set of keys
+
+        Parameters
+        ----------
+        keys : hashable
+           One key per level, starting from the top level
+
+        Returns
+        -------
+        index : tuple of int
+           Position of the keys along the leading axes of the array
+
+        """
+        return tuple(self._key_position[level][key] for level, key in enumerate(keys))
+
+    def convert_units(self, new_units, conversion=energy_conversion_factor):
+        """
+        Method to convert the physical quantities to new units, in place. The views stored in the dictionary
+        are updated as well.
+
+        Parameters
+        ----------
+        new_units : str
+           The units to convert to
+        conversion : callable, optional
+           Function returning the conversion factor between two units. Defaults to energy units.
+
+        """
+        self.array *= conversion(self.units, new_units)
+        self.units = new_units
+
+    @classmethod
+    def from_dict(cls, input_dict, units, depth=1):
+        """
+        Class method to create a UnitsArray object from a (nested) Python dictionary and a set of units.
+        The lists or arrays at the bottom level of the dictionary must all have the same shape, and the keys at
+        each level must be the same in every branch. The values are converted to an array in one call.
+
+        Parameters
+        ----------
+        input_dict : dict
+           Dictionary of lists or arrays, nested depth times
+        units : str
+        depth : int, optional
+           Number of levels of keys
+
+        """
+        index_keys = []
+        level_dict = input_dict
+
+        for level in range(depth):
+            if not isinstance(level_dict, dict):
+                raise ValueError(f'The input dictionary should be nested {depth} times')
+
+            index_keys.append(list(level_dict.keys()))
+
+            if level < depth - 1:
+                level_dict = level_dict[index_keys[-1][0]]
+
+        def collect(data, level):
+            """
+            Helper function to gather the values of the nested dictionary as nested lists
+
+            """
+            if level == depth:
+                return data
+
+            if list(data.keys()) != index_keys[level]:
+                raise ValueError(f'The keys at level {level} of the input dictionary are not the same in every branch')
+
+            return [collect(data[key], level + 1) for key in index_keys[level]]
+
+        return cls(units, np.array(collect(input_dict, 0)), index_keys)
+
+
+class _ViewDict(dict):
+    """
+    Dictionary of the views of an array, for the nested levels of a UnitsArray. Assigned values are copied
+    into the array.
+
+    """
+    def __init__(self, array, key_positions):
+        """
+        Constructor method
+
+        Parameters
+        ----------
+        array : np.ndarray
+        key_positions : list of dict
+           Positions along the leading axes of the array of the keys of this level and of the nested levels
+
+        """
+        self._array = array
+        self._key_positions = key_positions
+
+        if len(key_positions) == 1:
+            views = {key: array[i] for key, i in key_positions[0].items()}
+        else:
+            views = {key: _ViewDict(array[i], key_positions[1:]) for key, i in key_positions[0].items()}
+
+        super().__init__(views)
+
+    def __reduce__(self):
+        return (self.__class__, (self._array, self._key_positions))
+
+    def __setitem__(self, key, value):
+        _assign_view(self._array, self._key_positions[0], key, value)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+
+def _assign_view(array, key_position, key, value):
+    """
+    Helper function to copy the values of a key of a UnitsArray into its array
+
+    """
+    if key not in key_position:
+        raise KeyError(f'{key} is not a key of the UnitsArray. Keys cannot be added, since the values are views of one array.')
+
+    if isinstance(value, dict):
+        raise TypeError('The values of a key of a UnitsArray should be array_like, not a dict')
+
+    array[key_position[key]] = value
@@ -0,0 +1,91 @@
+"""
+Functions for binning quantities defined on a set of energies onto an energy grid.
+
+"""
+import numpy as np
+from scipy import sparse
+
+
+def grid_bin_edges(energy_grid):
+    """
+    Method to compute the edges of the bins centered on the points of an energy grid. The inner edges are
+    the midpoints between grid points, and the outer bins are as wide as their neighboring half bins.
+
+    Parameters
+    ----------
+    energy_grid : array_like
+        Sorted array of energies, of length nE >= 2
+
+    Returns
+    -------
+    edges : np.ndarray
+        Array of nE + 1 bin edges
+
+    """
+    energy_grid = np.asarray(energy_grid, dtype=float)
+
+    if energy_grid.ndim != 1 or len(energy_grid) < 2:
+        raise ValueError('The energy grid should be a 1D array of at least two energies')
+
+    if np.any(np.diff(energy_grid) <= 0):
+        raise ValueError('The energy grid should be strictly increasing')
+
+    midpoints = 0.5 * (energy_grid[1:] + energy_grid[:-1])
+
+    return np.concatenate([[2 * energy_grid[0] - midpoints[0]], midpoints, [2 * energy_grid[-1] - midpoints[-1]]])
+
+
+def energy_bin_weights(energies, energy_grid, smearing=None, cutoff=5.0):
+    """
+    Method to build the sparse matrix W that maps values defined at a set of energies onto an energy grid,
+    such that W @ values gives the energy-resolved density of the values. Each column of W integrates to 1
+    over the grid (unless the energy falls outside the grid).
+
+    Parameters
+    ----------
+    energies : array_like
+        Energies of the M states, flattened if not 1D
+    energy_grid : array_like
+        Sorted energy grid of nE points, in the same units as energies
+    smearing : float, optional
+        Standard deviation of the Gaussian broadening. If None, each state is assigned to the histogram bin
+        centered on the nearest grid point, see grid_bin_edges.
+    cutoff : float, optional
+        Gaussians are truncated beyond cutoff standard deviations
+
+    Returns
+    -------
+    weights : scipy.sparse.csr_matrix
+        Matrix of shape nE x M, in units of 1 / energy
+
+    """
+    energies = np.ravel(np.asarray(energies, dtype=float))
+    energy_grid = np.asarray(energy_grid, dtype=float)
+    edges = grid_bin_edges(energy_grid)
+    num_energies = len(energy_grid)
+    num_states = len(energies)
+
+    if smearing is None:
+        rows = np.searchsorted(edges, energies, side='right') - 1
+        cols = np.arange(num_states)
+
+        inside = (rows >= 0) & (rows < num_energies)
+        rows, cols = rows[inside], cols[inside]
+        values = 1.0 / np.diff(edges)[rows]
+
+    else:
+        if smearing <= 0:
+            raise ValueError('smearing should be positive')
+
+        first = np.searchsorted(energy_grid, energies - cutoff * smearing, side='left')
+        last = np.searchsorted(energy_grid, energies + cutoff * smearing, side='right')
+        counts = last - first
+
+        # Grid points within the cutoff of each state, as flattened (row, col) pairs
+        cols = np.repeat(np.arange(num_states), counts)
+        offsets = np.arange(np.sum(counts)) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = np.repeat(first, counts) + offsets
+
+        values = np.exp(-0.5 * ((energy_grid[rows] - energies[cols]) / smearing)**2) / (np.sqrt(2 * np.pi) * smearing)
+
+    return sparse.csr_matrix((values, (rows, cols)), shape=(num_energies, num_states))
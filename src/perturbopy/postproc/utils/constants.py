@@ -317,3 +317,31 @@ def hbar(units):
         raise ValueError(f"Please choose hbar units from the following list: {list(hbar_dict.keys())}")
 
     return hbar_dict[units][0] * (10 ** hbar_dict[units][1])
+
+
+def kB(units):
+    """
+    find the value of the Boltzmann constant for specific units.
+
+    Parameters
+    ----------
+    units : str
+       The units kB should be returned in.
+
+    Returns
+    -------
+    kB : float
+       The value of the Boltzmann constant in the specified units.
+
+    Raises
+    ------
+    ValueError
+        If `units` is not in the keys of `kB_dict`
+
+    """
+    kB_dict = {'ev/K': (8.617333262, -5), 'atomic': (3.166811563, -6), 'J/K': (1.380649, -23)}
+
+    if units not in kB_dict.keys():
+        raise ValueError(f"Please choose kB units from the following list: {list(kB_dict.keys())}")
+
+    return kB_dict[units][0] * (10 ** kB_dict[units][1])
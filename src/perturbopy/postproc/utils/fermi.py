@@ -0,0 +1,144 @@
+"""
+Functions for computing carrier numbers from Fermi-Dirac occupations and solving for the chemical potential,
+for many temperatures and carrier numbers at once.
+
+"""
+import numpy as np
+from scipy.special import expit
+from perturbopy.postproc.utils.constants import kB
+
+
+def fermi_dirac(energies, chem_pot, temper):
+    """
+    Method to compute the Fermi-Dirac occupations.
+
+    Parameters
+    ----------
+    energies : array_like
+        Energies in eV
+    chem_pot : array_like
+        Chemical potentials in eV, broadcast against energies
+    temper : array_like
+        Temperatures in K, broadcast against energies
+
+    Returns
+    -------
+    occupations : np.ndarray
+        Occupations 1 / (exp((E - mu) / kT) + 1)
+
+    """
+    return expit((np.asarray(chem_pot) - np.asarray(energies)) / (kB('ev/K') * np.asarray(temper)))
+
+
+def carrier_number(energies, weights, temper, chem_pot, hole=False, chunk_size=2**20):
+    """
+    Method to compute the number of carriers sum_i w_i f(e_i) for electrons, or sum_i w_i (1 - f(e_i)) for holes,
+    for many (temperature, chemical potential) pairs at once. The occupations are evaluated as one
+    num_pairs x num_states array operation, in chunks of states to bound the memory.
+
+    Parameters
+    ----------
+    energies : array_like
+        Energies of the states in eV, flattened if not 1D, e.g. band energies of shape num_bands x num_kpoints
+    weights : array_like
+        Weights of the states, broadcast against energies, e.g. 2 / num_kpoints for spin-degenerate bands
+    temper : array_like
+        Temperatures in K
+    chem_pot : array_like
+        Chemical potentials in eV, broadcast against temper
+    hole : bool, optional
+        Whether to count the holes instead of the electrons
+    chunk_size : int, optional
+        Maximum number of occupations evaluated at once
+
+    Returns
+    -------
+    num_carriers : np.ndarray
+        Array of shape broadcast(temper, chem_pot).shape of the numbers of carriers
+
+    """
+    energies, weights = np.broadcast_arrays(np.asarray(energies, dtype=float), np.asarray(weights, dtype=float))
+    energies, weights = np.ravel(energies), np.ravel(weights)
+    temper, chem_pot = np.broadcast_arrays(np.asarray(temper, dtype=float), np.asarray(chem_pot, dtype=float))
+
+    if np.any(temper <= 0):
+        raise ValueError('Temperatures should be positive')
+
+    kT = np.ravel(kB('ev/K') * temper)[:, np.newaxis]
+    mu = np.ravel(chem_pot)[:, np.newaxis]
+    sign = 1.0 if hole else -1.0
+
+    num_carriers = np.zeros(len(mu))
+    step = max(chunk_size // max(len(mu), 1), 1)
+
+    for first in range(0, len(energies), step):
+        # f(e) = expit((mu - e) / kT) and 1 - f(e) = expit((e - mu) / kT)
+        occupations = expit(sign * (energies[np.newaxis, first:first + step] - mu) / kT)
+        num_carriers += occupations @ weights[first:first + step]
+
+    return np.reshape(num_carriers, temper.shape)
+
+
+def solve_chem_pot(energies, weights, temper, num_carriers, hole=False, tol=1e-8, max_iter=200, chunk_size=2**20):
+    """
+    Method to compute the chemical potentials giving a set of numbers of carriers at a set of temperatures,
+    see carrier_number. All of the chemical potentials are bisected simultaneously, with one evaluation
+    of the occupations of all states for all targets per bisection step.
+
+    Parameters
+    ----------
+    energies : array_like
+        Energies of the states in eV, flattened if not 1D
+    weights : array_like
+        Weights of the states, broadcast against energies
+    temper : array_like
+        Temperatures in K
+    num_carriers : array_like
+        Numbers of carriers, broadcast against temper
+    hole : bool, optional
+        Whether the carriers are holes instead of electrons
+    tol : float, optional
+        Tolerance on the chemical potentials in eV
+    max_iter : int, optional
+        Maximum number of bisection steps
+    chunk_size : int, optional
+        Maximum number of occupations evaluated at once
+
+    Returns
+    -------
+    chem_pot : np.ndarray
+        Array of shape broadcast(temper, num_carriers).shape of the chemical potentials in eV
+
+    """
+    energies = np.asarray(energies, dtype=float)
+    temper, num_carriers = np.broadcast_arrays(np.asarray(temper, dtype=float), np.asarray(num_carriers, dtype=float))
+    total = np.sum(np.broadcast_to(weights, energies.shape))
+
+    if np.any(temper <= 0):
+        raise ValueError('Temperatures should be positive')
+
+    if np.any(num_carriers <= 0) or np.any(num_carriers >= total):
+        raise ValueError(f'Numbers of carriers should be between 0 and the number of states, {total}')
+
+    targets = np.ravel(num_carriers)
+
+    # The electrons (and holes) satisfy N < total exp(|mu - e| / kT) beyond the range of the energies,
+    # which brackets the chemical potential
+    fraction = np.minimum(targets, total - targets) / total
+    margin = kB('ev/K') * np.ravel(temper) * (1.0 - np.log(fraction))
+    lower = np.min(energies) - margin
+    upper = np.max(energies) + margin
+
+    for _ in range(max_iter):
+        middle = 0.5 * (lower + upper)
+        counts = carrier_number(energies, weights, np.ravel(temper), middle, hole, chunk_size)
+
+        # The number of electrons increases with the chemical potential, and the number of holes decreases
+        above = (counts > targets) if not hole else (counts < targets)
+        upper = np.where(above, middle, upper)
+        lower = np.where(above, lower, middle)
+
+        if np.all(upper - lower < tol):
+            break
+
+    return np.reshape(0.5 * (lower + upper), temper.shape)
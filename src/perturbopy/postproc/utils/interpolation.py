@@ -0,0 +1,200 @@
+"""
+Functions and classes for interpolating quantities computed along a path of reciprocal space points.
+
+"""
+import numpy as np
+from scipy.interpolate import CubicSpline
+from perturbopy.postproc.utils.lattice import reshape_points
+
+
+def split_path(path, points, cos_tol=1e-3, split_indices=None):
+    """
+    Method to split a path of reciprocal space points into straight segments. A segment ends where the direction
+    of the path changes, e.g. at a high-symmetry point, or where the path jumps (repeated path coordinate).
+
+    Parameters
+    ----------
+    path : array_like
+        Path coordinates of the N points, in increasing order
+
+    points : array_like
+        Array of shape (3, N) of the points, in cartesian coordinates
+
+    cos_tol : float, optional
+        The direction changes if the cosine of the angle between consecutive steps differs from 1 by more than cos_tol
+
+    split_indices : array_like, optional
+        Indices of additional points at which to split the path, e.g. labelled points
+
+    Returns
+    -------
+    segments : list of slices
+        Slices of the points in each segment. Consecutive segments share their end point, unless the path jumps.
+
+    """
+    path = np.asarray(path, dtype=float)
+    points = reshape_points(points)
+
+    steps = np.diff(points, axis=1)
+    step_lengths = np.linalg.norm(steps, axis=0)
+    path_steps = np.diff(path)
+
+    # Jumps of the path: the segment ends before the step
+    jumps = np.flatnonzero((path_steps <= 0) | (step_lengths == 0))
+
+    # Changes of direction at the points between two steps
+    directions = steps / np.where(step_lengths > 0, step_lengths, 1.0)
+    cosines = np.sum(directions[:, 1:] * directions[:, :-1], axis=0)
+    kinks = np.flatnonzero(cosines < 1 - cos_tol) + 1
+
+    breaks = set(kinks.tolist())
+
+    if split_indices is not None:
+        breaks.update(int(i) for i in split_indices if 0 < i < len(path) - 1)
+
+    segments = []
+    start = 0
+
+    for i in sorted(breaks.union(jumps.tolist())):
+        if i in breaks and i > start:
+            segments.append(slice(start, i + 1))
+            start = i
+
+        if i in jumps:
+            if i > start:
+                segments.append(slice(start, i + 1))
+            start = i + 1
+
+    if start < len(path) - 1:
+        segments.append(slice(start, len(path)))
+
+    return segments
+
+
+class PathSpline():
+    """
+    Piecewise cubic spline interpolation of values computed along a path of reciprocal space points.
+    A separate spline is fitted on each straight segment of the path, so that kinks of the values at
+    high-symmetry points are preserved.
+
+    Attributes
+    ----------
+    path : np.ndarray
+        Path coordinates of the N points of the fit
+
+    points : np.ndarray
+        Array of shape (3, N) of the points of the fit
+
+    segments : list of slices
+        Slices of the points in each straight segment of the path
+
+    splines : list of scipy.interpolate.CubicSpline
+        Spline of each segment, interpolating all of the values at once
+
+    """
+
+    def __init__(self, path, points, values, split_indices=None):
+        """
+        Constructor method
+
+        Parameters
+        ----------
+        path : array_like
+            Path coordinates of the N points, in increasing order
+
+        points : array_like
+            Array of shape (3, N) of the points. Kinks of the path are detected in these coordinates.
+
+        values : array_like
+            Array of values with the N points along the last axis, e.g. energies of shape num_bands x N
+
+        split_indices : array_like, optional
+            Indices of additional points at which to split the path, e.g. labelled points
+
+        """
+        self.path = np.asarray(path, dtype=float)
+        self.points = reshape_points(points)
+        values = np.asarray(values)
+
+        if values.shape[-1] != len(self.path):
+            raise ValueError(f'The last axis of the values should have length {len(self.path)}')
+
+        self.segments = split_path(self.path, self.points, split_indices=split_indices)
+        self.splines = [CubicSpline(self.path[segment], values[..., segment], axis=-1) for segment in self.segments]
+
+        self._starts = np.array([self.path[segment][0] for segment in self.segments])
+
+    def __call__(self, path_coords, derivative=0):
+        """
+        Method to evaluate the interpolated values, or their derivatives, at a set of path coordinates
+
+        Parameters
+        ----------
+        path_coords : array_like
+            The M path coordinates at which to evaluate the values
+
+        derivative : int, optional
+            Order of the derivative with respect to the path coordinate, from 0 to 3
+
+        Returns
+        -------
+        values : np.ndarray
+            Array of the values with the M path coordinates along the last axis
+
+        """
+        path_coords = np.atleast_1d(np.asarray(path_coords, dtype=float))
+
+        if np.any(path_coords < self.path[0]) or np.any(path_coords > self.path[-1]):
+            raise ValueError(f'Path coordinates should be between {self.path[0]} and {self.path[-1]}')
+
+        iseg = np.clip(np.searchsorted(self._starts, path_coords, side='right') - 1, 0, len(self.segments) - 1)
+
+        values = np.empty(self.splines[0].c.shape[2:] + (len(path_coords),))
+
+        for i, spline in enumerate(self.splines):
+            in_segment = iseg == i
+
+            if np.any(in_segment):
+                values[..., in_segment] = spline(path_coords[in_segment], derivative)
+
+        return values
+
+    def project(self, points, max_dist=0.025):
+        """
+        Method to compute the path coordinates of a set of points, by projecting each point onto the nearest
+        straight line between consecutive points of the path.
+
+        Parameters
+        ----------
+        points : array_like
+            The M points, in the same coordinates as the points of the fit
+
+        max_dist : float, optional
+            The maximum distance between a point and the path
+
+        Returns
+        -------
+        path_coords : np.ndarray
+            Array of length M of the path coordinates, or nan for points further than max_dist from the path
+
+        """
+        points = reshape_points(points)
+
+        # Straight lines between consecutive points of the same segment
+        first = np.concatenate([np.arange(segment.start, segment.stop - 1) for segment in self.segments])
+        starts = self.points[:, first]
+        steps = self.points[:, first + 1] - starts
+
+        # Projection of each point onto each line, shape M x number of lines
+        offsets = points[:, :, np.newaxis] - starts[:, np.newaxis, :]
+        fractions = np.clip(np.einsum('iml,il->ml', offsets, steps) / np.sum(steps**2, axis=0), 0.0, 1.0)
+        distances = np.linalg.norm(offsets - fractions[np.newaxis] * steps[:, np.newaxis, :], axis=0)
+
+        nearest = np.argmin(distances, axis=1)
+        point_range = np.arange(points.shape[1])
+        fractions = fractions[point_range, nearest]
+
+        path_coords = self.path[first[nearest]] + fractions * (self.path[first[nearest] + 1] - self.path[first[nearest]])
+        path_coords[distances[point_range, nearest] > max_dist] = np.nan
+
+        return path_coords
@@ -1,5 +1,6 @@
 import numpy as np
 import warnings
+from scipy.spatial import cKDTree
 
 points_fcc = {'L': [0.5, 0.5, 0.5], 'X': [0.5, 0.0, 0.5], 'W': [0.5, 0.25, 0.75], 'K': [0.375, 0.375, 0.75], 'G': [0, 0, 0]}
 
@@ -108,7 +109,7 @@ def cryst2cart(point_array, lat, recip_lat, forward=True, real_space=True):
     return converted_point_array
 
 
-def compute_distances(point_array1, point_array2):
+def compute_distances(point_array1, point_array2, periodic=False):
     """
     Method to compute the distances between points
 
@@ -119,6 +120,10 @@ def compute_distances(point_array1, point_array2):
         shape. Both will be reshaped to assume column-oriented points if needed. For
         example, arrays of shape (N, 3) will be reshaped to (3, N) if N != 3.
 
+    periodic : bool, optional
+        If True, the points are assumed to be in crystal coordinates, and the distance to the
+        nearest periodic image (differing by a reciprocal lattice vector) is computed.
+
     Returns
     -------
     distances : array
@@ -132,7 +137,12 @@ def compute_distances(point_array1, point_array2):
     if np.shape(point_array1) != np.shape(point_array2) and np.shape(point_array1) != (3, 1) and np.shape(point_array2) != (3, 1):
         raise ValueError("Shape of arrays should be the same, or one array should only contain one k-point.")
 
-    distances = np.linalg.norm(point_array1 - point_array2, axis=0)
+    differences = point_array1 - point_array2
+
+    if periodic:
+        differences = differences - np.rint(differences)
+
+    distances = np.linalg.norm(differences, axis=0)
 
     return distances
 
@@ -181,6 +191,242 @@ def find_point(point, point_array, max_dist=0.025, nearest=True):
         return np.arange(len(distances))[distances <= max_dist]
 
 
+def fold_points(point_array, tol=1e-8):
+    """
+    Method to fold points in crystal coordinates into the unit cell, i.e. to map each
+    coordinate into [0, 1) by subtracting reciprocal lattice vectors.
+
+    Parameters
+    ----------
+    point_array : array_like
+        Array of points in crystal coordinates, reshaped to (3, N) if needed
+
+    tol : float, optional
+        Coordinates within tol of 1 are folded to 0
+
+    Returns
+    -------
+    folded_point_array : array
+        Array of shape (3, N) of the folded points
+
+    """
+    folded_point_array = np.mod(reshape_points(point_array).astype(float), 1.0)
+    folded_point_array[folded_point_array >= 1.0 - tol] = 0.0
+
+    return folded_point_array
+
+
+def grid_point_numbers(point_array, kc_dim, tol=1e-5, periodic=True):
+    """
+    Method to compute the number of each point on a uniform grid of kc_dim[0] x kc_dim[1] x kc_dim[2]
+    points in crystal coordinates, with the third coordinate running fastest, i.e. the point
+    [i / kc_dim[0], j / kc_dim[1], k / kc_dim[2]] has number (i * kc_dim[1] + j) * kc_dim[2] + k.
+
+    Parameters
+    ----------
+    point_array : array_like
+        Array of points in crystal coordinates, reshaped to (3, N) if needed
+
+    kc_dim : array_like
+        The number of grid points along each reciprocal lattice vector
+
+    tol : float, optional
+        Maximum difference, in units of the grid spacing, between a point and the nearest grid point
+
+    periodic : bool, optional
+        If True, points outside of the unit cell are folded onto the grid. Otherwise, they are not on the grid.
+
+    Returns
+    -------
+    numbers : array
+        Array of length N of the grid numbers, or -1 for points that are not on the grid
+
+    """
+    kc_dim = np.reshape(np.array(kc_dim, dtype=int), (3, 1))
+    scaled_points = reshape_points(point_array) * kc_dim
+
+    grid_points = np.rint(scaled_points)
+    on_grid = np.all(np.abs(scaled_points - grid_points) <= tol, axis=0)
+    grid_points = grid_points.astype(int)
+
+    if periodic:
+        grid_points = np.mod(grid_points, kc_dim)
+    else:
+        on_grid &= np.all((grid_points >= 0) & (grid_points < kc_dim), axis=0)
+
+    numbers = (grid_points[0] * kc_dim[1, 0] + grid_points[1]) * kc_dim[2, 0] + grid_points[2]
+    numbers[~on_grid] = -1
+
+    return numbers
+
+
+def find_points(points, point_array, max_dist=0.025, periodic=False, kc_dim=None):
+    """
+    Method to find the index of the nearest match of many points in an array of points, in one vectorized call.
+
+    Parameters
+    ----------
+    points : array_like
+        The M points to be located, reshaped to (3, M) if needed, e.g. from an (M, 3) array
+
+    point_array : array_like
+        The set of points that will be searched through
+
+    max_dist : float, optional
+        The maximum distance between a point to locate and its match
+
+    periodic : bool, optional
+        If True, the points are assumed to be in crystal coordinates, and points that differ by a
+        reciprocal lattice vector are equivalent, e.g. [1, 0, 0] matches [0, 0, 0].
+
+    kc_dim : array_like, optional
+        If given, the points in point_array are assumed to lie on the uniform grid with kc_dim points along each
+        reciprocal lattice vector, e.g. the k-point grid of a calculation, and each point is located by computing
+        the index of the nearest grid point. Otherwise, the points are located with a KD-tree.
+
+    Returns
+    -------
+    points_indices : array
+        Array of length M with the index of the nearest match of each point in point_array, or -1 if
+        no point is within max_dist
+
+    """
+    points = reshape_points(points)
+    point_array = reshape_points(point_array)
+
+    if kc_dim is not None:
+        kc_dim = np.array(kc_dim, dtype=int)
+
+        # Grid number -> index in point_array, keeping the first of any duplicate points
+        grid_numbers = grid_point_numbers(point_array, kc_dim, periodic=periodic)
+        on_grid = np.flatnonzero(grid_numbers >= 0)[::-1]
+
+        grid_lookup = np.full(np.prod(kc_dim), -1, dtype=int)
+        grid_lookup[grid_numbers[on_grid]] = on_grid
+
+        # Any grid point is accepted here, the distance to the match is checked below
+        numbers = grid_point_numbers(points, kc_dim, tol=0.5, periodic=periodic)
+        points_indices = np.where(numbers >= 0, grid_lookup[numbers], -1)
+
+        matched = np.flatnonzero(points_indices >= 0)
+        differences = point_array[:, points_indices[matched]] - points[:, matched]
+
+        if periodic:
+            differences = differences - np.rint(differences)
+
+        points_indices[matched[np.linalg.norm(differences, axis=0) > max_dist]] = -1
+
+        return points_indices
+
+    if periodic:
+        tree = cKDTree(np.transpose(fold_points(point_array)), boxsize=1.0)
+        points = fold_points(points)
+    else:
+        tree = cKDTree(np.transpose(point_array))
+
+    distances, points_indices = tree.query(np.transpose(points), distance_upper_bound=max_dist)
+    points_indices[np.isinf(distances)] = -1
+
+    return points_indices
+
+
+def symop_array(symop):
+    """
+    Method to convert the symmetry operations stored in the YAML file to an array
+
+    Parameters
+    ----------
+    symop : dict, list, or array_like
+        The symmetry operations, as a dictionary of 3x3 matrices keyed by the operation number
+        (possibly wrapped in a list, as in CalcMode.symop), or as an array of shape (nsym, 3, 3)
+
+    Returns
+    -------
+    symop_array : array
+        Array of shape (nsym, 3, 3) of the integer symmetry operations in crystal coordinates
+
+    """
+    if isinstance(symop, list) and len(symop) == 1 and isinstance(symop[0], dict):
+        symop = symop[0]
+
+    if isinstance(symop, dict):
+        symop = [symop[key] for key in sorted(symop.keys())]
+
+    symop = np.array(symop)
+
+    if symop.ndim != 3 or symop.shape[1:] != (3, 3):
+        raise ValueError('Symmetry operations should be 3x3 matrices')
+
+    return symop
+
+
+def unfold_points(point_array, symop, kc_dim=None, time_reversal=True, tol=1e-5):
+    """
+    Method to unfold a set of irreducible points in crystal coordinates to the full Brillouin zone, by applying all
+    of the symmetry operations at once. Equivalent images are identified with an integer key computed from the
+    folded coordinates: the grid number when kc_dim is given, or the coordinates rounded to tol otherwise.
+
+    Parameters
+    ----------
+    point_array : array_like
+        Array of the N irreducible points in crystal coordinates, reshaped to (3, N) if needed
+
+    symop : dict, list, or array_like
+        The symmetry operations S in crystal coordinates of the real-space lattice, see symop_array. The operations
+        in crystal coordinates of the reciprocal lattice are the inverse transposes, and each image of a point k is S^-T k.
+
+    kc_dim : array_like, optional
+        The dimensions of the uniform grid on which the points lie, e.g. CalcMode.kc_dim
+
+    time_reversal : bool, optional
+        If True, the images -S^-T k are also included
+
+    tol : float, optional
+        Precision of the coordinates used to identify equivalent images when kc_dim is not given
+
+    Returns
+    -------
+    full_point_array : array
+        Array of shape (3, M) of the unique points of the full Brillouin zone, folded into [0, 1) and sorted
+        by grid number (or by coordinates)
+
+    full2irr : array
+        Array of length M with the index of the irreducible point equivalent to each point of the full grid.
+        Quantities computed on the irreducible points are unfolded with values[..., full2irr].
+
+    """
+    point_array = reshape_points(point_array).astype(float)
+    num_points = point_array.shape[1]
+
+    # Operations acting on the reciprocal space crystal coordinates
+    symop = np.rint(np.transpose(np.linalg.inv(symop_array(symop)), (0, 2, 1))).astype(int)
+
+    if time_reversal:
+        symop = np.concatenate([symop, -symop])
+
+    # All images of all points at once, ordered operation by operation, shape (3, nsym * N)
+    images = np.reshape(np.transpose(np.einsum('sij,jn->sin', symop, point_array), (1, 0, 2)), (3, -1))
+    images = fold_points(images, tol)
+
+    if kc_dim is not None:
+        keys = grid_point_numbers(images, kc_dim, tol=tol * np.max(kc_dim))
+
+        if np.any(keys < 0):
+            raise ValueError('The images of the points by the symmetry operations are not on the kc_dim grid')
+    else:
+        num_bins = int(np.rint(1 / tol))
+        quantized = np.mod(np.rint(images / tol).astype(np.int64), num_bins)
+        keys = (quantized[0] * num_bins + quantized[1]) * num_bins + quantized[2]
+
+    # Keep the first image with each key, and the irreducible point it was generated from
+    _, first_images = np.unique(keys, return_index=True)
+
+    full_point_array = images[:, first_images]
+    full2irr = first_images % num_points
+
+    return full_point_array, full2irr
+
+
 def convert_point2path(point, point_array, path_array, max_dist=0.025, nearest=True):
     """
     Method to find the path coordinate corresponding to a particular point
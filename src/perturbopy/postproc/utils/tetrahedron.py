@@ -0,0 +1,249 @@
+"""
+Functions for computing densities of states with the linear tetrahedron method.
+
+"""
+import numpy as np
+
+
+def read_tetra(tet_file, num_kpoints=None):
+    """
+    Method to read the tetrahedra of a k-point grid from the HDF5 file generated by the setup calculation.
+    Perturbo stores the vertices of each tetrahedron twice, as indices of the irreducible k-points and as
+    indices of the k-points of the grid (kpts_all_crys_coord); the latter are returned.
+
+    Parameters
+    ----------
+    tet_file : h5py.File
+        The open tet HDF5 file
+    num_kpoints : int, optional
+        Number of k-points of the grid, used to check the indices
+
+    Returns
+    -------
+    tetra : np.ndarray
+        Integer array of shape num_tetra x 4 of the (0-based) indices of the k-points at the vertices of each tetrahedron
+
+    """
+    if 'tetra' not in tet_file:
+        raise ValueError('The tet file does not contain the tetrahedra (tetra dataset)')
+
+    tetra = np.asarray(tet_file['tetra'][()])
+
+    if tetra.ndim == 3:
+        # Stored as (2, 4, num_tetra) in Fortran order, i.e. num_tetra x 4 x 2 once read
+        if tetra.shape[-1] == 2:
+            tetra = tetra[..., 1]
+        else:
+            tetra = np.transpose(tetra[1])
+
+    elif tetra.ndim == 2 and tetra.shape[0] == 4 and tetra.shape[1] != 4:
+        tetra = np.transpose(tetra)
+
+    if tetra.ndim != 2 or tetra.shape[1] != 4:
+        raise ValueError(f'Unexpected shape of the tetrahedra: {tet_file["tetra"].shape}')
+
+    # Fortran indices start at 1
+    tetra = np.ascontiguousarray(tetra, dtype=np.int64) - 1
+
+    if np.any(tetra < 0) or (num_kpoints is not None and np.any(tetra >= num_kpoints)):
+        raise ValueError('The vertices of the tetrahedra are not k-points of the grid')
+
+    return tetra
+
+
+def _pair_batches(sorted_energies, energy_grid, max_pairs):
+    """
+    Grid points strictly inside the energy range of each tetrahedron, as flattened (tetrahedron, grid point) pairs,
+    yielded in batches of at most max_pairs pairs (or one tetrahedron)
+
+    """
+    first = np.searchsorted(energy_grid, sorted_energies[:, 0], side='right')
+    last = np.searchsorted(energy_grid, sorted_energies[:, 3], side='left')
+    counts = np.maximum(last - first, 0)
+    cumulative = np.cumsum(counts)
+
+    start = 0
+
+    while start < len(counts):
+        offset = cumulative[start] - counts[start]
+        stop = max(np.searchsorted(cumulative, offset + max_pairs, side='right'), start + 1)
+
+        batch_counts = counts[start:stop]
+        rows = np.repeat(np.arange(start, stop), batch_counts)
+        offsets = np.arange(np.sum(batch_counts)) - np.repeat(cumulative[start:stop] - batch_counts - offset, batch_counts)
+        cols = np.repeat(first[start:stop], batch_counts) + offsets
+
+        if len(rows) > 0:
+            yield rows, cols
+
+        start = stop
+
+
+class _SortedTetra():
+    """
+    Vertex energies of a set of tetrahedra sorted in increasing order, with the coefficients of the density of
+    states, and optionally of the mean value of a quantity interpolated linearly from the vertices, on each
+    isoenergy surface. The coefficients are computed once per tetrahedron and evaluated for many energies.
+
+    """
+
+    def __init__(self, e, w=None):
+        e1, e2, e3, e4 = e.T
+
+        # Differences are only used as denominators where they are positive
+        def inverse(x):
+            return np.divide(1.0, x, out=np.zeros_like(x), where=x > 0)
+
+        i21, i31, i41 = inverse(e2 - e1), inverse(e3 - e1), inverse(e4 - e1)
+        i32, i42, i43 = inverse(e3 - e2), inverse(e4 - e2), inverse(e4 - e3)
+
+        self.e = e
+        self.w = w
+        self.inverses = (i31, i41, i32, i42)
+
+        # DOS for e1 < E < e2: k1 (E - e1)^2, for e2 <= E < e3: a + b (E - e2) + c (E - e2)^2, for e3 <= E < e4: k3 (e4 - E)^2
+        self.k1 = 3 * i21 * i31 * i41
+        self.a = 3 * (e2 - e1) * i31 * i41
+        self.b = 6 * i31 * i41
+        self.c = -3 * (e3 - e1 + e4 - e2) * i31 * i41 * i32 * i42
+        self.k3 = 3 * i41 * i42 * i43
+
+        if w is not None:
+            # The isoenergy surface is a triangle with vertices on the edges 1-2, 1-3, 1-4 for e1 < E < e2,
+            # and 1-4, 2-4, 3-4 for e3 <= E < e4: the mean value is linear in E on these triangles
+            w1, w2, w3, w4 = w.T
+            self.s1 = ((w2 - w1) * i21 + (w3 - w1) * i31 + (w4 - w1) * i41) / 3
+            self.s3 = ((w4 - w1) * i41 + (w4 - w2) * i42 + (w4 - w3) * i43) / 3
+
+    def delta_values(self, rows, E):
+        """
+        Density of states of the tetrahedra rows, of unit volume, at the energies E (e1 < E < e4),
+        multiplied by the mean value of the quantity if given
+
+        """
+        e = self.e
+        values = np.empty(len(rows))
+
+        case1 = E < e[rows, 1]
+        case3 = E >= e[rows, 2]
+        case2 = ~(case1 | case3)
+
+        r = rows[case1]
+        x = E[case1] - e[r, 0]
+        values[case1] = self.k1[r] * x * x
+
+        if self.w is not None:
+            values[case1] *= self.w[r, 0] + self.s1[r] * x
+
+        r = rows[case3]
+        x = e[r, 3] - E[case3]
+        values[case3] = self.k3[r] * x * x
+
+        if self.w is not None:
+            values[case3] *= self.w[r, 3] - self.s3[r] * x
+
+        r = rows[case2]
+        x = E[case2] - e[r, 1]
+        values[case2] = self.a[r] + (self.b[r] + self.c[r] * x) * x
+
+        if self.w is not None:
+            values[case2] *= self._quadrilateral_mean(r, E[case2])
+
+        return values
+
+    def _quadrilateral_mean(self, r, E):
+        """
+        Mean value of the quantity for e2 <= E < e3, on the quadrilateral isoenergy surface
+
+        """
+        e1, e2 = self.e[r, 0], self.e[r, 1]
+        w1, w2, w3, w4 = self.w[r].T
+        i31, i41, i32, i42 = (inverse[r] for inverse in self.inverses)
+
+        # The quadrilateral has vertices on the edges 1-3, 1-4, 2-4, 2-3 (in cyclic order), and is split into two
+        # triangles along 1-3 / 2-4. Area ratios are invariant under affine maps, so the areas are computed in the
+        # tetrahedron with vertices 1 = (0, 0, 0), 2 = (1, 0, 0), 3 = (0, 1, 0), 4 = (0, 0, 1), where the vertices
+        # of the quadrilateral are p13 = (0, a, 0), p14 = (0, 0, b), p23 = (1 - c, c, 0) and p24 = (1 - d, 0, d)
+        a, b, c, d = (E - e1) * i31, (E - e1) * i41, (E - e2) * i32, (E - e2) * i42
+        area1 = np.sqrt((a * (b - d))**2 + (b * (1 - d))**2 + (a * (1 - d))**2)
+        area2 = np.sqrt((d * (c - a))**2 + (d * (1 - c))**2 + ((1 - d) * (c - a) + a * (1 - c))**2)
+
+        w13, w14 = w1 + a * (w3 - w1), w1 + b * (w4 - w1)
+        w23, w24 = w2 + c * (w3 - w2), w2 + d * (w4 - w2)
+
+        return (area1 * (w13 + w14 + w24) + area2 * (w13 + w24 + w23)) / (3 * (area1 + area2))
+
+
+def tetra_dos(energies, tetra, energy_grid, weights=None, tetra_volume=None, chunk_size=2**16, max_pairs=2**20):
+    """
+    Method to compute the density of states of each band on an energy grid with the linear tetrahedron method.
+    The tetrahedra are processed in chunks, and only the grid points within the energy range of each
+    tetrahedron are evaluated, in batches of bounded size, so that the memory does not grow with the number of tetrahedra.
+
+    Parameters
+    ----------
+    energies : array_like
+        Band energies of shape num_bands x num_kpoints
+    tetra : array_like
+        Integer array of shape num_tetra x 4 of the indices of the k-points at the vertices of each tetrahedron
+    energy_grid : array_like
+        Sorted energy grid, in the same units as energies
+    weights : array_like, optional
+        Quantity of shape num_bands x num_kpoints to project the density of states on, e.g. a distribution function.
+        The quantity is interpolated linearly within each tetrahedron.
+    tetra_volume : float, optional
+        Volume of each tetrahedron as a fraction of the Brillouin zone. Defaults to 1 / num_tetra, i.e. the
+        tetrahedra cover the whole Brillouin zone. Should be set to 1 / (6 x number of k-points of the full grid)
+        if only part of the tetrahedra are given.
+    chunk_size : int, optional
+        Number of tetrahedra sorted at once
+    max_pairs : int, optional
+        Maximum number of (tetrahedron, grid point) pairs evaluated at once
+
+    Returns
+    -------
+    dos : np.ndarray
+        Array of shape num_bands x len(energy_grid), in units of 1 / energy per unit cell (without spin degeneracy)
+
+    """
+    energies = np.asarray(energies, dtype=float)
+    tetra = np.asarray(tetra)
+    energy_grid = np.asarray(energy_grid, dtype=float)
+    num_bands, num_energies = energies.shape[0], len(energy_grid)
+
+    if np.any(np.diff(energy_grid) <= 0):
+        raise ValueError('The energy grid should be strictly increasing')
+
+    if weights is not None:
+        weights = np.asarray(weights, dtype=float)
+
+        if weights.shape != energies.shape:
+            raise ValueError(f'weights should have the shape of the energies, {energies.shape}')
+
+    if tetra_volume is None:
+        tetra_volume = 1.0 / len(tetra)
+
+    dos = np.zeros(num_bands * num_energies)
+
+    for first in range(0, len(tetra), chunk_size):
+        chunk = tetra[first:first + chunk_size]
+
+        # Vertex energies of each (band, tetrahedron), sorted
+        vertex_energies = np.reshape(energies[:, chunk], (-1, 4))
+        order = np.argsort(vertex_energies, axis=1)
+        vertex_energies = np.take_along_axis(vertex_energies, order, axis=1)
+
+        vertex_weights = None
+
+        if weights is not None:
+            vertex_weights = np.take_along_axis(np.reshape(weights[:, chunk], (-1, 4)), order, axis=1)
+
+        sorted_tetra = _SortedTetra(vertex_energies, vertex_weights)
+
+        for rows, cols in _pair_batches(vertex_energies, energy_grid, max_pairs):
+            values = sorted_tetra.delta_values(rows, energy_grid[cols])
+
+            bands = rows // len(chunk)
+            dos += np.bincount(bands * num_energies + cols, weights=values, minlength=num_bands * num_energies)
+
+    return tetra_volume * np.reshape(dos, (num_bands, num_energies))
@@ -28,6 +28,9 @@ class Timing:
         The number of times the timing has been measured.
     level : int
         The level of importance (hierarchy) for the timing measurement.
+    nbytes : int
+        The accumulated number of bytes processed during the measurements, e.g. read from a file.
+        Used to compute the throughput.
 
     Methods
     -------
@@ -83,6 +86,7 @@ class Timing:
         self.total_runtime = 0.0
         self.call_count = 0
         self.level = level
+        self.nbytes = 0
 
     def start(self):
         self.t_start = time.perf_counter()
@@ -93,6 +97,22 @@ class Timing:
         self.total_runtime += self.t_delta
         self.call_count += 1
 
+    def add_bytes(self, nbytes):
+        """
+        Add to the number of bytes processed, e.g. read from a file.
+        """
+        self.nbytes += nbytes
+
+    @property
+    def throughput(self):
+        """
+        Throughput in MB/s, computed from nbytes and the total runtime. None if no bytes were recorded.
+        """
+        if self.nbytes == 0 or self.total_runtime == 0.0:
+            return None
+
+        return self.nbytes / 1e6 / self.total_runtime
+
     def __enter__(self):
         self.start()
         return self
@@ -172,6 +192,17 @@ class TimingGroup:
 
         return timing
 
+    def merge(self, other):
+        """
+        Add the timings of another TimingGroup, e.g. recorded by a worker process, to this one.
+        The runtimes, call counts and numbers of bytes of identical tags are summed.
+        """
+        for tag, other_timing in other.timings.items():
+            timing = self.add(tag, other_timing.level)
+            timing.total_runtime += other_timing.total_runtime
+            timing.call_count += other_timing.call_count
+            timing.nbytes += other_timing.nbytes
+
     def sort(self):
         self.timings = dict(sorted(self.timings.items(), key=lambda x: x[1].total_runtime, reverse=True))
 
@@ -217,6 +248,10 @@ class TimingGroup:
                             for tag, timing in self.timings.items()
                         }
 
+        for tag, timing in self.timings.items():
+            if timing.throughput is not None:
+                timings_dict[tag]['throughput_MBps'] = round(timing.throughput, 3)
+
         # timings_dict = {tag: timing.total_runtime for tag, timing in self.timings.items()}
         return timings_dict
 
@@ -1,6 +1,52 @@
 import pytest
+import os
+
+from perturbopy.io_utils import yaml_cache
+from perturbopy.io_utils.io import open_yaml
 
 
 @pytest.fixture
 def with_plt(request):
     return request.config.getoption("--plots")
+
+
+@pytest.fixture(autouse=True, scope='session')
+def yaml_cache_off(tmp_path_factory):
+    """
+    Fixture to keep the test suite from writing to the user's YAML cache, even if it is switched on in the environment
+
+    """
+    settings = yaml_cache._settings.copy()
+
+    yaml_cache.disable_cache()
+    yaml_cache._settings['cache_dir'] = str(tmp_path_factory.mktemp('yaml_cache'))
+
+    yield
+
+    yaml_cache._settings.update(settings)
+
+
+@pytest.fixture
+def make_pert_dict():
+    """
+    Fixture to generate synthetic Perturbo outputs from the basic data of the GaAs bands reference
+
+    Returns
+    -------
+    make : function
+       Function of the calculation mode and the sections to add, returning the dictionary of the YAML file.
+       The bands section of the reference is kept only for a bands calculation.
+
+    """
+    def make(calc_mode, sections={}):
+        pert_dict = open_yaml(os.path.join('refs', 'gaas_bands.yml'), use_cache=False)
+        pert_dict['input parameters']['after conversion']['calc_mode'] = calc_mode
+
+        if calc_mode != 'bands':
+            pert_dict.pop('bands')
+
+        pert_dict.update(sections)
+
+        return pert_dict
+
+    return make
@@ -94,3 +94,259 @@ def test_effective_mass(gaas_bands, n, kpoint, max_distance, direction, expected
     print(gaas_bands.bands)
     m = gaas_bands.effective_mass(n, kpoint, max_distance, direction)
     assert(np.isclose(expected_m, m))
+
+
+def test_interpolate(gaas_bands):
+    """
+    Method to test the interpolation of the band energies along the k-path and at k-points
+
+    """
+    path = gaas_bands.kpt.path
+
+    assert(np.allclose(gaas_bands.interpolate(path), gaas_bands.bands.array))
+    assert(np.allclose(gaas_bands.interpolate(path[:10], n=[4, 5]), gaas_bands.bands.array[3:5, :10]))
+
+    # Midpoints between k-points, from path coordinates and from k-points
+    midpoints = 0.5 * (gaas_bands.kpt.points[:, 1:11] + gaas_bands.kpt.points[:, :10])
+    energies = gaas_bands.interpolate(0.5 * (path[1:11] + path[:10]), n=8)
+
+    assert(np.allclose(gaas_bands.interpolate_kpoints(midpoints, n=8), energies))
+    assert(np.all(np.abs(energies - 0.5 * (gaas_bands.bands[8][1:11] + gaas_bands.bands[8][:10])) < 0.05))
+
+
+def test_effective_mass_tensor(gaas_bands):
+    """
+    Method to test effective_mass_tensor on parabolic bands sampled on a 3D grid of k-points
+
+    """
+    alat = gaas_bands.alat
+    inverse_mass = np.array([[[2.0, 0.3, 0.0], [0.3, 1.0, 0.0], [0.0, 0.0, 0.5]],
+                             [[-1.0, 0.0, 0.2], [0.0, -1.5, 0.0], [0.2, 0.0, -0.8]]])
+
+    # Grid of k-points in cartesian coordinates (2pi/a) around two centers
+    offsets = np.stack(np.meshgrid(*[np.linspace(-0.05, 0.05, 5)] * 3, indexing='ij')).reshape(3, -1)
+    centers = np.array([[0, 0, 0], [0.5, 0.5, 0.5]]).T
+    points = np.concatenate([centers[:, [0]] + offsets, centers[:, [1]] + offsets], axis=1)
+
+    energies = np.zeros((2, points.shape[1]))
+    for i in range(2):
+        dk = (points - centers[:, [i]]) * 2 * np.pi / alat
+        energies[:, offsets.shape[1] * i:offsets.shape[1] * (i + 1)] = \
+            0.5 * np.einsum('ik,bij,jk->bk', dk[:, offsets.shape[1] * i:offsets.shape[1] * (i + 1)], inverse_mass,
+                            dk[:, offsets.shape[1] * i:offsets.shape[1] * (i + 1)]) + [[1.0], [-1.0]]
+
+    gaas_bands.kpt = ppy.RecipPtDB.from_lattice(points, 'cartesian', gaas_bands.lat, gaas_bands.recip_lat)
+    gaas_bands.bands = ppy.UnitsArray('Ha', energies, [1, 2])
+
+    result = gaas_bands.effective_mass_tensor([1, 2], centers, max_distance=0.08)
+
+    assert(result.shape == (2, 2, 3, 3))
+    assert(np.allclose(result[0, 0], inverse_mass[0]))
+    assert(np.allclose(result[1, 1], inverse_mass[1]))
+    assert(np.allclose(gaas_bands.effective_mass_tensor(2, centers[:, 1], max_distance=0.08, fit_gradient=True)[0, 0], inverse_mass[1]))
+
+
+def test_effective_mass_tensor_path(gaas_bands):
+    """
+    Method to test effective_mass_tensor on a parabolic band sampled along the k-path, which only determines
+    the components of the tensor along the directions of the path
+
+    """
+    inverse_mass = np.array([[2.0, 0.3, 0.0], [0.3, 1.0, 0.0], [0.0, 0.0, 0.5]])
+
+    # The path around Gamma goes along the (-1, 1, 1), (-1, 0, 0) and (-1, 1, 0) directions (2pi/a), which
+    # determine the xx component only
+    dk = gaas_bands.kpt.points_cart * 2 * np.pi / gaas_bands.alat
+    energies = 0.5 * np.einsum('ik,ij,jk->k', dk, inverse_mass, dk)
+    gaas_bands.bands = ppy.UnitsArray('Ha', energies[np.newaxis, :], [1])
+
+    with pytest.warns(UserWarning, match='undetermined components'):
+        result = gaas_bands.effective_mass_tensor(1, [0, 0, 0], max_distance=0.1)
+
+    determined = np.zeros((3, 3), dtype=bool)
+    determined[0, 0] = True
+
+    assert(result.shape == (1, 1, 3, 3))
+    assert(np.isclose(result[0, 0, 0, 0], inverse_mass[0, 0]))
+    assert(np.all(np.isnan(result[0, 0][~determined])))
+
+
+def test_gap_table(gaas_bands):
+    """
+    Method to test that gap_table matches direct_bandgap and indirect_bandgap for every pair of adjacent bands
+
+    """
+    gaps = gaas_bands.gap_table()
+
+    assert(len(gaps) == len(gaas_bands.bands) - 1)
+
+    for row in gaps:
+        direct_gap, direct_kpoint = gaas_bands.direct_bandgap(row['n_lower'], row['n_upper'])
+        indirect_gap, lower_kpoint, upper_kpoint = gaas_bands.indirect_bandgap(row['n_lower'], row['n_upper'])
+
+        assert(np.isclose(row['direct_gap'], direct_gap) and np.allclose(row['direct_kpoint'], direct_kpoint))
+        assert(np.isclose(row['indirect_gap'], indirect_gap))
+        assert(np.allclose(row['lower_kpoint'], lower_kpoint) and np.allclose(row['upper_kpoint'], upper_kpoint))
+
+
+def test_band_edges(gaas_bands):
+    """
+    Method to test band_edges, including the degeneracy of the valence band maximum at Gamma
+
+    """
+    edges = gaas_bands.band_edges()
+
+    assert(np.array_equal(edges['band'], np.arange(1, 17)))
+    assert(np.allclose(edges['min'], np.min(gaas_bands.bands.array, axis=1)))
+    assert(np.allclose(edges['max'], np.max(gaas_bands.bands.array, axis=1)))
+
+    # The four top valence bands are degenerate at Gamma
+    vbm = edges[edges['band'] == 8][0]
+    assert(np.allclose(vbm['max_kpoint'], [0, 0, 0]))
+    assert(vbm['max_degeneracy'] == 4)
+
+
+def test_load(gaas_bands):
+    """
+    Method to test that CalcMode.load creates a Bands object identical to Bands.from_yaml
+
+    """
+    yml_path = os.path.join("refs", "gaas_bands.yml")
+    bands = ppy.CalcMode.load(yml_path)
+
+    assert(isinstance(bands, ppy.Bands))
+    assert(np.allclose(bands.bands.array, gaas_bands.bands.array))
+    assert(np.allclose(bands.kpt.points, gaas_bands.kpt.points))
+    assert([timing.tag for timing in bands.timings.timings.values()] == ['read_calc_mode', 'parse_yaml', 'create'])
+
+    assert(isinstance(ppy.Bands.load(yml_path), ppy.Bands))
+
+    with pytest.raises(ValueError, match='not Phdisp'):
+        ppy.Phdisp.load(yml_path)
+
+
+def test_load_unsupported(tmp_path):
+    """
+    Method to test that CalcMode.load raises a ValueError for calculation modes which also need HDF5 files
+
+    """
+    yml_path = tmp_path / "dyna_run.yml"
+    yml_path.write_text("input parameters:\n   after conversion:\n      prefix: gaas\n      calc_mode: dynamics-run\n")
+
+    with pytest.raises(ValueError, match='dynamics-run'):
+        ppy.CalcMode.load(str(yml_path))
+
+
+@pytest.mark.parametrize("key_path, expected", [
+                         [['program'], 'perturbo'],
+                         [['input parameters', 'after conversion', 'calc_mode'], 'bands'],
+                         [['basic data', 'alat'], 10.57],
+])
+def test_read_yaml_value(key_path, expected):
+    """
+    Method to test read_yaml_value, which streams a YAML file up to a scalar value
+
+    Parameters
+    ----------
+    key_path : list of str
+       Keys leading to the value
+
+    expected : str or float
+
+    """
+    from perturbopy.io_utils.io import read_yaml_value
+
+    yml_path = os.path.join("refs", "gaas_bands.yml")
+    assert(read_yaml_value(yml_path, key_path) == expected)
+
+    with pytest.raises(KeyError):
+        read_yaml_value(yml_path, key_path[:-1] + ['missing key'])
+
+
+@pytest.mark.parametrize("sections, expected_sections", [
+                         [[], ['basic data', 'input parameters']],
+                         [['timings'], ['basic data', 'input parameters', 'timings']],
+])
+def test_from_yaml_sections(gaas_bands, sections, expected_sections):
+    """
+    Method to test that from_yaml only loads the sections needed by Bands and the requested sections
+
+    Parameters
+    ----------
+    sections : list of str
+       Additional sections to load
+
+    expected_sections : list of str
+       Sections left in _pert_dict once the bands section is processed
+
+    """
+    yml_path = os.path.join("refs", "gaas_bands.yml")
+    bands = ppy.Bands.from_yaml(yml_path, sections=sections)
+
+    assert(sorted(key for key in bands._pert_dict.keys() if key != 'bands') == sorted(expected_sections))
+    assert(np.allclose(bands.bands.array, gaas_bands.bands.array))
+    assert(np.allclose(bands.kpt.path, gaas_bands.kpt.path))
+    assert(np.allclose(bands.lat, gaas_bands.lat))
+
+
+def test_open_yaml_sections():
+    """
+    Method to test that open_yaml_sections gives the same sections as loading the whole file
+
+    """
+    from perturbopy.io_utils.io import open_yaml, open_yaml_sections
+
+    yml_path = os.path.join("refs", "gaas_bands.yml")
+    yaml_dict = open_yaml(yml_path, use_cache=False)
+    sections = open_yaml_sections(yml_path, ['bands', 'basic data', 'missing section'])
+
+    assert(list(sections.keys()) == ['basic data', 'bands'])
+    assert(sections['basic data'] == yaml_dict['basic data'])
+    assert(sections['bands'] == yaml_dict['bands'])
+
+
+def test_open_yaml_sections_split(monkeypatch):
+    """
+    Method to test that the sections of a YAML file written by Perturbo are loaded from their own text,
+    without streaming the whole file
+
+    """
+    from perturbopy.io_utils import io
+
+    def stream(text, sections, file_name):
+        raise AssertionError('The file should not be streamed')
+
+    yml_path = os.path.join("refs", "gaas_bands.yml")
+    yaml_dict = io.open_yaml(yml_path, use_cache=False)
+
+    monkeypatch.setattr(io, '_stream_yaml_sections', stream)
+    sections = io.open_yaml_sections(yml_path, ['bands', 'basic data', 'input parameters'])
+
+    assert(sections == {key: yaml_dict[key] for key in ['input parameters', 'basic data', 'bands']})
+
+
+@pytest.mark.parametrize("text", [
+                         'a: 1\nb: "first line\nc: second line"\nc: 3\n',
+                         'a: 1\nb: [1,\nc: 2]\nc: 3\n',
+                         '"a": 1\nb: 2\nc: 3\n',
+])
+def test_open_yaml_sections_stream(tmp_path, text):
+    """
+    Method to test open_yaml_sections on YAML files whose sections cannot be split at the lines of the top-level keys
+
+    Parameters
+    ----------
+    text : str
+       Content of the YAML file
+
+    """
+    from perturbopy.io_utils.io import open_yaml, open_yaml_sections
+
+    yml_path = os.path.join(tmp_path, 'test.yml')
+
+    with open(yml_path, 'w') as yml_file:
+        yml_file.write(text)
+
+    yaml_dict = open_yaml(yml_path, use_cache=False)
+
+    assert(open_yaml_sections(yml_path, ['a', 'c']) == {'a': yaml_dict['a'], 'c': yaml_dict['c']})
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from perturbopy.postproc.utils.binning import grid_bin_edges, energy_bin_weights
+
+
+@pytest.mark.parametrize("energy_grid, expected_edges", [
+                         ([0.0, 1.0, 2.0], [-0.5, 0.5, 1.5, 2.5]),
+                         ([0.0, 1.0, 3.0], [-0.5, 0.5, 2.0, 4.0]),
+])
+def test_grid_bin_edges(energy_grid, expected_edges):
+    """
+    Method to test the bin edges of an energy grid
+
+    Parameters
+    ----------
+    energy_grid : array_like
+       The energy grid
+    expected_edges : array_like
+       The expected bin edges
+
+    """
+    assert(np.allclose(grid_bin_edges(energy_grid), expected_edges))
+
+
+@pytest.mark.parametrize("smearing", [None, 0.05])
+def test_energy_bin_weights(smearing):
+    """
+    Method to test the histogram and Gaussian binning weights against a direct computation
+
+    Parameters
+    ----------
+    smearing : float
+       Standard deviation of the Gaussian broadening, or None for a histogram
+
+    """
+    rng = np.random.default_rng(2)
+    energies = rng.uniform(0.2, 0.8, size=50)
+    energy_grid = np.linspace(0.0, 1.0, 201)
+    values = rng.random(50)
+
+    binned = energy_bin_weights(energies, energy_grid, smearing) @ values
+
+    if smearing is None:
+        edges = grid_bin_edges(energy_grid)
+        expected = np.histogram(energies, bins=edges, weights=values)[0] / np.diff(edges)
+    else:
+        delta = energy_grid[:, None] - energies[None, :]
+        gaussians = np.exp(-0.5 * (delta / smearing)**2) / (np.sqrt(2 * np.pi) * smearing)
+        expected = np.where(np.abs(delta) <= 5.0 * smearing, gaussians, 0.0) @ values
+
+    assert(np.allclose(binned, expected))
+
+    # The populations integrate to the sum of the values over the (uniform) grid
+    assert(np.isclose(np.sum(binned) * (energy_grid[1] - energy_grid[0]), np.sum(values), rtol=1e-3))
@@ -140,6 +140,24 @@ def test_hbar(test_units, expected_hbar):
     assert(math.isclose(ppy.constants.hbar(test_units), expected_hbar))
 
 
+@pytest.mark.parametrize("test_units, expected_kB", [
+                        ('ev/K', 8.617333262e-5), ('atomic', 3.166811563e-6)
+])
+def test_kB(test_units, expected_kB):
+    """
+    Test the constants.kB function
+
+    Parameters
+    ----------
+    test_units : str
+       The units for kB
+    expected_kB : float
+       The expected value of kB in the corresponding units
+
+    """
+    assert(math.isclose(ppy.constants.kB(test_units), expected_kB))
+
+
 def test_errors():
     """
     Test errors generated by constants module.
@@ -158,3 +176,6 @@ def test_errors():
     with pytest.raises(ValueError):
         ppy.constants.hbar('evs')
         ppy.constants.hbar(22)
+
+    with pytest.raises(ValueError):
+        ppy.constants.kB('eV')
@@ -0,0 +1,563 @@
+import numpy as np
+import pytest
+import os
+import h5py
+import yaml
+from concurrent.futures import ProcessPoolExecutor
+
+import perturbopy.postproc as ppy
+from perturbopy.io_utils.io import open_yaml
+from perturbopy.io_utils.repack import repack_cdyna, is_repacked
+from perturbopy.postproc.utils.fermi import fermi_dirac
+
+numk, numb = 12, 2
+kdim = (2, 2, 3)
+run_steps = [5, 3]
+time_step = 2.0
+
+
+def grid_tetra(kdim):
+    """
+    Method to split each cell of a periodic k-point grid into six tetrahedra sharing the cell diagonal
+
+    Parameters
+    ----------
+    kdim : tuple of int
+
+    Returns
+    -------
+    tetra : np.ndarray
+       Array of shape (6 x number of k-points) x 4 of the indices of the vertices, numbered as (i * n2 + j) * n3 + k
+
+    """
+    index = np.arange(np.prod(kdim)).reshape(kdim)
+    i, j, k = np.meshgrid(*[np.arange(n) for n in kdim], indexing='ij')
+    corners = [index[(i + a) % kdim[0], (j + b) % kdim[1], (k + c) % kdim[2]].ravel() for a in (0, 1) for b in (0, 1) for c in (0, 1)]
+
+    paths = [(0, 1, 3, 7), (0, 1, 5, 7), (0, 2, 3, 7), (0, 2, 6, 7), (0, 4, 5, 7), (0, 4, 6, 7)]
+
+    return np.concatenate([np.stack([corners[vertex] for vertex in path], axis=1) for path in paths])
+
+
+@pytest.fixture()
+def dyna_paths(tmp_path, make_pert_dict):
+    """
+    Fixture to generate small synthetic cdyna and tet HDF5 files, together with a dynamics-run YAML file.
+    The YAML basic data are taken from the GaAs bands reference.
+
+    Returns
+    -------
+    cdyna_path, tet_path, yaml_path : str
+
+    """
+    rng = np.random.default_rng(0)
+
+    cdyna_path = os.path.join(tmp_path, 'test_cdyna.h5')
+    tet_path = os.path.join(tmp_path, 'test_tet.h5')
+    yaml_path = os.path.join(tmp_path, 'test_dynamics_run.yml')
+
+    with h5py.File(cdyna_path, 'w') as cdyna_file:
+        cdyna_file['num_runs'] = len(run_steps)
+        cdyna_file['band_structure_ryd'] = rng.random((numk, numb))
+
+        for irun, num_steps in enumerate(run_steps, start=1):
+            group = cdyna_file.create_group(f'dynamics_run_{irun}')
+            group['num_steps'] = num_steps
+            group['time_step_fs'] = time_step
+
+            for itime in range(1, num_steps + 1):
+                group[f'snap_t_{itime}'] = rng.random((numk, numb))
+
+        cdyna_file['dynamics_run_2']['efield'] = np.array([100.0, 0.0, 0.0])
+
+    with h5py.File(tet_path, 'w') as tet_file:
+        tet_file['kpts_all_crys_coord'] = rng.random((numk, 3))
+
+        # Stored by Perturbo as (2, 4, num_tetra) in Fortran order, with 1-based indices
+        tetra = grid_tetra(kdim) + 1
+        tet_file['tetra'] = np.stack([tetra, tetra], axis=2)
+
+    with open(yaml_path, 'w') as yaml_file:
+        yaml.dump(make_pert_dict('dynamics-run'), yaml_file)
+
+    return cdyna_path, tet_path, yaml_path
+
+
+@pytest.fixture()
+def dyna_runs(dyna_paths):
+    """
+    Fixture to generate a lazily loaded and an eagerly loaded DynaRun object from the same files.
+
+    Returns
+    -------
+    lazy_run, eager_run : ppy.DynaRun
+
+    """
+    lazy_run = ppy.DynaRun.from_hdf5_yaml(*dyna_paths)
+    eager_run = ppy.DynaRun.from_hdf5_yaml(*dyna_paths, lazy=False)
+
+    return lazy_run, eager_run
+
+
+def test_lazy_snap_t(dyna_runs):
+    """
+    Method to test that lazily loaded snapshots match the eagerly loaded ones
+
+    """
+    lazy_run, eager_run = dyna_runs
+
+    assert(len(lazy_run) == len(run_steps))
+
+    for irun, num_steps in enumerate(run_steps, start=1):
+        assert(lazy_run[irun].is_lazy)
+        assert(not eager_run[irun].is_lazy)
+        assert(lazy_run[irun].snap_t.shape == (numb, numk, num_steps))
+        assert(eager_run[irun].snap_t.shape == (numb, numk, num_steps))
+        assert(np.array_equal(np.asarray(lazy_run[irun].snap_t), eager_run[irun].snap_t))
+
+    assert(np.allclose(lazy_run[2].efield, [100.0, 0.0, 0.0]))
+
+
+def test_lazy_snap_t_numpy(dyna_paths, dyna_runs):
+    """
+    Method to test that NumPy arithmetic, functions and ndarray methods work on the snapshots of the default (lazy) object
+
+    """
+    _, eager_run = dyna_runs
+    default_run = ppy.DynaRun.from_hdf5_yaml(*dyna_paths)
+
+    snap_t = default_run[1].snap_t
+    expected = eager_run[1].snap_t
+
+    assert(np.array_equal(snap_t * 2, expected * 2))
+    assert(np.array_equal(1 - snap_t, 1 - expected))
+    assert(np.array_equal(snap_t + snap_t, 2 * expected))
+    assert(np.array_equal(np.exp(snap_t), np.exp(expected)))
+    assert(np.array_equal(snap_t.sum(axis=2), expected.sum(axis=2)))
+    assert(np.array_equal(np.sum(snap_t, axis=(0, 1)), np.sum(expected, axis=(0, 1))))
+    assert(np.array_equal(np.concatenate([snap_t, snap_t], axis=2), np.concatenate([expected, expected], axis=2)))
+    assert(snap_t.max() == expected.max())
+    assert(np.array_equal(snap_t.T, expected.T))
+    assert(np.all((snap_t > 0.5) == (expected > 0.5)))
+
+    with pytest.raises(AttributeError):
+        snap_t.not_an_attribute
+
+
+def test_lazy_snap_t_metadata(dyna_runs, monkeypatch):
+    """
+    Method to test that the metadata of the lazy snapshots are available without reading the HDF5 file
+
+    """
+    lazy_run, eager_run = dyna_runs
+
+    snap_t = lazy_run[1].snap_t
+    expected = eager_run[1].snap_t
+
+    def read_steps(steps):
+        raise AssertionError('The snapshots should not be read')
+
+    monkeypatch.setattr(snap_t, 'read_steps', read_steps)
+
+    assert(snap_t.size == expected.size)
+    assert(snap_t.itemsize == expected.itemsize)
+    assert(snap_t.nbytes == expected.nbytes)
+    assert(np.shape(snap_t) == expected.shape)
+    assert(np.ndim(snap_t) == 3)
+    assert(np.size(snap_t) == expected.size)
+    assert(np.size(snap_t, 1) == numk)
+    assert(np.size(snap_t, axis=-1) == expected.shape[-1])
+
+
+@pytest.mark.parametrize("key", [
+                         (0, 3, 1), (Ellipsis, -1), (slice(None), slice(2, 8), slice(None, None, -2)),
+                         (1, [0, 4, 4], [4, 0, 4]), (Ellipsis, [True, False, True, False, True]),
+                         0, (slice(None), 5),
+])
+def test_lazy_snap_t_indexing(dyna_runs, key):
+    """
+    Method to test that indexing the lazy snapshots follows NumPy indexing of the full array
+
+    Parameters
+    ----------
+    key : tuple
+       The index applied to both snap_t arrays
+
+    """
+    lazy_run, eager_run = dyna_runs
+
+    assert(np.array_equal(lazy_run[1].snap_t[key], eager_run[1].snap_t[key]))
+
+
+@pytest.mark.parametrize("selection, expected_steps", [
+                         ({'t_start': 6.0, 't_stop': 14.0}, {1: [2, 3, 4], 2: [0, 1]}),
+                         ({'t_start': 4, 'time_units': 'step'}, {1: [3, 4], 2: [0, 1, 2]}),
+                         ({'stride': 4.0}, {1: [0, 2, 4], 2: [0, 2]}),
+                         ({'runs': [2], 'stride': 2, 'time_units': 'step'}, {2: [0, 2]}),
+])
+def test_time_window(dyna_paths, dyna_runs, selection, expected_steps):
+    """
+    Method to test loading a selection of runs and time steps
+
+    Parameters
+    ----------
+    selection : dict
+       Keyword arguments selecting the runs and time steps
+    expected_steps : dict
+       The expected indices of the loaded steps of each run
+
+    """
+    _, eager_run = dyna_runs
+
+    for lazy in [True, False]:
+        dyna_run = ppy.DynaRun.from_hdf5_yaml(*dyna_paths, lazy=lazy, **selection)
+
+        assert(list(dyna_run._data.keys()) == list(expected_steps.keys()))
+
+        for irun, steps in expected_steps.items():
+            assert(np.array_equal(dyna_run[irun].steps, steps))
+            assert(np.allclose(dyna_run[irun].times, eager_run[irun].times[steps]))
+            assert(np.array_equal(np.asarray(dyna_run[irun].snap_t), eager_run[irun].snap_t[:, :, steps]))
+
+        if not lazy:
+            nbytes = sum(len(steps) for steps in expected_steps.values()) * numk * numb * 8
+            assert(dyna_run.timings.timings['read_snap_t'].nbytes == nbytes)
+
+
+@pytest.mark.parametrize("stride, time_units", [
+                         (-4.0, 'fs'), (0.0, 'fs'), (1.0, 'fs'), (3.0, 'fs'), (-4, 'step'), (0, 'step'), (1.5, 'step'),
+])
+def test_invalid_stride(dyna_paths, stride, time_units):
+    """
+    Method to test that strides which are not a positive whole number of time steps are rejected in both units
+
+    Parameters
+    ----------
+    stride : float
+       The invalid stride
+    time_units : str
+       Units of the stride
+
+    """
+    with pytest.raises(ValueError):
+        ppy.DynaRun.from_hdf5_yaml(*dyna_paths, stride=stride, time_units=time_units)
+
+
+def test_loaded_runs(dyna_paths, capsys):
+    """
+    Method to test that the length, iteration and summary of the object cover the loaded runs only
+
+    """
+    dyna_run = ppy.DynaRun.from_hdf5_yaml(*dyna_paths, runs=[2])
+
+    assert(dyna_run.num_runs == 2)
+    assert(dyna_run.runs == [2])
+    assert(len(dyna_run) == 1)
+    assert([indiv_run.num_steps for indiv_run in dyna_run] == [run_steps[1]])
+
+    dyna_run.get_info()
+    info = capsys.readouterr().out
+
+    assert('Loaded runs: [2]' in info)
+    assert(info.count('Dynamics run') == 1)
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_empty_selection(dyna_paths, lazy):
+    """
+    Method to test the reductions of runs with no time steps in the selected time window
+
+    Parameters
+    ----------
+    lazy : bool
+       Whether the snapshots are read lazily
+
+    """
+    dyna_run = ppy.DynaRun.from_hdf5_yaml(*dyna_paths, lazy=lazy, t_start=1000.0)
+
+    assert(dyna_run[1].snap_t.shape == (numb, numk, 0))
+    assert(dyna_run[1].carrier_number().shape == (0,))
+    assert(dyna_run[1].band_population().shape == (numb, 0))
+    assert(dyna_run.mean_energy()[1].shape == (0,))
+    assert(dyna_run.compute_popu(np.linspace(0.0, 14.0, 15)).popu.shape == (15, 0))
+
+
+@pytest.mark.parametrize("selection", [
+                         {}, {'t_start': 6.0, 't_stop': 14.0}, {'runs': [2], 'stride': 2, 'time_units': 'step'}
+])
+def test_repacked(dyna_paths, tmp_path, selection):
+    """
+    Method to test that a repacked cdyna file gives the same DynaRun as the original one
+
+    Parameters
+    ----------
+    selection : dict
+       Keyword arguments selecting the runs and time steps
+
+    """
+    cdyna_path, tet_path, yaml_path = dyna_paths
+    repacked_path = os.path.join(tmp_path, 'test_cdyna_repacked.h5')
+
+    repack_cdyna(cdyna_path, repacked_path, chunk_steps=2)
+
+    with h5py.File(repacked_path, 'r') as repacked_file:
+        assert(is_repacked(repacked_file))
+        assert(repacked_file['dynamics_run_1']['snap_t'].shape == (run_steps[0], numk, numb))
+
+    original_run = ppy.DynaRun.from_hdf5_yaml(cdyna_path, tet_path, yaml_path, **selection)
+
+    for lazy in [True, False]:
+        repacked_run = ppy.DynaRun.from_hdf5_yaml(repacked_path, tet_path, yaml_path, lazy=lazy, **selection)
+
+        assert(repacked_run._data.keys() == original_run._data.keys())
+
+        for irun in original_run._data.keys():
+            assert(repacked_run[irun].num_steps == original_run[irun].num_steps)
+            assert(np.allclose(repacked_run[irun].times, original_run[irun].times))
+            assert(np.allclose(repacked_run[irun].efield, original_run[irun].efield))
+            assert(np.array_equal(np.asarray(repacked_run[irun].snap_t), np.asarray(original_run[irun].snap_t)))
+
+            if lazy:
+                key = (1, [0, 4, 4], slice(None, None, -1))
+                assert(np.array_equal(repacked_run[irun].snap_t[key], original_run[irun].snap_t[key]))
+
+
+def test_repack_twice(dyna_paths, tmp_path):
+    """
+    Method to test that repacking an already repacked file fails without touching the existing output file
+
+    """
+    cdyna_path = dyna_paths[0]
+    repacked_path = os.path.join(tmp_path, 'test_cdyna_repacked.h5')
+    output_path = os.path.join(tmp_path, 'test_cdyna_output.h5')
+
+    repack_cdyna(cdyna_path, repacked_path)
+
+    with open(output_path, 'w') as output_file:
+        output_file.write('existing file')
+
+    with pytest.raises(ValueError):
+        repack_cdyna(repacked_path, output_path)
+
+    with open(output_path, 'r') as output_file:
+        assert(output_file.read() == 'existing file')
+
+    with h5py.File(cdyna_path, 'r') as cdyna_file:
+        assert(not is_repacked(cdyna_file))
+
+    assert(not any(name.endswith('.tmp') for name in os.listdir(tmp_path)))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 64])
+def test_reductions(dyna_runs, chunk_size):
+    """
+    Method to test the streaming reductions over snapshots against reductions of the full arrays
+
+    Parameters
+    ----------
+    chunk_size : int
+       Number of time steps per chunk
+
+    """
+    lazy_run, eager_run = dyna_runs
+
+    energies = np.array([eager_run.bands[n] for n in sorted(eager_run.bands.keys())]) * ppy.constants.energy_conversion_factor('Ry', 'eV')
+
+    carrier_number = lazy_run.carrier_number(chunk_size)
+    band_population = lazy_run.band_population(chunk_size)
+    mean_energy = lazy_run.mean_energy(chunk_size=chunk_size)
+    max_occupation = lazy_run.reduce(lambda snaps: np.max(snaps, axis=(0, 1)), chunk_size)
+
+    for irun in eager_run._data.keys():
+        snap_t = eager_run[irun].snap_t
+
+        assert(np.allclose(carrier_number[irun], np.sum(snap_t, axis=(0, 1))))
+        assert(np.allclose(band_population[irun], np.sum(snap_t, axis=1)))
+        assert(np.allclose(mean_energy[irun], np.sum(energies[:, :, None] * snap_t, axis=(0, 1)) / np.sum(snap_t, axis=(0, 1))))
+        assert(np.allclose(max_occupation[irun], np.max(snap_t, axis=(0, 1))))
+
+
+def test_compute_popu(dyna_runs):
+    """
+    Method to test the energy-binned carrier populations computed from the snapshots
+
+    """
+    lazy_run, eager_run = dyna_runs
+
+    energy_grid = np.linspace(0.0, 14.0, 15)
+    energies = np.array([eager_run.bands[n] for n in sorted(eager_run.bands.keys())]) * ppy.constants.energy_conversion_factor('Ry', 'eV')
+    edges = np.linspace(-0.5, 14.5, 16)
+
+    dyna_pp = lazy_run.compute_popu(energy_grid, chunk_size=2)
+
+    assert(isinstance(dyna_pp, ppy.DynaPP))
+    assert(dyna_pp.calc_mode == 'dynamics-pp')
+    assert(dyna_pp.popu.shape == (len(energy_grid), sum(run_steps)))
+    assert(np.allclose(dyna_pp.times, np.arange(1, sum(run_steps) + 1) * time_step))
+
+    snap_t = np.concatenate([eager_run[irun].snap_t for irun in eager_run._data.keys()], axis=2)
+
+    for itime in range(snap_t.shape[2]):
+        expected = np.histogram(energies.ravel(), bins=edges, weights=snap_t[:, :, itime].ravel())[0] / numk
+        assert(np.allclose(dyna_pp.popu[:, itime], expected))
+
+
+def test_compute_popu_grid_size(dyna_paths):
+    """
+    Method to test the normalization of the populations when only part of the k-points of the boltz_kdim grid
+    are stored: the population integrated over energy is the number of carriers per unit cell, i.e. the sum of
+    the distribution function divided by the number of k-points of the full grid
+
+    """
+    cdyna_path, tet_path, yaml_path = dyna_paths
+    boltz_kdim = [2, 2, 6]
+
+    stored_run = ppy.DynaRun.from_hdf5_yaml(cdyna_path, tet_path, yaml_path, runs=[1], lazy=False)
+
+    pert_dict = open_yaml(yaml_path)
+    pert_dict['input parameters']['after conversion']['boltz_kdim'] = boltz_kdim
+
+    with open(yaml_path, 'w') as yaml_file:
+        yaml.dump(pert_dict, yaml_file)
+
+    dyna_run = ppy.DynaRun.from_hdf5_yaml(cdyna_path, tet_path, yaml_path, runs=[1], lazy=False)
+
+    num_carriers = np.sum(dyna_run[1].snap_t, axis=(0, 1)) / np.prod(boltz_kdim)
+    energy_grid = np.arange(-5.0, 60.0, 0.5)
+
+    for smearing in [None, 0.5]:
+        dyna_pp = dyna_run.compute_popu(energy_grid, smearing=smearing)
+
+        assert(np.allclose(np.sum(dyna_pp.popu, axis=0) * 0.5, num_carriers))
+
+        # Without boltz_kdim, the stored k-points are taken as the full grid
+        stored_pp = stored_run.compute_popu(energy_grid, smearing=smearing)
+        assert(np.allclose(dyna_pp.popu * np.prod(boltz_kdim), stored_pp.popu * numk))
+
+
+@pytest.mark.parametrize("executor, runs", [
+                         ('process', None), ('process', [2]), ('pool', None),
+])
+def test_parallel_loading(dyna_paths, dyna_runs, executor, runs):
+    """
+    Method to test loading the runs in parallel worker processes
+
+    Parameters
+    ----------
+    executor : str
+       'process', or 'pool' to pass an existing process pool
+    runs : list
+       The runs to load
+
+    """
+    _, eager_run = dyna_runs
+
+    if executor == 'pool':
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            dyna_run = ppy.DynaRun.from_hdf5_yaml(*dyna_paths, lazy=False, runs=runs, executor=pool)
+    else:
+        dyna_run = ppy.DynaRun.from_hdf5_yaml(*dyna_paths, lazy=False, runs=runs, executor=executor, max_workers=2)
+
+    expected_runs = list(eager_run._data.keys()) if runs is None else runs
+    assert(list(dyna_run._data.keys()) == expected_runs)
+
+    for irun in expected_runs:
+        assert(np.array_equal(np.asarray(dyna_run[irun].snap_t), eager_run[irun].snap_t))
+        assert(f'load_run_{irun}' in dyna_run.timings.to_dict())
+
+    nbytes = sum(run_steps[irun - 1] for irun in expected_runs) * numk * numb * 8
+    assert(dyna_run.timings.timings['read_snap_t'].nbytes == nbytes)
+
+
+def test_parallel_loading_errors(dyna_paths):
+    """
+    Method to test the errors raised for invalid executors
+
+    """
+    with pytest.raises(ValueError):
+        ppy.DynaRun.from_hdf5_yaml(*dyna_paths, executor='process')
+
+    with pytest.raises(ValueError):
+        ppy.DynaRun.from_hdf5_yaml(*dyna_paths, executor='mpi')
+
+    with pytest.raises(ValueError):
+        ppy.DynaRun.from_hdf5_yaml(*dyna_paths, lazy=False, executor='thread')
+
+
+def test_compute_dos(dyna_runs):
+    """
+    Method to test the tetrahedron density of states computed from the tetrahedra of the tet file
+
+    """
+    lazy_run, eager_run = dyna_runs
+
+    assert(np.array_equal(lazy_run.tetra, grid_tetra(kdim)))
+
+    energies = eager_run.bands.array * ppy.constants.energy_conversion_factor('Ry', 'eV')
+    energy_grid = np.linspace(np.min(energies) - 1.0, np.max(energies) + 1.0, 8001)
+
+    dos = lazy_run.compute_dos(energy_grid)
+
+    assert(dos.shape == (numb, len(energy_grid)))
+    assert(np.allclose(np.sum(dos, axis=1) * (energy_grid[1] - energy_grid[0]), 1.0, atol=1e-3))
+
+    # Projected on the band energies, the density of states is multiplied by the energy
+    assert(np.allclose(lazy_run.compute_dos(energy_grid, weights=energies), energy_grid * dos))
+
+    # Carrier population from a snapshot of the distribution function
+    snap_t = eager_run[1].snap_t[:, :, 0]
+    popu = lazy_run.compute_dos(energy_grid, weights=snap_t)
+    assert(np.isclose(np.sum(popu) * (energy_grid[1] - energy_grid[0]), np.sum(np.mean(snap_t, axis=1)), rtol=1e-2))
+
+
+def test_invalid_tetra(dyna_paths):
+    """
+    Method to test that the tetrahedra are read only by compute_dos, so that a tet file with tetrahedra that do
+    not match the k-points does not prevent loading the runs
+
+    """
+    cdyna_path, tet_path, yaml_path = dyna_paths
+
+    with h5py.File(tet_path, 'r+') as tet_file:
+        tet_file['tetra'][...] = tet_file['tetra'][()] + numk
+
+    dyna_run = ppy.DynaRun.from_hdf5_yaml(cdyna_path, tet_path, yaml_path)
+
+    assert(dyna_run._tetra is None)
+    assert(len(dyna_run) == len(run_steps))
+
+    with pytest.raises(ValueError, match='not k-points of the grid'):
+        dyna_run.compute_dos(np.linspace(0.0, 1.0, 11))
+
+
+@pytest.mark.parametrize("use_tetra", [False, True])
+def test_find_chem_pot(dyna_runs, use_tetra):
+    """
+    Method to test the carrier concentrations and chemical potentials computed for many temperatures at once
+
+    Parameters
+    ----------
+    use_tetra : bool
+       Whether to use the tetrahedron density of states
+
+    """
+    lazy_run, eager_run = dyna_runs
+
+    energies = eager_run.bands.array * ppy.constants.energy_conversion_factor('Ry', 'eV')
+    volume_cm3 = eager_run.volume * ppy.constants.length_conversion_factor('bohr', 'cm')**3
+
+    temper = np.array([77.0, 300.0, 600.0])[:, np.newaxis]
+    chem_pot = np.min(energies) + np.array([-0.3, -0.05, 0.1])
+
+    conc = lazy_run.compute_conc(temper, chem_pot, use_tetra=use_tetra)
+
+    assert(conc.shape == (3, 3))
+
+    if not use_tetra:
+        occupations = fermi_dirac(energies, chem_pot[np.newaxis, :, np.newaxis, np.newaxis], temper[:, :, np.newaxis, np.newaxis])
+        assert(np.allclose(conc, 2 * np.sum(occupations, axis=(2, 3)) / energies.shape[1] / volume_cm3))
+
+    assert(np.allclose(lazy_run.find_chem_pot(temper, conc, use_tetra=use_tetra, tol=1e-10), chem_pot, atol=1e-6))
+
+    with pytest.raises(ValueError):
+        lazy_run.find_chem_pot(300.0, 1e30, use_tetra=use_tetra)
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+import perturbopy.postproc as ppy
+
+
+@pytest.fixture()
+def ephmat_values():
+    """
+    Method to generate random e-ph matrix elements for three phonon modes, two k-points and five q-points
+
+    Returns
+    -------
+    values : np.ndarray
+       Array of shape 3 x 2 x 5
+
+    """
+    return np.random.default_rng(12).uniform(0.0, 10.0, (3, 2, 5))
+
+
+@pytest.fixture()
+def ephmat(ephmat_values, make_pert_dict):
+    """
+    Method to generate an Ephmat object from ephmat_values, using the basic data of the GaAs YAML file
+
+    Returns
+    -------
+    ephmat : ppy.Ephmat
+
+    """
+    kpoints = [[0.0, 0.0, 0.0], [0.1, 0.0, 0.0]]
+    qpoints = [[0.1 * i, 0.0, 0.0] for i in range(5)]
+    mode_dat = {mode: {'phonon energy': (mode * np.ones(5)).tolist(), 'deformation potential': (2 * ephmat_values[mode - 1]).ravel().tolist(),
+                       'e-ph matrix elements': ephmat_values[mode - 1].ravel().tolist()} for mode in [1, 2, 3]}
+
+    ephmat_dat = {'phonon energy units': 'meV', 'deformation potential units': 'eV/A', 'e-ph matrix elements units': 'meV',
+                  'number of phonon modes': 3,
+                  'k-path coordinate units': 'arbitrary', 'k-path coordinates': [0.0, 0.1], 'k-point coordinate units': 'crystal',
+                  'k-point coordinates': kpoints,
+                  'q-path coordinate units': 'arbitrary', 'q-path coordinates': [0.1 * i for i in range(5)],
+                  'q-point coordinate units': 'crystal', 'q-point coordinates': qpoints, 'phonon mode': mode_dat}
+
+    return ppy.Ephmat(make_pert_dict('ephmat', {'ephmat': ephmat_dat}))
+
+
+def test_ephmat_array(ephmat, ephmat_values):
+    """
+    Method to test the num_modes x N x M arrays of the e-ph matrix elements and deformation potentials
+
+    """
+    assert(ephmat.ephmat.array.shape == (3, 2, 5))
+    assert(np.allclose(ephmat.ephmat.array, ephmat_values))
+    assert(np.allclose(ephmat.defpot[2], 2 * ephmat_values[1]))
+    assert(np.allclose(ephmat.phdisp.array[:, 0], [1, 2, 3]))
+    assert(np.allclose(ephmat.ephmat_mode_sum(), np.sqrt(np.sum(ephmat_values**2, axis=0))))
+
+
+def test_top_couplings(ephmat, ephmat_values):
+    """
+    Method to test the strongest couplings, overall and per k-point
+
+    """
+    top = ephmat.top_couplings(4)
+    expected = np.sort(ephmat_values.ravel())[::-1][:4]
+
+    assert(np.allclose(top['value'], expected))
+    assert(np.allclose(ephmat_values[top['mode'] - 1, top['kpoint_idx'], top['qpoint_idx']], expected))
+
+    top = ephmat.top_couplings(3, per_kpoint=True, quantity='defpot')
+
+    assert(top.shape == (2, 3))
+    for kpoint_idx in range(2):
+        assert(np.all(top['kpoint_idx'][kpoint_idx] == kpoint_idx))
+        assert(np.allclose(top['value'][kpoint_idx], np.sort(2 * ephmat_values[:, kpoint_idx].ravel())[::-1][:3]))
+        assert(np.allclose(2 * ephmat_values[top['mode'][kpoint_idx] - 1, kpoint_idx, top['qpoint_idx'][kpoint_idx]], top['value'][kpoint_idx]))
+
+    with pytest.raises(ValueError):
+        ephmat.top_couplings(quantity='phdisp')
+
+
+def test_strong_couplings(ephmat, ephmat_values):
+    """
+    Method to test the sparse list of couplings above a threshold
+
+    """
+    couplings = ephmat.strong_couplings(7.5)
+
+    assert(len(couplings) == np.count_nonzero(ephmat_values > 7.5))
+    assert(np.all(couplings['value'] > 7.5))
+
+    dense = np.zeros_like(ephmat_values)
+    dense[couplings['mode'] - 1, couplings['kpoint_idx'], couplings['qpoint_idx']] = couplings['value']
+    assert(np.allclose(dense, np.where(ephmat_values > 7.5, ephmat_values, 0)))
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from perturbopy.postproc.utils.constants import kB
+from perturbopy.postproc.utils.fermi import fermi_dirac, carrier_number, solve_chem_pot
+
+
+@pytest.fixture
+def states():
+    """
+    Method to generate random band energies (2 bands x 500 k-points) in eV and the weights of the states
+
+    """
+    rng = np.random.default_rng(7)
+    energies = np.stack([rng.uniform(0.0, 0.5, 500), rng.uniform(0.3, 1.0, 500)])
+
+    return energies, 2.0 / 500
+
+
+@pytest.mark.parametrize("hole", [False, True])
+def test_carrier_number(states, hole):
+    """
+    Method to test the number of carriers against a sum over the states for each (temperature, chemical potential)
+
+    Parameters
+    ----------
+    hole : bool
+       Whether to count the holes
+
+    """
+    energies, weights = states
+    temper = np.array([[100.0], [300.0], [1000.0]])
+    chem_pot = np.array([-0.2, 0.25, 1.1])
+
+    num_carriers = carrier_number(energies, weights, temper, chem_pot, hole=hole, chunk_size=7)
+
+    assert(num_carriers.shape == (3, 3))
+
+    for i in range(3):
+        for j in range(3):
+            occupations = fermi_dirac(energies, chem_pot[j], temper[i, 0])
+            expected = np.sum(weights * (1 - occupations if hole else occupations))
+
+            assert(np.isclose(num_carriers[i, j], expected, rtol=1e-9, atol=0))
+
+
+@pytest.mark.parametrize("hole", [False, True])
+def test_solve_chem_pot(states, hole):
+    """
+    Method to test that the chemical potentials solved for many temperatures and numbers of carriers
+    give back the numbers of carriers, including far from the band energies
+
+    Parameters
+    ----------
+    hole : bool
+       Whether the carriers are holes
+
+    """
+    energies, weights = states
+    temper = np.array([50.0, 300.0, 1500.0])[:, np.newaxis]
+    num_carriers = np.array([1e-12, 1e-3, 0.5, 3.9])
+
+    chem_pot = solve_chem_pot(energies, weights, temper, num_carriers, hole=hole, tol=1e-10)
+
+    assert(chem_pot.shape == (3, 4))
+
+    # Relative accuracy of the number of carriers is tol / kT
+    assert(np.allclose(carrier_number(energies, weights, temper, chem_pot, hole=hole), num_carriers, rtol=1e-6, atol=0))
+
+    # Non-degenerate electrons: N = N0 exp(mu / kT)
+    if not hole:
+        assert(np.all(np.diff(chem_pot, axis=1) > 0))
+        assert(np.isclose(chem_pot[1, 1] - chem_pot[1, 0], kB('ev/K') * 300 * np.log(1e9), rtol=1e-3))
+
+
+def test_solve_chem_pot_errors(states):
+    """
+    Method to test the errors raised for numbers of carriers larger than the number of states, or zero temperatures
+
+    """
+    energies, weights = states
+
+    with pytest.raises(ValueError):
+        solve_chem_pot(energies, weights, 300.0, 4.5)
+
+    with pytest.raises(ValueError):
+        solve_chem_pot(energies, weights, 0.0, 1.0)
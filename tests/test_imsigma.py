@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+
+import perturbopy.postproc as ppy
+from perturbopy.postproc.utils.constants import hbar
+
+
+@pytest.fixture()
+def imsigma(make_pert_dict):
+    """
+    Method to generate an Imsigma object with two configurations, two bands, three phonon modes and four k-points,
+    using the basic data of the GaAs YAML file
+
+    Returns
+    -------
+    imsigma : ppy.Imsigma
+
+    """
+    kpoints = np.array([[0, 0, 0], [0.1, 0, 0], [0.2, 0, 0], [0.3, 0, 0]])
+    configs = {}
+
+    for config_idx in [1, 2]:
+        band_dat = {}
+
+        for band_index in [1, 2]:
+            mode_dat = {mode: (config_idx * 10.0 + band_index + 0.1 * mode * np.arange(1, 5)).tolist() for mode in [1, 2, 3]}
+            band_dat[band_index] = {'Im(Sigma)': {'total': np.sum(list(mode_dat.values()), axis=0).tolist(), 'phonon mode': mode_dat}}
+
+        configs[config_idx] = {'temperature': 100.0 * config_idx, 'chemical potential': 6.5, 'band index': band_dat}
+
+    imsigma_dat = {'k-point coordinate units': 'crystal', 'number of k-points': 4, 'k-point coordinates': kpoints.tolist(),
+                   'energy units': 'eV', 'number of bands': 2,
+                   'energy': {'band index': {1: [6.0, 6.1, 6.2, 6.3], 2: [7.0, 7.1, 7.2, 7.3]}},
+                   'number of configurations': 2, 'configuration index': configs, 'number of phonon modes': 3,
+                   'temperature units': 'kelvin', 'chemical potential units': 'eV', 'Im(Sigma) units': 'meV'}
+
+    return ppy.Imsigma(make_pert_dict('imsigma', {'imsigma': imsigma_dat}))
+
+
+def test_imsigma_array(imsigma):
+    """
+    Method to test that imsigma and imsigma_mode are views of imsigma_array
+
+    """
+    assert(imsigma.imsigma_array.shape == (2, 2, 4, 4))
+    assert(np.shares_memory(imsigma.imsigma.array, imsigma.imsigma_array))
+    assert(np.shares_memory(imsigma.imsigma_mode.array, imsigma.imsigma_array))
+
+    assert(np.allclose(imsigma.imsigma[2][1], 3 * 21.0 + 0.6 * np.arange(1, 5)))
+    assert(np.allclose(imsigma.imsigma_mode[2][3][1], 21.0 + 0.3 * np.arange(1, 5)))
+    assert(np.allclose(imsigma.imsigma.array, np.sum(imsigma.imsigma_mode.array, axis=1)))
+    assert(list(imsigma.imsigma_mode[1].keys()) == [1, 2, 3])
+
+
+def test_scattering_rate(imsigma):
+    """
+    Method to test the scattering rates and relaxation times, and that they follow unit conversions
+
+    """
+    rates = imsigma.scattering_rate(1)
+
+    assert(rates.shape == (2, 4))
+    assert(np.allclose(rates, 2 * imsigma.imsigma.array[0] * 1e-3 / hbar('ev*fs') * 1e3))
+    assert(np.allclose(imsigma.relaxation_time(1), 1e3 / rates))
+    assert(np.allclose(np.sum(imsigma.scattering_rate(1, mode_resolved=True), axis=0), rates))
+    assert(imsigma.scattering_rate().shape == (2, 2, 4))
+
+    imsigma.imsigma.convert_units('eV')
+    assert(np.allclose(imsigma.scattering_rate(1), rates))
+
+
+def test_mean_free_path(imsigma):
+    """
+    Method to test the mean free paths from band velocity vectors and speeds
+
+    """
+    velocities = np.zeros((2, 4, 3))
+    velocities[..., 0] = 3e5
+    velocities[..., 1] = 4e5
+
+    mfp = imsigma.mean_free_path(velocities, config=2)
+
+    assert(np.allclose(mfp, 5e5 * imsigma.relaxation_time(2) * 1e-6))
+    assert(np.allclose(imsigma.mean_free_path(np.full((2, 4), 5e5))[1], mfp))
+
+    with pytest.raises(ValueError):
+        imsigma.mean_free_path(np.ones(4))
+
+
+@pytest.mark.parametrize("smearing", [None, 0.02])
+def test_scattering_spectrum(imsigma, smearing):
+    """
+    Method to test that the scattering spectrum integrates to the average of the scattering rates over k-points
+
+    Parameters
+    ----------
+    smearing : float
+       Standard deviation of the Gaussian broadening in eV
+
+    """
+    energy_grid = np.linspace(5.5, 8.0, 501)
+    spectrum = imsigma.scattering_spectrum(energy_grid, smearing=smearing)
+
+    assert(spectrum.shape == (2, 3, 501))
+
+    rates = imsigma.scattering_rate(mode_resolved=True)
+    assert(np.allclose(np.sum(spectrum, axis=2) * (energy_grid[1] - energy_grid[0]), np.sum(rates, axis=(2, 3)) / 4))
+
+
+def test_scattering_spectrum_average(imsigma):
+    """
+    Method to test the average scattering rate of the states in each energy bin
+
+    """
+    energy_grid = np.array([6.0, 6.1, 6.2, 6.3, 6.4])
+    average = imsigma.scattering_spectrum(energy_grid, average=True)
+
+    # Each of the first four bins holds one state of band 1
+    rates = imsigma.scattering_rate(mode_resolved=True)
+    assert(np.allclose(average[..., :4], rates[:, :, 0, :]))
+    assert(np.all(np.isnan(average[..., 4])))
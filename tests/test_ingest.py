@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+import os
+import shutil
+import yaml
+
+import perturbopy.postproc as ppy
+from perturbopy.io_utils import ingest
+
+
+@pytest.fixture()
+def calc_tree(tmp_path, make_pert_dict):
+    """
+    Fixture to generate a directory tree with two bands calculations, for two materials, and an unrelated YAML file
+
+    Returns
+    -------
+    directory : str
+
+    """
+    directory = os.path.join(tmp_path, 'calcs')
+
+    for material in ['gaas', 'gaas2']:
+        os.makedirs(os.path.join(directory, material, 'bands'))
+        yaml_path = os.path.join(directory, material, 'bands', 'pert_output.yml')
+
+        pert_dict = make_pert_dict('bands')
+        pert_dict['input parameters']['after conversion']['prefix'] = material
+
+        with open(yaml_path, 'w') as yaml_file:
+            yaml.dump(pert_dict, yaml_file)
+
+    with open(os.path.join(directory, 'settings.yml'), 'w') as yaml_file:
+        yaml_file.write('color: blue\n')
+
+    return directory
+
+
+@pytest.mark.parametrize("executor", [None, 'process'])
+def test_ingest(calc_tree, tmp_path, executor):
+    """
+    Method to test ingesting a directory tree, reading the index and the data back, and skipping unchanged files
+
+    Parameters
+    ----------
+    executor : None or str
+       How the YAML files are parsed in parallel
+
+    """
+    store_path = os.path.join(tmp_path, 'store.h5')
+
+    status = ingest.ingest(calc_tree, store_path, executor=executor, max_workers=2)
+
+    assert(list(status.values()).count('ingested') == 2)
+    assert(status[os.path.join(calc_tree, 'settings.yml')].startswith('skipped'))
+
+    index = ingest.read_index(store_path)
+    assert(sorted(index['material']) == ['gaas', 'gaas2'])
+    assert(all(index['calc_mode'] == 'bands'))
+
+    row = ingest.read_index(store_path, material='gaas2', calc_mode='bands')[0]
+    data = ingest.read_calc(store_path, row['group'])
+
+    bands = ppy.Bands.from_yaml(os.path.join('refs', 'gaas_bands.yml'))
+    assert(np.allclose(data['bands']['array'], bands.bands.array))
+    assert(data['bands']['units'] == bands.bands.units)
+    assert(np.allclose(data['kpt']['points_cryst'], bands.kpt.points_cryst))
+    assert(np.allclose(data['lat'], bands.lat))
+
+    # Only the modified file is parsed again
+    with open(row['path'], 'a') as yaml_file:
+        yaml_file.write('\n')
+
+    status = ingest.ingest(calc_tree, store_path, executor=executor)
+    assert(status[row['path']] == 'ingested')
+    assert(list(status.values()).count('unchanged') == 1)
+    assert(len(ingest.read_index(store_path)) == 2)
+
+
+@pytest.mark.parametrize("executor", [None, 'process'])
+def test_ingest_broken_yaml(calc_tree, tmp_path, executor):
+    """
+    Method to test that a malformed YAML file is skipped, and that the other files are ingested and indexed
+
+    Parameters
+    ----------
+    executor : None or str
+       How the YAML files are parsed in parallel
+
+    """
+    store_path = os.path.join(tmp_path, 'store.h5')
+    broken_path = os.path.join(calc_tree, 'gaas', 'broken.yml')
+
+    with open(broken_path, 'w') as yaml_file:
+        yaml_file.write('input parameters: [1, 2\nbasic data: {\n')
+
+    status = ingest.ingest(calc_tree, store_path, executor=executor)
+
+    assert(status[broken_path].startswith('skipped: could not be parsed'))
+    assert(list(status.values()).count('ingested') == 2)
+
+    assert(sorted(ingest.read_index(store_path)['material']) == ['gaas', 'gaas2'])
+    assert(len(ingest.read_calc(store_path, 'calc_1')) > 0)
+
+
+def test_ingest_stale(calc_tree, tmp_path):
+    """
+    Method to test that the calculations of files that can no longer be parsed, or were deleted, are removed from the store
+
+    """
+    store_path = os.path.join(tmp_path, 'store.h5')
+    gaas_path = os.path.join(calc_tree, 'gaas', 'bands', 'pert_output.yml')
+    gaas2_path = os.path.join(calc_tree, 'gaas2', 'bands', 'pert_output.yml')
+
+    ingest.ingest(calc_tree, store_path, executor=None)
+    assert(sorted(ingest.read_index(store_path)['material']) == ['gaas', 'gaas2'])
+
+    with open(gaas_path, 'w') as yaml_file:
+        yaml_file.write('input parameters: [1, 2\n')
+
+    os.remove(gaas2_path)
+
+    status = ingest.ingest(calc_tree, store_path, executor=None)
+
+    assert(status[gaas_path].startswith('skipped: could not be parsed'))
+    assert(status[gaas2_path] == 'removed')
+    assert(len(ingest.read_index(store_path)) == 0)
+
+    with pytest.raises(ValueError):
+        ingest.ingest(calc_tree, store_path, executor='thread')
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from perturbopy.postproc.utils.interpolation import split_path, PathSpline
+
+
+@pytest.fixture()
+def kinked_path():
+    """
+    Fixture to generate a path from [0, 0, 0] to [1, 0, 0] to [1, 1, 0], followed by a jump to [0, 0, 1]
+    and a segment to [0, 0, 2], with values that have a kink at the corner
+
+    Returns
+    -------
+    path, points, values : np.ndarray
+
+    """
+    x = np.linspace(0, 1, 21)
+    points = np.concatenate([np.stack([x, 0 * x, 0 * x]),
+                             np.stack([1 + 0 * x[1:], x[1:], 0 * x[1:]]),
+                             np.stack([0 * x, 0 * x, 1 + x])], axis=1)
+    path = np.concatenate([x, 1 + x[1:], 2 + x])
+
+    values = np.stack([np.abs(path - 1) ** 2, np.cos(path)])
+
+    return path, points, values
+
+
+def test_split_path(kinked_path):
+    """
+    Method to test splitting a path at changes of direction and jumps
+
+    """
+    path, points, _ = kinked_path
+
+    assert(split_path(path, points) == [slice(0, 21), slice(20, 41), slice(41, 62)])
+    assert(split_path(path, points, split_indices=[10]) == [slice(0, 11), slice(10, 21), slice(20, 41), slice(41, 62)])
+
+
+def test_path_spline(kinked_path):
+    """
+    Method to test the interpolation of values and derivatives along a kinked path
+
+    """
+    path, points, values = kinked_path
+    spline = PathSpline(path, points, values)
+
+    path_coords = np.array([0.33, 1.0, 1.77, 2.5])
+
+    assert(np.allclose(spline(path), values))
+    assert(np.allclose(spline(path_coords), [np.abs(path_coords - 1)**2, np.cos(path_coords)], atol=1e-5))
+    assert(np.allclose(spline(path_coords[[0, 2]], derivative=1)[0], 2 * (path_coords[[0, 2]] - 1)))
+
+    with pytest.raises(ValueError):
+        spline([3.5])
+
+
+def test_project(kinked_path):
+    """
+    Method to test the projection of points onto the path
+
+    """
+    path, points, _ = kinked_path
+    spline = PathSpline(path, points, np.zeros_like(path))
+
+    projected = spline.project(np.array([[0.333, 0, 0.01], [1, 0.5, 0], [0, 0, 1.25], [0.5, 0.5, 0]]).T)
+
+    assert(np.allclose(projected[:3], [0.333, 1.5, 2.25]))
+    assert(np.isnan(projected[3]))
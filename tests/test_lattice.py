@@ -189,3 +189,55 @@ def test_convert_path2point(test_path, test_points_array, test_path_array, atol,
     """
     print(ppy.lattice.convert_path2point(test_path, test_points_array, test_path_array))
     assert(np.all(np.isclose(ppy.lattice.convert_path2point(test_path, test_points_array, test_path_array), expected)))
+
+
+@pytest.mark.parametrize("periodic, use_grid", [
+                         (False, False), (True, False), (False, True), (True, True)
+])
+def test_find_points(periodic, use_grid):
+    """
+    Method to test the batched lattice.find_points function, with a KD-tree or grid arithmetic
+
+    Parameters
+    ----------
+    periodic : bool
+       If True, points differing by a reciprocal lattice vector are equivalent
+    use_grid : bool
+       If True, the points are located on the uniform grid
+
+    """
+    kc_dim = np.array([4, 3, 5])
+    grid = np.stack(np.meshgrid(*[np.arange(n) / n for n in kc_dim], indexing='ij')).reshape(3, -1)
+
+    # Keep a random subset of the grid points, as for the k-points in an energy window
+    rng = np.random.default_rng(3)
+    subset = np.sort(rng.choice(grid.shape[1], 40, replace=False))
+    point_array = grid[:, subset]
+
+    targets = rng.integers(0, grid.shape[1], 200)
+    shifts = rng.integers(-2, 3, size=(3, 200))
+    queries = grid[:, targets] + shifts + rng.normal(scale=0.005, size=(3, 200))
+
+    expected = np.full(200, -1)
+    in_cell = np.all(shifts == 0, axis=0) | periodic
+    in_subset = np.isin(targets, subset)
+    expected[in_cell & in_subset] = np.searchsorted(subset, targets[in_cell & in_subset])
+
+    points_indices = ppy.lattice.find_points(queries.T, point_array, max_dist=0.05, periodic=periodic,
+                                             kc_dim=kc_dim if use_grid else None)
+
+    assert(np.array_equal(points_indices, expected))
+
+
+def test_grid_point_numbers():
+    """
+    Method to test the numbering of points on a uniform grid, and folding into the unit cell
+
+    """
+    kc_dim = [2, 3, 4]
+    points = [[0, 0, 0], [0.5, 1 / 3, 0.75], [-0.5, 4 / 3, -0.25], [0.1, 0, 0]]
+
+    assert(np.array_equal(ppy.lattice.grid_point_numbers(points, kc_dim), [0, 12 + 4 + 3, 12 + 4 + 3, -1]))
+    assert(np.array_equal(ppy.lattice.grid_point_numbers(points, kc_dim, periodic=False), [0, 12 + 4 + 3, -1, -1]))
+    assert(np.allclose(ppy.lattice.fold_points(points)[:, 2], [0.5, 1 / 3, 0.75]))
+    assert(np.isclose(ppy.lattice.compute_distances([0.95, 0, 0], [0, 0, 0], periodic=True), 0.05))
@@ -1,5 +1,6 @@
 import numpy as np
 import pytest
+import os
 
 import perturbopy.postproc as ppy
 
@@ -173,3 +174,111 @@ def test_path2point_cart(recip_dbs, test_path, atol, expected):
         assert(np.all(recip_dbs.path2point(test_path) == expected))
     else:
         assert(np.all(recip_dbs.path2point(test_path, atol=atol) == expected))
+
+
+@pytest.mark.parametrize("nearest", [True, False])
+def test_find_indices(nearest):
+    """
+    Method to test the search of many points with the KD-tree, against the brute force lattice.find_point
+
+    Parameters
+    ----------
+    nearest : bool
+       If True, only the nearest matches are searched
+
+    """
+    rng = np.random.default_rng(2)
+    grid = np.stack(np.meshgrid(*[np.arange(6) / 6] * 3, indexing='ij')).reshape(3, -1)
+    recip_dbs = ppy.RecipPtDB(grid, grid)
+
+    queries = grid[:, rng.integers(0, grid.shape[1], 20)] + rng.normal(scale=0.02, size=(3, 20))
+    max_dist = 0.04
+
+    points_indices = recip_dbs.find_indices(queries, max_dist=max_dist, nearest=nearest)
+
+    for i in range(queries.shape[1]):
+        expected = ppy.lattice.find_point(queries[:, i], grid, max_dist, nearest)
+
+        assert(np.array_equal(recip_dbs.find(queries[:, i], max_dist, nearest), expected))
+
+        if nearest:
+            assert(points_indices[i] == (expected[0] if len(expected) > 0 else -1))
+        else:
+            assert(np.array_equal(points_indices[i], expected))
+
+
+def test_tree_units(recip_dbs):
+    """
+    Method to test that the KD-tree follows the units of the points
+
+    """
+    assert(recip_dbs.find([0.25, 0.75, 0.5]) == [3])
+
+    recip_dbs.convert_units('cartesian')
+
+    assert(np.array_equal(recip_dbs.tree.data, np.transpose(points_cart)))
+    assert(recip_dbs.find([0.5, 1, 0]) == [3])
+    assert(recip_dbs.find_indices([[0.5, 1, 0], [5, 5, 5]]).tolist() == [3, -1])
+
+
+def shortest_norms(points_cryst, recip_lat):
+    """
+    Norms of the shortest periodic images of points in crystal coordinates (folded into [0, 1)),
+    which are invariant under the point group
+
+    """
+    shifts = np.stack(np.meshgrid(*[np.arange(-2, 2)] * 3, indexing='ij')).reshape(3, -1)
+    images = points_cryst[:, :, np.newaxis] + shifts[:, np.newaxis, :]
+
+    return np.min(np.linalg.norm(np.einsum('ij,jnm->inm', recip_lat, images), axis=0), axis=1)
+
+
+@pytest.mark.parametrize("use_grid, time_reversal", [
+                         (True, True), (False, True), (True, False)
+])
+def test_unfold(use_grid, time_reversal):
+    """
+    Method to test unfolding irreducible k-points to the full grid with the symmetry operations of GaAs
+
+    Parameters
+    ----------
+    use_grid : bool
+       If True, equivalent points are identified by their grid number
+    time_reversal : bool
+       If True, time-reversal symmetry is applied
+
+    """
+    bands = ppy.Bands.from_yaml(os.path.join('refs', 'gaas_bands.yml'))
+    kc_dim = np.array([4, 4, 4])
+
+    # Rotations in cartesian coordinates, independent of the convention of the operations in crystal coordinates
+    rotations = [bands.lat @ op @ np.linalg.inv(bands.lat) for op in ppy.lattice.symop_array(bands.symop)]
+
+    if time_reversal:
+        rotations += [-rotation for rotation in rotations]
+
+    grid = np.stack(np.meshgrid(*[np.arange(n) / n for n in kc_dim], indexing='ij')).reshape(3, -1)
+    grid_numbers = ppy.lattice.grid_point_numbers(grid, kc_dim)
+    grid_cart = bands.recip_lat @ grid
+
+    # Brute force irreducible wedge: keep a point if none of its images is already kept
+    irreducible = []
+    covered = set()
+    for i in range(grid.shape[1]):
+        if grid_numbers[i] not in covered:
+            irreducible.append(i)
+            images = np.linalg.solve(bands.recip_lat, np.stack([rotation @ grid_cart[:, i] for rotation in rotations], axis=1))
+            covered.update(ppy.lattice.grid_point_numbers(images, kc_dim).tolist())
+
+    irr_db = ppy.RecipPtDB.from_lattice(grid[:, irreducible], 'crystal', bands.lat, bands.recip_lat)
+    full_db, full2irr = irr_db.unfold(bands.symop, bands.lat, bands.recip_lat, kc_dim=kc_dim if use_grid else None,
+                                      time_reversal=time_reversal)
+
+    assert(len(irreducible) < grid.shape[1])
+    assert(np.allclose(np.sort(ppy.lattice.grid_point_numbers(full_db.points_cryst, kc_dim)), np.arange(grid.shape[1])))
+
+    # Each point of the full grid has the same norm as its irreducible point
+    full_norms = shortest_norms(full_db.points_cryst, bands.recip_lat)
+    irr_norms = shortest_norms(irr_db.points_cryst, bands.recip_lat)
+
+    assert(np.allclose(full_norms, irr_norms[full2irr]))
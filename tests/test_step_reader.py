@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+import os
+import h5py
+
+from perturbopy.io_utils.step_reader import StepDatasetReader
+from perturbopy.postproc.utils.timing import TimingGroup
+
+num_steps = 23
+step_shape = (7, 3)
+
+
+@pytest.fixture()
+def step_file(tmp_path):
+    """
+    Fixture to generate an HDF5 file with numbered datasets popu_t0, ..., popu_t22 and one unrelated dataset.
+
+    Returns
+    -------
+    step_file : h5py.File
+    data : np.ndarray
+       The data of all of the steps, with shape (num_steps,) + step_shape
+
+    """
+    rng = np.random.default_rng(1)
+    data = rng.random((num_steps,) + step_shape)
+
+    step_file = h5py.File(os.path.join(tmp_path, 'steps.h5'), 'w')
+    group = step_file.create_group('energy_distribution')
+
+    # Write the datasets out of order to check the steps are sorted
+    for istep in rng.permutation(num_steps):
+        group[f'popu_t{istep}'] = data[istep]
+    group['popu_total'] = np.zeros(3)
+
+    yield step_file, data
+
+    step_file.close()
+
+
+def test_read_all(step_file):
+    """
+    Method to test reading all of the steps
+
+    """
+    step_file, data = step_file
+
+    reader = StepDatasetReader(step_file['energy_distribution'], 'popu_t')
+
+    assert(np.array_equal(reader.steps, np.arange(num_steps)))
+    assert(reader.shape == step_shape)
+    assert(np.array_equal(reader.read(), data))
+
+
+def test_read_selection(step_file):
+    """
+    Method to test reading a selection of steps into a preallocated buffer, with timings
+
+    """
+    step_file, data = step_file
+
+    timings = TimingGroup('test')
+    reader = StepDatasetReader(step_file['energy_distribution'], 'popu_t', timings=timings)
+
+    steps = [20, 3, 3, 11]
+    out = np.empty((len(steps),) + step_shape)
+
+    assert(reader.read(steps, out=out) is out)
+    assert(np.array_equal(out, data[steps]))
+
+    timing = timings.timings['read_steps']
+    assert(timing.nbytes == out.nbytes)
+    assert('throughput_MBps' in timings.to_dict()['read_steps'])
+
+    with pytest.raises(KeyError):
+        reader.read([num_steps])
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+import h5py
+import os
+
+from perturbopy.postproc.utils.tetrahedron import tetra_dos, read_tetra
+
+
+@pytest.mark.parametrize("vertex_energies, vertex_weights", [
+                         [[0.3, 1.7, 1.0, 2.5], [1.0, -2.0, 3.0, 0.5]],
+                         [[0.5, 0.5, 1.5, 2.0], [0.0, 1.0, 2.0, 3.0]],
+                         [[0.2, 1.0, 1.0, 1.0], [2.0, 1.0, 1.0, -1.0]],
+])
+def test_tetra_dos_sampling(vertex_energies, vertex_weights):
+    """
+    Method to test the density of states of a single tetrahedron against a histogram of sampled points
+
+    Parameters
+    ----------
+    vertex_energies, vertex_weights : list of float
+       Energies and projection weights at the four vertices
+
+    """
+    rng = np.random.default_rng(3)
+
+    # Uniform sampling of the tetrahedron in barycentric coordinates
+    barycentric = rng.dirichlet(np.ones(4), size=1000000)
+    energies = barycentric @ vertex_energies
+    weights = barycentric @ vertex_weights
+
+    edges = np.linspace(0.0, 2.6, 27)
+    centers = 0.5 * (edges[1:] + edges[:-1])
+    width = edges[1] - edges[0]
+
+    dos = tetra_dos([vertex_energies], [[0, 1, 2, 3]], centers)
+    pdos = tetra_dos([vertex_energies], [[0, 1, 2, 3]], centers, weights=[vertex_weights])
+
+    assert(np.allclose(dos[0], np.histogram(energies, edges)[0] / len(energies) / width, atol=0.03))
+    assert(np.allclose(pdos[0], np.histogram(energies, edges, weights=weights)[0] / len(energies) / width, atol=0.06))
+
+
+def test_tetra_dos_batches():
+    """
+    Method to test that the density of states does not depend on the chunks and batches of tetrahedra
+
+    """
+    rng = np.random.default_rng(4)
+    energies = rng.random((3, 20))
+    weights = rng.random((3, 20))
+    tetra = rng.integers(0, 20, (50, 4))
+    energy_grid = np.linspace(-0.1, 1.1, 121)
+
+    dos = tetra_dos(energies, tetra, energy_grid, weights=weights)
+
+    assert(dos.shape == (3, 121))
+    assert(np.allclose(tetra_dos(energies, tetra, energy_grid, weights=weights, chunk_size=7, max_pairs=10), dos))
+    assert(np.allclose(tetra_dos(energies, tetra, energy_grid, weights=np.ones((3, 20))), tetra_dos(energies, tetra, energy_grid)))
+
+    # The projection is linear in the weights
+    assert(np.allclose(tetra_dos(energies, tetra, energy_grid, weights=2 * weights + energies),
+                       2 * dos + energy_grid * tetra_dos(energies, tetra, energy_grid)))
+
+    with pytest.raises(ValueError):
+        tetra_dos(energies, tetra, energy_grid[::-1])
+
+
+def test_read_tetra(tmp_path):
+    """
+    Method to test reading the tetrahedra stored by Perturbo in the tet file
+
+    """
+    tetra = np.arange(24).reshape(6, 4) % 5
+    tet_path = os.path.join(tmp_path, 'tet.h5')
+
+    with h5py.File(tet_path, 'w') as tet_file:
+        tet_file['tetra'] = np.stack([np.zeros_like(tetra), tetra + 1], axis=2)
+
+    with h5py.File(tet_path, 'r') as tet_file:
+        assert(np.array_equal(read_tetra(tet_file), tetra))
+
+        with pytest.raises(ValueError):
+            read_tetra(tet_file, num_kpoints=4)
@@ -0,0 +1,255 @@
+import numpy as np
+import pytest
+
+import perturbopy.postproc as ppy
+
+
+def geometric_cond(cond_converged, amplitude, ratio, num_iter):
+    """
+    Method to generate conductivity tensors converging geometrically to cond_converged
+
+    Parameters
+    ----------
+    cond_converged : float
+       Diagonal of the converged conductivity tensor
+
+    amplitude, ratio : float
+       The conductivity at iteration n is cond_converged - amplitude * ratio**n
+
+    num_iter : int
+
+    Returns
+    -------
+    iteration_dat : dict
+
+    """
+    return {n: {'conductivity': {'tensor': ((cond_converged - amplitude * ratio**n) * np.eye(3)).tolist()}}
+            for n in range(1, num_iter + 1)}
+
+
+def make_trans(make_pert_dict, calc_mode, configs, extra_units={}):
+    """
+    Method to generate a Trans object from a list of configurations, using the basic data of the GaAs YAML file
+
+    Parameters
+    ----------
+    make_pert_dict : function
+       Function generating the dictionary of the YAML file, see conftest.py
+
+    calc_mode : str
+
+    configs : list of dict
+       Data of each configuration, as in the trans section of the YAML file
+
+    extra_units : dict
+       Units of the optional quantities, e.g. thermal conductivity units
+
+    Returns
+    -------
+    trans : ppy.Trans
+
+    """
+    trans_dat = {'temperature units': 'kelvin', 'chemical potential units': 'eV', 'concentration units': 'cm-3',
+                 'conductivity units': '1/(Ohm*m)', 'mobility units': 'cm2/(V*s)',
+                 'number of configurations': len(configs),
+                 'configuration index': {config_idx: config for config_idx, config in enumerate(configs, start=1)}}
+    trans_dat.update(extra_units)
+
+    return ppy.Trans(make_pert_dict(calc_mode, {'trans': trans_dat}))
+
+
+@pytest.fixture()
+def trans_ita(make_pert_dict):
+    """
+    Method to generate a Trans object of a trans-ita calculation with two configurations
+
+    Returns
+    -------
+    trans : ppy.Trans
+
+    """
+    configs = []
+
+    for config_idx, iteration_dat in enumerate([geometric_cond(100.0, 50.0, 0.5, 6), geometric_cond(200.0, 100.0, 0.1, 3)], start=1):
+        last = iteration_dat[len(iteration_dat)]['conductivity']['tensor']
+        configs.append({'temperature': 100.0 * config_idx, 'chemical potential': 6.5, 'concentration': 1e17,
+                        'conductivity': {'tensor': last}, 'mobility': {'tensor': last},
+                        'number of iterations': len(iteration_dat), 'iteration': iteration_dat})
+
+    return make_trans(make_pert_dict, 'trans-ita', configs)
+
+
+def sweep_mob(temper, conc):
+    """
+    Method to compute a mobility linear in the temperature and in log10 of the concentration
+
+    """
+    return 1000.0 - temper + 100.0 * np.log10(conc)
+
+
+def sweep_trans(make_pert_dict, sweep):
+    """
+    Method to generate a Trans object of a trans-rta calculation over a sweep of temperatures and concentrations
+
+    Parameters
+    ----------
+    make_pert_dict : function
+       Function generating the dictionary of the YAML file, see conftest.py
+
+    sweep : list of tuple
+       Temperature and concentration of each configuration
+
+    Returns
+    -------
+    trans : ppy.Trans
+
+    """
+    configs = [{'temperature': temper, 'chemical potential': 6.0 + 0.1 * np.log10(conc), 'concentration': conc,
+                'conductivity': {'tensor': np.eye(3).tolist()}, 'mobility': {'tensor': (sweep_mob(temper, conc) * np.eye(3)).tolist()},
+                'thermal conductivity': {'tensor': (temper * np.eye(3)).tolist()}} for temper, conc in sweep]
+
+    return make_trans(make_pert_dict, 'trans-rta', configs, {'thermal conductivity units': 'W/(m*K)'})
+
+
+def test_cond_iter_array(trans_ita):
+    """
+    Method to test that cond_iter_array stacks the conductivity tensors of cond_iter
+
+    """
+    assert(trans_ita.cond_iter_array.shape == (2, 6, 3, 3))
+    assert(np.array_equal(trans_ita.num_iter, [6, 3]))
+    assert(np.array_equal(np.ma.count(trans_ita.cond_iter_array, axis=(1, 2, 3)), [6 * 9, 3 * 9]))
+
+    for iconfig, config_idx in enumerate(trans_ita.cond_iter.keys()):
+        for iteration, tensor in trans_ita.cond_iter[config_idx].items():
+            assert(np.allclose(trans_ita.cond_iter_array[iconfig, iteration - 1], tensor))
+
+
+def test_cond_iter_change(trans_ita):
+    """
+    Method to test the relative change of the conductivity tensor and the iterations to tolerance
+
+    """
+    rel_change = trans_ita.cond_iter_change()
+
+    assert(rel_change.shape == (2, 6))
+    assert(np.array_equal(np.ma.getmaskarray(rel_change), [[True, False, False, False, False, False],
+                                                           [True, False, False, True, True, True]]))
+
+    cond = 100.0 - 50.0 * 0.5**np.arange(1, 7)
+    assert(np.allclose(rel_change[0, 1:], np.abs(np.diff(cond)) / cond[1:]))
+
+    assert(np.array_equal(trans_ita.iterations_to_tolerance(1e-2), [6, 3]))
+    assert(np.array_equal(trans_ita.iterations_to_tolerance(5e-3), [-1, 3]))
+
+
+def test_cond_extrapolated(trans_ita):
+    """
+    Method to test that the extrapolation of geometrically converging conductivities is exact
+
+    """
+    cond = trans_ita.cond_extrapolated()
+
+    assert(cond.shape == (2, 3, 3))
+    assert(np.allclose(cond[0], 100.0 * np.eye(3)))
+    assert(np.allclose(cond[1], 200.0 * np.eye(3)))
+
+
+def test_cond_iter_rta(trans_ita):
+    """
+    Method to test that the iteration analytics raise a ValueError without iterations
+
+    """
+    trans_ita.cond_iter_array = None
+
+    with pytest.raises(ValueError):
+        trans_ita.cond_extrapolated()
+
+
+@pytest.fixture()
+def trans_sweep(make_pert_dict):
+    """
+    Method to generate a Trans object over a grid of three temperatures and three concentrations
+
+    Returns
+    -------
+    trans : ppy.Trans
+
+    """
+    return sweep_trans(make_pert_dict, [(temper, conc) for conc in [1e16, 1e17, 1e18] for temper in [100.0, 200.0, 300.0]])
+
+
+def test_table(trans_sweep):
+    """
+    Method to test the columnar table of the configurations
+
+    """
+    table = trans_sweep.table
+
+    assert(len(table) == 9)
+    assert('seebeck' not in table.dtype.names and 'bfield' not in table.dtype.names)
+    assert(np.array_equal(table['config'], np.arange(1, 10)))
+
+    for row in table:
+        assert(row['temper'] == trans_sweep.temper[row['config']] and row['conc'] == trans_sweep.conc[row['config']])
+        assert(np.allclose(row['mob'], trans_sweep.mob[row['config']]))
+        assert(np.allclose(row['thermal_cond'], row['temper'] * np.eye(3)))
+
+
+def test_select(trans_sweep):
+    """
+    Method to test the selection of configurations by temperature and concentration
+
+    """
+    configs = trans_sweep.select(temper=300)
+
+    assert(np.array_equal(configs['config'], [3, 6, 9]))
+    assert(np.all(np.diff(configs['conc']) > 0))
+
+    configs = trans_sweep.select(temper=(150, 300), conc=1e17, sort_by='temper')
+    assert(np.array_equal(configs['config'], [5, 6]))
+
+    assert(len(trans_sweep.select(temper=250)) == 0)
+    assert(len(trans_sweep.select(chem_pot=(6.0, 7.7))) == 6)
+
+
+@pytest.mark.parametrize("sweep", [
+                         [(temper, conc) for conc in [1e16, 1e17, 1e18] for temper in [100.0, 200.0, 300.0]],
+                         [(temper, conc) for conc in [1e16, 1e17, 1e18] for temper in [100.0, 200.0, 300.0]][:-1],
+])
+def test_interpolate(make_pert_dict, sweep):
+    """
+    Method to test the interpolation of the mobility over a grid and a scattered sweep
+
+    Parameters
+    ----------
+    sweep : list of tuple
+       Temperature and concentration of each configuration
+
+    """
+    trans = sweep_trans(make_pert_dict, sweep)
+
+    temper = np.array([150.0, 120.0, 250.0])
+    conc = np.array([3e16, 5e17, 1e16])
+
+    mob = trans.interpolate('mob', temper, conc)
+
+    assert(mob.shape == (3, 3, 3))
+    assert(np.allclose(mob, sweep_mob(temper, conc)[:, np.newaxis, np.newaxis] * np.eye(3)))
+    assert(np.allclose(trans.interpolate('chem_pot', 200.0, 1e17), 6.0 + 0.1 * 17))
+    assert(np.isnan(trans.interpolate('chem_pot', 400.0, 1e17)))
+
+    with pytest.raises(ValueError):
+        trans.interpolate('conc', 200.0, 1e17)
+
+
+def test_interpolate_1d(make_pert_dict):
+    """
+    Method to test the interpolation of the mobility over a sweep of concentrations at one temperature
+
+    """
+    trans = sweep_trans(make_pert_dict, [(300.0, conc) for conc in [1e16, 1e17, 1e18]])
+    mob = trans.interpolate('mob', [300.0, 200.0], 1e17 * np.sqrt(10))
+
+    assert(np.allclose(mob[0], sweep_mob(300.0, 1e17 * np.sqrt(10)) * np.eye(3)))
+    assert(np.all(np.isnan(mob[1])))
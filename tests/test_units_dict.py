@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+import copy
+
+import perturbopy.postproc as ppy
+
+
+@pytest.fixture()
+def nested_dict():
+    """
+    Fixture to generate a dictionary of configuration -> band -> values, as in an imsigma calculation
+
+    """
+    return {1: {1: [0.1, 0.2, 0.3], 2: [0.4, 0.5, 0.6]},
+            2: {1: [1.1, 1.2, 1.3], 2: [1.4, 1.5, 1.6]}}
+
+
+def test_from_dict(nested_dict):
+    """
+    Method to test creating a UnitsArray from a nested dictionary, and the views of the array
+
+    """
+    units_array = ppy.UnitsArray.from_dict(nested_dict, 'meV', depth=2)
+
+    assert(units_array.array.shape == (2, 2, 3))
+    assert(units_array.index_keys == [[1, 2], [1, 2]])
+    assert(units_array.index(2, 1) == (1, 0))
+    assert(np.array_equal(units_array[2][1], nested_dict[2][1]))
+    assert(np.shares_memory(units_array[2][1], units_array.array))
+
+    units_array[1][2][:] = 0.0
+    assert(np.all(units_array.array[0, 1] == 0.0))
+
+
+def test_setitem(nested_dict):
+    """
+    Method to test that assigning the values of a key copies them into the array, at every level of keys
+
+    """
+    units_array = ppy.UnitsArray.from_dict(nested_dict, 'meV', depth=2)
+    view = units_array[2]
+
+    units_array[1] = 2 * units_array.array[0]
+    units_array[2][1] = units_array[2][1] * 10
+    units_array[2].update({2: [7.0, 8.0, 9.0]})
+
+    assert(np.allclose(units_array.array[0], 2 * np.array([nested_dict[1][1], nested_dict[1][2]])))
+    assert(np.allclose(units_array.array[1, 0], 10 * np.array(nested_dict[2][1])))
+    assert(np.allclose(units_array.array[1, 1], [7.0, 8.0, 9.0]))
+    assert(view is units_array[2] and np.shares_memory(units_array[2][1], units_array.array))
+
+    with pytest.raises(KeyError):
+        units_array[3] = units_array.array[0]
+
+    with pytest.raises(KeyError):
+        units_array[1][3] = [0.0, 0.0, 0.0]
+
+    with pytest.raises(ValueError):
+        units_array[1][1] = [0.0, 0.0]
+
+
+def test_convert_units():
+    """
+    Method to test the in place unit conversion of a UnitsArray
+
+    """
+    units_array = ppy.UnitsArray.from_dict({1: [1.0, 2.0], 2: [3.0, 4.0]}, 'eV')
+    band = units_array[2]
+
+    units_array.convert_units('meV')
+
+    assert(units_array.units == 'meV')
+    assert(np.allclose(band, [3000.0, 4000.0]))
+    assert(np.allclose(np.min(units_array, axis=1), [1000.0, 3000.0]))
+
+
+def test_copy(nested_dict):
+    """
+    Method to test that copies of a UnitsArray keep the views in sync with their own array
+
+    """
+    units_array = ppy.UnitsArray.from_dict(nested_dict, 'meV', depth=2)
+    units_copy = copy.deepcopy(units_array)
+
+    assert(isinstance(units_copy, ppy.UnitsArray) and units_copy.units == 'meV')
+    assert(not np.shares_memory(units_copy.array, units_array.array))
+    assert(np.shares_memory(units_copy[1][1], units_copy.array))
+
+
+def test_invalid_dict(nested_dict):
+    """
+    Method to test that dictionaries with different keys in different branches are rejected
+
+    """
+    nested_dict[2][3] = nested_dict[2].pop(2)
+
+    with pytest.raises(ValueError):
+        ppy.UnitsArray.from_dict(nested_dict, 'meV', depth=2)
+
+    with pytest.raises(ValueError):
+        ppy.UnitsArray('meV', np.zeros((2, 3)), [1, 2, 3])
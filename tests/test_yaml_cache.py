@@ -0,0 +1,114 @@
+import pytest
+import os
+import shutil
+
+from perturbopy.io_utils import yaml_cache
+from perturbopy.io_utils.io import open_yaml
+
+
+@pytest.fixture()
+def cache_dir(tmp_path):
+    """
+    Fixture to switch on the YAML cache in a temporary directory, and restore the settings afterwards
+
+    Returns
+    -------
+    cache_dir : str
+
+    """
+    settings = yaml_cache._settings.copy()
+    cache_dir = os.path.join(tmp_path, 'cache')
+
+    yaml_cache.enable_cache(cache_dir=cache_dir)
+
+    yield cache_dir
+
+    yaml_cache._settings.update(settings)
+
+
+@pytest.fixture()
+def yaml_path(tmp_path):
+    """
+    Fixture to copy the GaAs bands reference to a temporary directory
+
+    """
+    yaml_path = os.path.join(tmp_path, 'gaas_bands.yml')
+    shutil.copy(os.path.join('refs', 'gaas_bands.yml'), yaml_path)
+
+    return yaml_path
+
+
+def test_cache_hit(cache_dir, yaml_path):
+    """
+    Method to test that a cached file is reused and gives the same data as parsing the YAML file
+
+    """
+    stats = yaml_cache.cache_info()
+
+    parsed = open_yaml(yaml_path, use_cache=False)
+    first = open_yaml(yaml_path)
+    second = open_yaml(yaml_path)
+
+    info = yaml_cache.cache_info()
+    assert(info['misses'] == stats['misses'] + 1)
+    assert(info['hits'] == stats['hits'] + 1)
+    assert(info['size'] > 0)
+    assert(first == parsed and second == parsed)
+
+    # Cached data are independent copies that calculation modes can modify
+    second['bands'].pop('band index')
+    assert('band index' in open_yaml(yaml_path)['bands'])
+
+
+def test_cache_invalidation(cache_dir, yaml_path):
+    """
+    Method to test that a modified file is parsed again
+
+    """
+    open_yaml(yaml_path)
+
+    with open(yaml_path, 'r') as yaml_file:
+        text = yaml_file.read()
+
+    # Insert a key before the end of document marker
+    with open(yaml_path, 'w') as yaml_file:
+        yaml_file.write(text.replace('\n...', '\nextra key: 1\n...'))
+
+    misses = yaml_cache.cache_info()['misses']
+
+    assert(open_yaml(yaml_path)['extra key'] == 1)
+    assert(yaml_cache.cache_info()['misses'] == misses + 1)
+
+
+def test_cache_eviction_and_switch(cache_dir, yaml_path, tmp_path):
+    """
+    Method to test the size-based eviction and the global switch of the cache
+
+    """
+    other_path = os.path.join(tmp_path, 'other.yml')
+    shutil.copy(yaml_path, other_path)
+
+    open_yaml(yaml_path)
+    entry_size = yaml_cache.cache_info()['size']
+
+    yaml_cache.enable_cache(max_size=int(1.5 * entry_size))
+    open_yaml(other_path)
+    assert(len(os.listdir(cache_dir)) == 1)
+    assert(yaml_cache.cache_info()['size'] <= 1.5 * entry_size)
+
+    yaml_cache.clear_cache()
+    yaml_cache.disable_cache()
+    open_yaml(yaml_path)
+    assert(not yaml_cache.cache_enabled())
+    assert(yaml_cache.cache_info()['size'] == 0)
+
+
+def test_store_unpicklable(cache_dir, yaml_path):
+    """
+    Method to test that data that cannot be pickled are not cached, and that no temporary file is left behind
+
+    """
+    yaml_cache.store_cached(yaml_path, {'function': lambda x: x})
+
+    assert(os.listdir(cache_dir) == [])
+    assert(yaml_cache.load_cached(yaml_path) is None)